@@ -0,0 +1,100 @@
+"""
+Generatory danych wejściowych do benchmarków. Każdy generator zwraca `n` różnych punktów w kwadracie `[0, 1000]^2`
+i jest deterministyczny dla danego ziarna, więc wyniki kolejnych uruchomień są porównywalne.
+"""
+from typing import Callable, Dict, List
+import numpy as np
+
+Generator = Callable[[int, np.random.Generator], np.ndarray]
+
+SIZE = 1000.0
+
+
+def uniform(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Punkty o rozkładzie jednostajnym
+    """
+    return rng.uniform(0, SIZE, (n, 2))
+
+
+def clustered(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Punkty skupione wokół kilkunastu losowych środków (rozkład normalny o różnych odchyleniach)
+    oraz niewielki procent punktów rozrzuconych jednostajnie
+    """
+    centers = rng.uniform(0.1 * SIZE, 0.9 * SIZE, (16, 2))
+    spreads = rng.uniform(0.002, 0.03, 16) * SIZE
+    owners = rng.integers(0, len(centers), n)
+    points = centers[owners] + rng.normal(0, 1, (n, 2)) * spreads[owners, None]
+
+    background = rng.random(n) < 0.05
+    points[background] = rng.uniform(0, SIZE, (int(background.sum()), 2))
+
+    return points
+
+
+def grid(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Węzły regularnej siatki (wiele współliniowych i współokręgowych punktów)
+    """
+    side = int(np.ceil(np.sqrt(n)))
+    iy, ix = np.divmod(np.arange(n), side)
+
+    return np.column_stack((ix, iy)) * (SIZE / max(side - 1, 1))
+
+
+def near_degenerate(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Połowa punktów na okręgu i połowa na prostej, przesunięte o wartości rzędu błędu zaokrąglenia,
+    co wymusza dokładne obliczenia w predykatach
+    """
+    on_circle = n // 2
+    angles = np.sort(rng.uniform(0, 2 * np.pi, on_circle))
+    circle = SIZE / 2 + SIZE / 2 * np.column_stack((np.cos(angles), np.sin(angles)))
+
+    t = np.sort(rng.uniform(0.05, 0.95, n - on_circle)) * SIZE
+    line = np.column_stack((t, 0.3 * t + 0.1 * SIZE))
+
+    points = np.concatenate([circle, line])
+    points += rng.normal(0, 1, points.shape) * 1e-12 * SIZE
+
+    return points
+
+
+DATASETS: Dict[str, Generator] = {
+    'uniform': uniform,
+    'clustered': clustered,
+    'grid': grid,
+    'near_degenerate': near_degenerate,
+}
+
+
+def generate(name: str, n: int, seed: int = 0) -> List[tuple[float, float]]:
+    """
+    Generuje zbiór danych bez powtórzonych punktów
+
+    Parameters
+    ----------
+        name: `str`
+            nazwa generatora z `DATASETS`
+        n: `int`
+            liczba punktów
+        seed: `int`
+            ziarno generatora liczb losowych
+
+    Returns
+    -------
+        `List[tuple[float, float]]`: punkty w kolejności losowej
+
+    Raises
+    ------
+        `Exception`: jeśli generator o podanej nazwie nie istnieje
+    """
+    if name not in DATASETS:
+        raise Exception(f"Unknown dataset: {name}")
+
+    rng = np.random.default_rng(seed)
+    points = np.unique(DATASETS[name](n, rng), axis=0)
+    points = points[rng.permutation(len(points))]
+
+    return [tuple(point) for point in points.tolist()]
@@ -0,0 +1,74 @@
+"""
+Benchmark czasu importu biblioteki.
+
+Moduł `point_location` importowany jest wielokrotnie, za każdym razem w nowym procesie interpretera, a wynikiem jest
+najkrótszy czas importu i szczytowe zużycie pamięci procesu. Program kończy się kodem 1, jeśli czas przekracza
+`--budget` albo import wczytał którąś z bibliotek do rysowania (wczytywanych tylko przez `query_with_show`
+i pakiety wizualizacji), więc może pilnować budżetu importu np. w CI.
+
+Przykład:
+    python benchmarks/import_time.py --budget 1.0 --repeat 5
+"""
+from typing import List
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE = 'kirkpatrick_algorithm.kirkpatrick_point_location.point_location'
+
+# biblioteki, których import samego silnika nie może wczytywać
+FORBIDDEN = ('matplotlib', 'IPython', 'tkinter', 'pandas', 'kirkpatrick_algorithm.visualizer')
+
+# domyślny budżet czasu importu w sekundach, ze sporym zapasem ponad czas importu numpy i scipy
+DEFAULT_BUDGET = 1.0
+
+PROBE = f"""
+import json, resource, sys, time
+started = time.perf_counter()
+import {MODULE}
+elapsed = time.perf_counter() - started
+forbidden = sorted(name for name in {FORBIDDEN!r} if name in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'modules': len(sys.modules), 'forbidden': forbidden}}))
+"""
+
+
+def measure() -> dict:
+    """
+    Importuje moduł w nowym procesie interpretera i zwraca czas importu, zużycie pamięci, liczbę wczytanych modułów
+    oraz listę wczytanych zabronionych bibliotek
+    """
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark czasu importu algorytmu Kirkpatricka")
+    parser.add_argument('--repeat', type=int, default=5, help="liczba importów w nowych procesach")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="maksymalny czas importu w sekundach")
+    args = parser.parse_args(argv)
+
+    results = [measure() for _ in range(args.repeat)]
+    best = min(results, key=lambda result: result['seconds'])
+    forbidden = sorted({name for result in results for name in result['forbidden']})
+
+    print(f"import {MODULE}: {best['seconds'] * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms), "
+          f"{best['max_rss_mb']:.1f} MiB RSS, {best['modules']} modules")
+
+    failed = False
+    if forbidden:
+        print(f"FAILED plotting libraries imported: {', '.join(forbidden)}", file=sys.stderr)
+        failed = True
+    if best['seconds'] > args.budget:
+        print(f"FAILED import time {best['seconds']:.3f} s exceeds the budget of {args.budget:.3f} s", file=sys.stderr)
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Benchmark skalowania konstruktora, przetwarzania i zapytań.
+
+Dla każdego zbioru danych z `datasets.DATASETS`, każdego rozmiaru i każdej struktury lokalizacji z `engines.ENGINES`
+mierzony jest osobno czas konstruktora (zewnętrzny trójkąt i triangulacja Delaunaya), budowy struktury (`preprocess`),
+pojedynczego `query` oraz `query_many` (w przeliczeniu na punkt), a w osobnym przebiegu pod `tracemalloc` szczytowe
+zużycie pamięci każdej fazy. Wyniki zapisywane są
+w formacie JSON i mogą zostać porównane z zapisanym wcześniej wynikiem bazowym: przekroczenie go o więcej niż
+`--tolerance` kończy program kodem 1.
+
+Przykłady:
+    python benchmarks/run.py --sizes 100 1000 10000 --save-baseline benchmarks/baseline.json
+    python benchmarks/run.py --sizes 100 1000 10000 --baseline benchmarks/baseline.json --output results.json
+    python benchmarks/run.py --sizes 1000 10000 --engines kirkpatrick slab walk --no-memory
+"""
+from typing import Callable, Dict, List
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datasets import DATASETS, SIZE, generate
+from kirkpatrick_algorithm.kirkpatrick_point_location.engines import ENGINES
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 1000000]
+
+# metryki porównywane z wynikiem bazowym (czasy w sekundach lub mikrosekundach, pamięć w MiB)
+TIME_METRICS = ('constructor_s', 'preprocess_s', 'query_us', 'query_many_us')
+MEMORY_METRICS = ('constructor_peak_mb', 'preprocess_peak_mb', 'query_many_peak_mb')
+
+# czasy krótsze niż ten próg są zbyt zaszumione, by uznawać ich wzrost za regresję
+MIN_COMPARED_SECONDS = 1e-3
+
+
+def _timed(function: Callable[[], object], repeat: int) -> (float, object):
+    """
+    Zwraca najkrótszy z `repeat` czasów wykonania funkcji oraz wynik ostatniego wywołania
+    """
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def _peak(function: Callable[[], object]) -> (float, object):
+    """
+    Zwraca szczytowe zużycie pamięci (w MiB) w trakcie wykonania funkcji oraz jej wynik
+    """
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak / 2 ** 20, result
+
+
+def benchmark(dataset: str, size: int, queries: int, batch: int, repeat: int, memory: bool, seed: int, engine: str = 'kirkpatrick') -> dict:
+    """
+    Mierzy jedną strukturę lokalizacji na jednym zbiorze danych jednego rozmiaru
+
+    Parameters
+    ----------
+        dataset: `str`
+            nazwa zbioru danych
+        size: `int`
+            liczba wierzchołków
+        queries: `int`
+            liczba pojedynczych zapytań `query`
+        batch: `int`
+            liczba punktów w `query_many`
+        repeat: `int`
+            liczba powtórzeń każdego pomiaru czasu (wynikiem jest najkrótszy czas)
+        memory: `bool`
+            czy mierzyć szczytowe zużycie pamięci
+        seed: `int`
+            ziarno zbioru danych i punktów zapytań
+        engine: `str`
+            nazwa struktury lokalizacji z `engines.ENGINES`
+
+    Returns
+    -------
+        `dict`: wynik pomiaru
+    """
+    points = generate(dataset, size, seed)
+    rng = np.random.default_rng(seed + 1)
+    single = rng.uniform(0, SIZE, (queries, 2)).tolist()
+    many = rng.uniform(0, SIZE, (batch, 2))
+
+    locator_class = ENGINES[engine]
+    constructor_s, _ = _timed(lambda: locator_class.from_polygon(points), repeat)
+
+    # budowa zmienia stan obiektu, więc każde powtórzenie zaczyna się od nowego obiektu
+    preprocess_s = float('inf')
+    for _ in range(repeat):
+        locator = locator_class.from_polygon(points)
+        elapsed, _ = _timed(locator.build, 1)
+        preprocess_s = min(preprocess_s, elapsed)
+
+    query_s, _ = _timed(lambda: [locator.query(point) for point in single], repeat)
+    query_many_s, _ = _timed(lambda: locator.query_many(many), repeat)
+    stats = locator.dag_stats() if engine == 'kirkpatrick' else {}
+
+    result = {
+        'dataset': dataset,
+        'size': len(points),
+        'engine': engine,
+        'constructor_s': constructor_s,
+        'preprocess_s': preprocess_s,
+        'query_us': query_s / max(queries, 1) * 1e6,
+        'query_many_us': query_many_s / max(batch, 1) * 1e6,
+        'memory_mb': locator.stats()['memory_bytes'] / 2 ** 20,
+        'depth': stats.get('depth'),
+        'rounds': stats.get('rounds'),
+        'nodes': stats.get('nodes'),
+    }
+
+    if memory:
+        result['constructor_peak_mb'], locator = _peak(lambda: locator_class.from_polygon(points))
+        result['preprocess_peak_mb'], _ = _peak(locator.build)
+        result['query_many_peak_mb'], _ = _peak(lambda: locator.query_many(many))
+
+    return result
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """
+    Porównuje wyniki z wynikiem bazowym
+
+    Parameters
+    ----------
+        results: `List[dict]`
+            bieżące wyniki
+        baseline: `List[dict]`
+            wyniki bazowe
+        tolerance: `float`
+            dopuszczalny względny wzrost metryki, np. 0.25 oznacza 25%
+
+    Returns
+    -------
+        `List[str]`: opisy regresji (pusta lista, jeśli ich nie ma)
+    """
+    # wyniki bazowe sprzed porównywania struktur lokalizacji dotyczą algorytmu Kirkpatricka
+    key = lambda entry: (entry['dataset'], entry['size'], entry.get('engine', 'kirkpatrick'))
+    reference = {key(entry): entry for entry in baseline}
+
+    regressions = []
+    for entry in results:
+        base = reference.get(key(entry))
+        if base is None:
+            continue
+
+        for metric in TIME_METRICS + MEMORY_METRICS:
+            if metric not in entry or metric not in base:
+                continue
+            if metric.endswith('_s') and base[metric] < MIN_COMPARED_SECONDS:
+                continue
+            if entry[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{entry['dataset']} n={entry['size']} {entry['engine']} {metric}: {entry[metric]:.4g} > {base[metric]:.4g} "
+                                   f"(+{entry[metric] / base[metric] - 1:.0%})")
+
+    return regressions
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def _print_table(results: List[dict], file):
+    columns = ('dataset', 'size', 'engine') + TIME_METRICS + ('memory_mb', 'depth') + MEMORY_METRICS
+    print(' '.join(f"{column:>18}" for column in columns), file=file)
+    for entry in results:
+        cells = []
+        for column in columns:
+            value = entry.get(column)
+            value = '' if value is None else value
+            cells.append(f"{value:>18.4g}" if isinstance(value, float) else f"{value!s:>18}")
+        print(' '.join(cells), file=file)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark skalowania algorytmu Kirkpatricka")
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS), choices=list(DATASETS), help="zbiory danych")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help="liczby wierzchołków")
+    parser.add_argument('--engines', nargs='+', default=['kirkpatrick'], choices=list(ENGINES), help="struktury lokalizacji")
+    parser.add_argument('--queries', type=int, default=2000, help="liczba pojedynczych zapytań query")
+    parser.add_argument('--batch', type=int, default=100000, help="liczba punktów w query_many")
+    parser.add_argument('--repeat', type=int, default=3, help="liczba powtórzeń każdego pomiaru czasu")
+    parser.add_argument('--seed', type=int, default=0, help="ziarno zbiorów danych")
+    parser.add_argument('--no-memory', action='store_true', help="nie mierz szczytowego zużycia pamięci")
+    parser.add_argument('--output', help="plik JSON z wynikami ('-' oznacza standardowe wyjście)")
+    parser.add_argument('--baseline', help="plik JSON z wynikiem bazowym, z którym porównywane są wyniki")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="dopuszczalny względny wzrost metryk względem wyniku bazowego")
+    parser.add_argument('--save-baseline', help="zapisz wyniki jako nowy wynik bazowy")
+    args = parser.parse_args(argv)
+
+    results = []
+    for dataset in args.datasets:
+        for size in args.sizes:
+            for engine in args.engines:
+                results.append(benchmark(dataset, size, args.queries, args.batch, args.repeat, not args.no_memory, args.seed, engine))
+                print(f"{dataset} n={results[-1]['size']} {engine}: build {results[-1]['preprocess_s']:.3f} s, "
+                      f"query {results[-1]['query_us']:.1f} us", file=sys.stderr)
+
+    report = {
+        'environment': _environment(),
+        'parameters': {name: value for name, value in vars(args).items() if name not in ('output', 'baseline', 'save_baseline')},
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'results': results,
+    }
+
+    # przy wyniku JSON na standardowym wyjściu tabela trafia na standardowe wyjście błędów
+    _print_table(results, sys.stderr if args.output == '-' else sys.stdout)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)['results'], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
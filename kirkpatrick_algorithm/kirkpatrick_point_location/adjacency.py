@@ -0,0 +1,168 @@
+from scipy.spatial import Delaunay
+from typing import Dict, Iterator, List
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation_many
+
+
+class VertexAdjacency:
+    """
+    Lista sąsiedztwa triangulacji oparta wyłącznie na indeksach wierzchołków.
+
+    Dla każdego wierzchołka `u` przechowywany jest słownik następników `successors[u]`, w którym
+    `successors[u][a] == b` oznacza, że trójkąt `(u, a, b)` zorientowany przeciwnie do ruchu wskazówek zegara
+    należy do triangulacji. Klucze słownika to sąsiedzi `u`, a przejście po następnikach daje uporządkowany
+    pierścień sąsiadów. Pierścienie wierzchołków otoczki są domknięte krawędzią biegnącą przez zewnętrzną ścianę.
+    """
+    __slots__ = ('__successors',)
+
+    def __init__(self, successors: List[Dict[int, int]]):
+        """
+            Konstruktor klasy VertexAdjacency.
+
+            Parmeters
+            ---------
+                successors: `List[Dict[int, int]]`
+                    słowniki następników dla kolejnych wierzchołków, pusty słownik oznacza usunięty wierzchołek
+        """
+        self.__successors = successors
+
+    @staticmethod
+    def from_delaunay(delaunay: Delaunay) -> 'VertexAdjacency':
+        """
+        Buduje listę sąsiedztwa z triangulacji Delaunaya
+
+        Parameters
+        ----------
+            delaunay: `Delaunay`
+                triangulacja w obiekcie typu `Delaunay` z biblioteki `SciPy`
+
+        Returns
+        -------
+            `VertexAdjacency`: lista sąsiedztwa triangulacji
+        """
+        return VertexAdjacency.from_triangles(delaunay.points, delaunay.simplices, np.unique(delaunay.convex_hull))
+
+    @staticmethod
+    def from_triangles(points: np.ndarray, triangles: np.ndarray, hull: np.ndarray) -> 'VertexAdjacency':
+        """
+        Buduje listę sąsiedztwa z tablicy trójkątów
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                współrzędne wierzchołków, kształt `(V, 2)`
+            triangles: `np.ndarray`
+                trójki indeksów wierzchołków w dowolnej orientacji, kształt `(T, 3)`
+            hull: `np.ndarray`
+                indeksy wierzchołków leżących na otoczce wypukłej triangulacji
+
+        Returns
+        -------
+            `VertexAdjacency`: lista sąsiedztwa triangulacji
+        """
+        points = np.asarray(points, dtype=np.float64)
+        triangles = np.array(triangles, dtype=np.int64).reshape(-1, 3)
+        a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+        clockwise = orientation_many(a[:, 0], a[:, 1], b[:, 0], b[:, 1], c[:, 0], c[:, 1]) < 0
+        triangles[clockwise] = triangles[clockwise][:, ::-1]
+
+        adjacency = VertexAdjacency([{} for _ in range(len(points))])
+        for a, b, c in triangles.tolist():
+            adjacency.add_triangle(a, b, c)
+
+        # pierścień wierzchołka otoczki jest otwarty: ostatni sąsiad nie ma następnika,
+        # a pierwszy nie jest niczyim następnikiem, więc łączymy je krawędzią przez zewnętrzną ścianę
+        for u in np.asarray(hull).tolist():
+            successors = adjacency.__successors[u]
+            last = set(successors.values()).difference(successors)
+            first = set(successors).difference(successors.values())
+            if last and first:
+                successors[last.pop()] = first.pop()
+
+        return adjacency
+
+    def add_triangle(self, a: int, b: int, c: int):
+        """
+        Dodaje trójkąt zorientowany przeciwnie do ruchu wskazówek zegara, wiążąc pierścienie jego wierzchołków
+
+        Parameters
+        ----------
+            a, b, c: `int`
+                indeksy wierzchołków trójkąta
+
+        Returns
+        -------
+            `None`
+        """
+        self.__successors[a][b] = c
+        self.__successors[b][c] = a
+        self.__successors[c][a] = b
+
+    def is_alive(self, vertex: int) -> bool:
+        """
+        Sprawdza, czy wierzchołek należy do triangulacji
+        """
+        return bool(self.__successors[vertex])
+
+    def vertices(self) -> Iterator[int]:
+        """
+        Iteruje po indeksach wierzchołków należących do triangulacji w kolejności rosnącej
+        """
+        return (vertex for vertex, successors in enumerate(self.__successors) if successors)
+
+    def degree(self, vertex: int) -> int:
+        """
+        Zwraca stopień wierzchołka
+        """
+        return len(self.__successors[vertex])
+
+    def neighbors(self, vertex: int) -> Iterator[int]:
+        """
+        Iteruje po sąsiadach wierzchołka w dowolnej kolejności
+        """
+        return iter(self.__successors[vertex])
+
+    def ring(self, vertex: int) -> List[int]:
+        """
+        Zwraca pierścień sąsiadów wierzchołka uporządkowany przeciwnie do ruchu wskazówek zegara
+
+        Parameters
+        ----------
+            vertex: `int`
+                indeks wierzchołka
+
+        Returns
+        -------
+            `List[int]`: kolejni sąsiedzi wierzchołka
+        """
+        successors = self.__successors[vertex]
+        first = next(iter(successors))
+        ring = [first]
+        current = successors[first]
+        while current != first:
+            ring.append(current)
+            current = successors[current]
+
+        return ring
+
+    def remove_vertex(self, vertex: int) -> List[int]:
+        """
+        Usuwa wierzchołek z triangulacji, zostawiając dziurę ograniczoną jego pierścieniem sąsiadów.
+        Dziurę należy następnie wypełnić trójkątami dodanymi przez `add_triangle`, które ponownie zwiążą
+        pierścienie wierzchołków brzegu dziury.
+
+        Parameters
+        ----------
+            vertex: `int`
+                indeks usuwanego wierzchołka
+
+        Returns
+        -------
+            `List[int]`: wierzchołki brzegu dziury uporządkowane przeciwnie do ruchu wskazówek zegara
+        """
+        ring = self.ring(vertex)
+        for neighbor in ring:
+            del self.__successors[neighbor][vertex]
+        self.__successors[vertex] = {}
+
+        return ring
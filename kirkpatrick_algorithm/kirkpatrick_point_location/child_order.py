@@ -0,0 +1,111 @@
+"""
+Kolejność dzieci w drzewie przeszukiwania dopasowana do rozkładu zapytań.
+
+Schodząc po drzewie, zapytanie sprawdza dzieci wierzchołka po kolei, aż znajdzie to, które zawiera punkt, więc
+oczekiwana liczba testów przynależności na poziomie jest najmniejsza, gdy dzieci są uporządkowane malejąco według
+prawdopodobieństwa trafienia. Prawdopodobieństwo to szacowane jest liczbą trafień próbki zapytań, a bez próbki
+(i dla dzieci, których próbka nie trafiła) polem części wspólnej dziecka z rodzicem, co odpowiada zapytaniom
+o rozkładzie jednostajnym.
+"""
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.search_dag import SearchDAG
+
+# liczba par trójkątów przetwarzanych naraz przy liczeniu pól części wspólnych
+CHUNK_SIZE = 1 << 18
+
+
+def _clip(polygons: np.ndarray, counts: np.ndarray, a: np.ndarray, b: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Obcina wielokąty wypukłe półpłaszczyzną po lewej stronie prostej `a -> b` (algorytm Sutherlanda-Hodgmana)
+    """
+    size = polygons.shape[1]
+    index = np.arange(size)
+    valid = index < counts[:, None]
+    following = np.take_along_axis(polygons, np.where(index + 1 < counts[:, None], index + 1, 0)[:, :, None], axis=1)
+
+    direction = (b - a)[:, None, :]
+    side = lambda points: direction[..., 0] * (points[..., 1] - a[:, None, 1]) - direction[..., 1] * (points[..., 0] - a[:, None, 0])
+    current_side, following_side = side(polygons), side(following)
+    inside, following_inside = current_side >= 0, following_side >= 0
+
+    denominator = current_side - following_side
+    t = np.divide(current_side, denominator, out=np.zeros_like(denominator), where=denominator != 0)
+    crossings = polygons + t[..., None] * (following - polygons)
+
+    # każda krawędź daje swój początek (jeśli leży po lewej) i punkt przecięcia (jeśli krawędź przecina prostą)
+    candidates = np.stack([polygons, crossings], axis=2).reshape(len(polygons), 2 * size, 2)
+    kept = np.stack([valid & inside, valid & (inside != following_inside)], axis=2).reshape(len(polygons), 2 * size)
+    counts = kept.sum(axis=1)
+    order = np.argsort(~kept, axis=1, kind='stable')[:, :max(int(counts.max(initial=0)), 1)]
+
+    return np.take_along_axis(candidates, order[:, :, None], axis=1), counts
+
+
+def overlap_areas(parents: np.ndarray, children: np.ndarray) -> np.ndarray:
+    """
+    Oblicza pola części wspólnych par trójkątów
+
+    Parameters
+    ----------
+        parents: `np.ndarray`
+            wierzchołki trójkątów zorientowanych przeciwnie do ruchu wskazówek zegara, kształt `(M, 3, 2)`
+        children: `np.ndarray`
+            wierzchołki drugich trójkątów par, kształt `(M, 3, 2)`
+
+    Returns
+    -------
+        `np.ndarray`: pola części wspólnych, kształt `(M,)`
+    """
+    polygons, counts = children, np.full(len(children), 3)
+    for i, j in ((0, 1), (1, 2), (2, 0)):
+        polygons, counts = _clip(polygons, counts, parents[:, i], parents[:, j])
+
+    valid = np.arange(polygons.shape[1]) < counts[:, None]
+    following = np.roll(polygons, -1, axis=1)
+    # ostatni wierzchołek wielokąta łączy się z pierwszym, a nie z wypełnieniem tablicy
+    last = np.maximum(counts - 1, 0)
+    following[np.arange(len(polygons)), last] = polygons[:, 0]
+    cross = polygons[..., 0] * following[..., 1] - polygons[..., 1] * following[..., 0]
+
+    return np.abs(np.where(valid, cross, 0).sum(axis=1)) / 2
+
+
+def order_children(dag: SearchDAG, hits: np.ndarray = None):
+    """
+    Porządkuje dzieci każdego wierzchołka drzewa malejąco według liczby trafień, a przy równej liczbie trafień
+    malejąco według pola części wspólnej z rodzicem. Zmieniana jest tylko kolejność w obrębie list dzieci, więc
+    zbiory dzieci, numery wierzchołków i pozycje liści pozostają takie same.
+
+    Parameters
+    ----------
+        dag: `SearchDAG`
+            drzewo, którego tablica `child_indices` jest zmieniana (albo podmieniana na kopię, jeśli jest tylko do odczytu)
+        hits: `np.ndarray`
+            liczby trafień kolejnych pozycji tablicy `child_indices`, jak w `SearchDAG.locate_many`, albo `None`
+
+    Returns
+    -------
+        `None`
+    """
+    counts = dag.child_ends - dag.child_starts
+    internal = np.flatnonzero(counts)
+    counts = counts[internal]
+    offsets = np.zeros(len(internal) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    positions = np.repeat(dag.child_starts[internal] - offsets[:-1], counts) + np.arange(offsets[-1])
+    parents = np.repeat(internal, counts)
+
+    children = dag.child_indices
+    vertices, triangles = dag.store.vertices, dag.store.triangles
+    areas = np.empty(len(positions))
+    for start in range(0, len(positions), CHUNK_SIZE):
+        end = start + CHUNK_SIZE
+        areas[start:end] = overlap_areas(vertices[triangles[parents[start:end]]], vertices[triangles[children[positions[start:end]]]])
+
+    weights = hits[positions] if hits is not None else np.zeros(len(positions), dtype=np.int64)
+    order = np.lexsort((-areas, -weights, parents))
+
+    if not children.flags.writeable:
+        children = np.array(children)
+        dag.child_indices = children
+    children[positions] = children[positions[order]]
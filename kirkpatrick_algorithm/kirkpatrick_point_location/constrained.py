@@ -0,0 +1,274 @@
+"""
+Triangulacja z ograniczeniami i etykiety ścian.
+
+Krawędzie ograniczeń (boki wielokąta, jego dziur albo ścian podziału płaszczyzny) wstawiane są kolejno do triangulacji
+Delaunaya. Trójkąty przecinane przez brakującą krawędź są usuwane, a dwa powstałe po jej obu stronach wielokąty
+triangulowane są od nowa rekurencyjnie, tak by nowe trójkąty spełniały warunek Delaunaya względem wierzchołków
+wielokąta (A. Anglada, "An improved incremental algorithm for constructing restricted Delaunay triangulations").
+Krawędź przechodząca przez istniejący wierzchołek jest w nim dzielona.
+
+Każda krawędź ograniczeń ma etykiety ścian leżących po jej lewej i prawej stronie. Trójkąty połączone krawędziami,
+które nie są ograniczeniami, leżą w tej samej ścianie, więc etykiety wyznaczane są dla spójnych składowych trójkątów
+na podstawie trójkątów przylegających do krawędzi ograniczeń. Składowe bez żadnej etykiety leżą poza wszystkimi
+ścianami i dostają etykietę -1.
+"""
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from typing import List
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import incircle, orientation
+from kirkpatrick_algorithm.kirkpatrick_point_location.walk import leaf_neighbors
+
+
+def _fill(points: List[List[float]], u: int, w: int, chain: List[int]) -> List[tuple[int, int, int]]:
+    """
+    Trianguluje wielokąt o podstawie `(u, w)` i pozostałych wierzchołkach `chain` leżących po jednej stronie podstawy,
+    uporządkowanych od strony `u` do strony `w`. Zwraca trójkąty zorientowane przeciwnie do ruchu wskazówek zegara.
+    """
+    triangles = []
+    stack = [(u, w, chain)]
+    while stack:
+        u, w, chain = stack.pop()
+        if not chain:
+            continue
+
+        # wszystkie wierzchołki leżą po tej samej stronie podstawy, więc orientacja trójkąta z podstawą jest wspólna
+        a, b = (u, w) if orientation(*points[u], *points[w], *points[chain[0]]) > 0 else (w, u)
+
+        # wierzchołek, którego okrąg opisany na trójkącie z podstawą nie zawiera pozostałych wierzchołków wielokąta
+        best = 0
+        for i in range(1, len(chain)):
+            if incircle(*points[a], *points[b], *points[chain[best]], *points[chain[i]]) > 0:
+                best = i
+
+        c = chain[best]
+        triangles.append((a, b, c))
+        stack.append((u, c, chain[:best]))
+        stack.append((c, w, chain[best + 1:]))
+
+    return triangles
+
+
+def insert_segments(points: np.ndarray, triangles: np.ndarray, segments: List[tuple[int, int]]) -> (np.ndarray, List[List[tuple[int, int]]]):
+    """
+    Wstawia krawędzie ograniczeń do triangulacji
+
+    Parameters
+    ----------
+        points: `np.ndarray`
+            współrzędne wierzchołków, kształt `(V, 2)`
+        triangles: `np.ndarray`
+            trójkąty triangulacji zorientowane przeciwnie do ruchu wskazówek zegara, kształt `(T, 3)`
+        segments: `List[tuple[int, int]]`
+            krawędzie ograniczeń jako pary indeksów wierzchołków; końce krawędzi nie mogą leżeć na brzegu triangulacji
+
+    Returns
+    -------
+        `np.ndarray`: trójkąty triangulacji z ograniczeniami zorientowane przeciwnie do ruchu wskazówek zegara, kształt `(T', 3)`
+        `List[List[tuple[int, int]]]`: dla każdej krawędzi ograniczeń krawędzie triangulacji, na które została
+        podzielona, skierowane od jej początku do końca
+
+    Raises
+    ------
+        `Exception`: jeśli krawędzie ograniczeń się przecinają albo koniec krawędzi nie jest wierzchołkiem triangulacji
+    """
+    coordinates = np.asarray(points, dtype=np.float64).tolist()
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3).tolist()
+    alive = [True] * len(triangles)
+
+    edges, vertex_triangle = {}, {}
+    for i, (a, b, c) in enumerate(triangles):
+        edges[a, b] = edges[b, c] = edges[c, a] = i
+        vertex_triangle[a] = vertex_triangle[b] = vertex_triangle[c] = i
+
+    def rotated(triangle: int, vertex: int) -> List[int]:
+        a, b, c = triangles[triangle]
+        return [a, b, c] if a == vertex else [b, c, a] if b == vertex else [c, a, b]
+
+    constraints = set()
+    pieces = []
+
+    def constrain(a: int, b: int):
+        constraints.add((min(a, b), max(a, b)))
+        pieces[-1].append((a, b))
+
+    for start, end in segments:
+        pieces.append([])
+        stack = [(start, end)]
+        while stack:
+            a, b = stack.pop()
+            if a == b:
+                continue
+            if a not in vertex_triangle or b not in vertex_triangle:
+                raise Exception(f"Segment ({a}, {b}) has an endpoint that is not a vertex of the triangulation")
+
+            if (a, b) in edges or (b, a) in edges:
+                constrain(a, b)
+                continue
+
+            pa, pb = coordinates[a], coordinates[b]
+
+            # obrót wokół a aż do trójkąta (a, p, q), w którego kącie leży kierunek do b
+            triangle, crossing = vertex_triangle[a], None
+            for _ in range(len(triangles)):
+                _, p, q = rotated(triangle, a)
+                pp = coordinates[p]
+                if orientation(*pa, *pb, *pp) == 0 and (pp[0] - pa[0]) * (pb[0] - pa[0]) + (pp[1] - pa[1]) * (pb[1] - pa[1]) > 0:
+                    # krawędź przechodzi przez wierzchołek p, który już jest połączony z a
+                    constrain(a, p)
+                    stack.append((p, b))
+                    break
+                if orientation(*pa, *pb, *pp) < 0 and orientation(*pa, *pb, *coordinates[q]) > 0:
+                    crossing = (triangle, p, q)
+                    break
+                triangle = edges[a, q]
+            else:
+                raise Exception(f"Segment ({a}, {b}) could not be inserted")
+
+            if crossing is None:
+                continue
+
+            # przejście wzdłuż krawędzi przez przecinane trójkąty; p leży po prawej, a q po lewej stronie a -> b
+            triangle, p, q = crossing
+            removed, right, left = [triangle], [p], [q]
+            while True:
+                if (min(p, q), max(p, q)) in constraints:
+                    raise Exception(f"Segment ({a}, {b}) crosses another constraint segment")
+
+                triangle = edges[q, p]
+                r = rotated(triangle, q)[2]
+                removed.append(triangle)
+                if r == b:
+                    break
+
+                side = orientation(*pa, *pb, *coordinates[r])
+                if side == 0:
+                    # krawędź przechodzi przez wierzchołek r, więc dzielimy ją na dwie części
+                    stack.append((r, b))
+                    b = r
+                    break
+                if side > 0:
+                    left.append(r)
+                    q = r
+                else:
+                    right.append(r)
+                    p = r
+
+            for triangle in removed:
+                alive[triangle] = False
+                x, y, z = triangles[triangle]
+                for edge in ((x, y), (y, z), (z, x)):
+                    del edges[edge]
+
+            for x, y, z in _fill(coordinates, a, b, right) + _fill(coordinates, a, b, left):
+                edges[x, y] = edges[y, z] = edges[z, x] = len(triangles)
+                vertex_triangle[x] = vertex_triangle[y] = vertex_triangle[z] = len(triangles)
+                triangles.append([x, y, z])
+                alive.append(True)
+
+            constrain(a, b)
+
+    result = np.array([triangle for triangle, is_alive in zip(triangles, alive) if is_alive], dtype=np.int64).reshape(-1, 3)
+
+    return result, pieces
+
+
+def label_faces(triangles: np.ndarray, pieces: List[List[tuple[int, int]]], left_faces: np.ndarray, right_faces: np.ndarray) -> np.ndarray:
+    """
+    Wyznacza etykiety ścian dla trójkątów triangulacji z ograniczeniami
+
+    Parameters
+    ----------
+        triangles: `np.ndarray`
+            trójkąty zorientowane przeciwnie do ruchu wskazówek zegara, kształt `(T, 3)`
+        pieces: `List[List[tuple[int, int]]]`
+            krawędzie triangulacji tworzące kolejne krawędzie ograniczeń, jak w wyniku `insert_segments`
+        left_faces: `np.ndarray`
+            etykiety ścian po lewej stronie krawędzi ograniczeń (-1, jeśli nie ma tam ściany), kształt `(S,)`
+        right_faces: `np.ndarray`
+            etykiety ścian po prawej stronie krawędzi ograniczeń, kształt `(S,)`
+
+    Returns
+    -------
+        `np.ndarray`: etykieta ściany każdego trójkąta albo -1 dla trójkątów poza ścianami, kształt `(T,)`
+
+    Raises
+    ------
+        `Exception`: jeśli jeden obszar ograniczony krawędziami dostał różne etykiety (ściany nachodzą na siebie
+        albo brzegi ścian nie są domknięte)
+    """
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    n = int(triangles.max(initial=0)) + 1
+
+    # skierowana krawędź u -> v należy do trójkąta, który leży po jej lewej stronie
+    directed = (triangles * n + triangles[:, [1, 2, 0]]).ravel()
+    order = np.argsort(directed)
+    directed = directed[order]
+
+    def left_of(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+        keys = u * n + v
+        positions = np.minimum(np.searchsorted(directed, keys), len(directed) - 1)
+        found = directed[positions] == keys
+        return np.where(found, order[positions] // 3, -1)
+
+    counts = [len(edges) for edges in pieces]
+    split = np.array([edge for edges in pieces for edge in edges], dtype=np.int64).reshape(-1, 2)
+    left_faces = np.repeat(np.asarray(left_faces, dtype=np.int64), counts)
+    right_faces = np.repeat(np.asarray(right_faces, dtype=np.int64), counts)
+
+    # trójkąty sąsiadujące przez krawędź, która nie jest ograniczeniem, należą do tej samej składowej
+    neighbors = leaf_neighbors(triangles)
+    first, second = triangles[:, [1, 2, 0]], triangles[:, [2, 0, 1]]
+    keys = np.minimum(first, second) * n + np.maximum(first, second)
+    constrained = np.isin(keys, np.minimum(split[:, 0], split[:, 1]) * n + np.maximum(split[:, 0], split[:, 1]))
+    source, target = np.nonzero((neighbors >= 0) & ~constrained)
+    graph = coo_matrix((np.ones(len(source), dtype=np.int8), (source, neighbors[source, target])), shape=(len(triangles), len(triangles)))
+    _, components = connected_components(graph, directed=False)
+
+    # etykieta -1 po jednej stronie krawędzi też jest sprawdzana, więc wykrywane są np. dziury leżące poza wielokątem
+    seeds = np.concatenate([left_of(split[:, 0], split[:, 1]), left_of(split[:, 1], split[:, 0])])
+    labels = np.concatenate([left_faces, right_faces])
+    seeds, labels = components[seeds[seeds >= 0]], labels[seeds >= 0]
+
+    component_labels = np.full(components.max(initial=-1) + 1, -1, dtype=np.int64)
+    component_labels[seeds] = labels
+    if np.any(component_labels[seeds] != labels):
+        raise Exception("Faces overlap or their boundaries are not closed")
+
+    return component_labels[components]
+
+
+def ring_segments(points: np.ndarray, rings: List[List[int]]) -> (List[tuple[int, int]], np.ndarray, np.ndarray):
+    """
+    Zamienia brzeg wielokąta z dziurami na krawędzie ograniczeń. Pierwszy pierścień to brzeg zewnętrzny,
+    a pozostałe to brzegi dziur; orientacja pierścieni może być dowolna.
+
+    Parameters
+    ----------
+        points: `np.ndarray`
+            współrzędne wierzchołków, kształt `(V, 2)`
+        rings: `List[List[int]]`
+            kolejne wierzchołki pierścieni jako indeksy w `points`
+
+    Returns
+    -------
+        `List[tuple[int, int]]`: krawędzie ograniczeń
+        `np.ndarray`: etykiety ścian po lewej stronie krawędzi (0 dla wnętrza wielokąta, -1 na zewnątrz)
+        `np.ndarray`: etykiety ścian po prawej stronie krawędzi
+    """
+    points = np.asarray(points, dtype=np.float64)
+
+    segments, inside_left = [], []
+    for i, ring in enumerate(rings):
+        x, y = points[ring, 0], points[ring, 1]
+        counterclockwise = np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) > 0
+        # wnętrze wielokąta leży po lewej stronie brzegu zewnętrznego obiegniętego przeciwnie do ruchu
+        # wskazówek zegara i po lewej stronie brzegów dziur obiegniętych zgodnie z ruchem wskazówek zegara
+        left = counterclockwise == (i == 0)
+        for a, b in zip(ring, ring[1:] + ring[:1]):
+            segments.append((a, b))
+            inside_left.append(left)
+
+    inside_left = np.array(inside_left, dtype=bool)
+
+    return segments, np.where(inside_left, 0, -1), np.where(inside_left, -1, 0)
@@ -0,0 +1,335 @@
+"""
+Przyrostowe wstawianie i usuwanie wierzchołków w przetworzonym wielokącie.
+
+Zmiana triangulacji jest lokalna: wstawienie wierzchołka usuwa trójkąt (albo dwa trójkąty, jeśli punkt leży na
+krawędzi) oraz trójkąty usunięte przez zamiany przekątnych przywracające warunek Delaunaya, a usunięcie wierzchołka
+usuwa jego gwiazdę. W obu przypadkach powstaje wielokąt gwiaździsty względem zmienianego wierzchołka, którego nowe
+trójkąty wiązane są z usuniętymi tak samo jak w rundach przetwarzania (`holes.link_hole`). Usunięte liście stają się
+wierzchołkami wewnętrznymi drzewa, a ich dziećmi są nowe trójkąty, które na nie nachodzą, więc koszt zmiany zależy
+tylko od jej rozmiaru. Każda zmiana w tym samym miejscu wydłuża jednak ścieżki w drzewie o jeden poziom, dlatego
+drzewo należy co jakiś czas zbudować od nowa z aktualnej triangulacji (`Kirkpatrick.rebalance`).
+"""
+from typing import List, Set
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.holes import link_hole, triangulate_hole
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import incircle, orientation
+from kirkpatrick_algorithm.kirkpatrick_point_location.search_dag import SearchDAG
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+from kirkpatrick_algorithm.kirkpatrick_point_location.walk import leaf_neighbors
+
+
+class _GrowableArray:
+    """
+    Tablica numpy z zapasem miejsca, do której można dopisywać wiersze w zamortyzowanym czasie stałym
+    """
+    __slots__ = ('__buffer', '__size')
+
+    def __init__(self, array: np.ndarray):
+        self.__buffer = np.array(array)
+        self.__size = len(self.__buffer)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def view(self) -> np.ndarray:
+        return self.__buffer[:self.__size]
+
+    def append(self, rows: np.ndarray):
+        rows = np.asarray(rows, dtype=self.__buffer.dtype).reshape((-1,) + self.__buffer.shape[1:])
+        if self.__size + len(rows) > len(self.__buffer):
+            capacity = max(2 * len(self.__buffer), self.__size + len(rows), 16)
+            buffer = np.empty((capacity,) + self.__buffer.shape[1:], dtype=self.__buffer.dtype)
+            buffer[:self.__size] = self.__buffer[:self.__size]
+            self.__buffer = buffer
+
+        self.__buffer[self.__size:self.__size + len(rows)] = rows
+        self.__size += len(rows)
+
+    def truncate(self, size: int):
+        self.__size = size
+
+
+class DynamicTriangulation:
+    """
+    Przetworzony wielokąt, do którego można wstawiać i z którego można usuwać wierzchołki.
+
+    Obiekt kopiuje tablice drzewa do tablic z zapasem miejsca, utrzymuje sąsiedztwo liści (jak w module `walk`)
+    i dla każdego wierzchołka jeden zawierający go liść. Drzewo dostępne w polu `dag` jest aktualizowane po każdej
+    zmianie. Pozycje liści w liście `dag.leaves()` nie zmieniają się, dopóki liść nie zostanie usunięty: nowe liście
+    zajmują pozycje usuniętych, a nadmiarowe pozycje są uzupełniane ostatnimi liśćmi listy.
+    """
+    def __init__(self, dag: SearchDAG, outer_triangle: Set[int]):
+        """
+            Konstruktor klasy DynamicTriangulation.
+
+            Parmeters
+            ---------
+                dag: `SearchDAG`
+                    przetworzone drzewo przeszukiwania, które nie jest modyfikowane
+                outer_triangle: `Set[int]`
+                    indeksy wierzchołków zewnętrznego trójkąta, których nie wolno usuwać
+        """
+        store = dag.store
+        leaf_ids = dag.leaf_nodes()
+        leaves = store.triangles[leaf_ids]
+
+        self.__outer_triangle = set(outer_triangle)
+        self.__vertices = _GrowableArray(store.vertices)
+        self.__triangles = _GrowableArray(store.triangles)
+        self.__child_indices = _GrowableArray(dag.child_indices)
+        self.__child_starts = _GrowableArray(np.asarray(dag.child_starts, dtype=np.int64))
+        self.__child_ends = _GrowableArray(np.asarray(dag.child_ends, dtype=np.int64))
+        self.__leaf_ids = _GrowableArray(leaf_ids.astype(np.int64))
+
+        leaf_slots = np.full(len(store), -1, dtype=np.int64)
+        leaf_slots[leaf_ids] = np.arange(len(leaf_ids))
+        self.__leaf_slots = _GrowableArray(leaf_slots)
+
+        local = leaf_neighbors(leaves)
+        neighbors = np.full((len(store), 3), -1, dtype=np.int64)
+        neighbors[leaf_ids] = np.where(local >= 0, leaf_ids[local], -1)
+        self.__neighbors = _GrowableArray(neighbors)
+
+        vertex_leaf = np.full(len(store.vertices), -1, dtype=np.int64)
+        vertex_leaf[leaves.ravel()] = np.repeat(leaf_ids, 3)
+        self.__vertex_leaf = _GrowableArray(vertex_leaf)
+
+        self.__extra_depths = _GrowableArray(np.zeros(len(store), dtype=np.int32))
+
+        self.updates = 0
+        self.extra_depth = 0
+        self.dag = SearchDAG(TriangleStore(self.__vertices.view, self.__triangles.view), None, self.__child_indices.view,
+                             dag.root, dag.level_offsets, self.__child_starts.view, self.__child_ends.view,
+                             self.__leaf_ids.view, self.__leaf_slots.view)
+
+    @property
+    def neighbors(self) -> np.ndarray:
+        """
+        Sąsiedztwo liści indeksowane numerami wierzchołków drzewa, jak w `walk.leaf_neighbors`
+        """
+        return self.__neighbors.view
+
+    def leaf_triangles(self) -> np.ndarray:
+        """
+        Zwraca trójkąty aktualnej triangulacji w kolejności listy `dag.leaves()`, kształt `(T, 3)`
+        """
+        return self.__triangles.view[self.__leaf_ids.view]
+
+    def __sync(self):
+        """
+        Podmienia tablice drzewa na aktualne widoki tablic z zapasem miejsca
+        """
+        self.dag.store.vertices = self.__vertices.view
+        self.dag.store.triangles = self.__triangles.view
+        self.dag.child_indices = self.__child_indices.view
+        self.dag.child_starts = self.__child_starts.view
+        self.dag.child_ends = self.__child_ends.view
+        self.dag.leaf_ids = self.__leaf_ids.view
+        self.dag.leaf_slots = self.__leaf_slots.view
+
+    def __point(self, vertex: int) -> (float, float):
+        return tuple(self.__vertices.view[vertex].tolist())
+
+    def __replace(self, removed: List[int], triangles: List[tuple[int, int, int]], neighbors: List[List[int]], children: List[List[int]]):
+        """
+        Zastępuje liście `removed` nowymi trójkątami. Nowe trójkąty dostają kolejne wolne numery, a w listach
+        `neighbors` i `children` odwołania do nich zapisane są jako `-2 - i` dla `i`-tego nowego trójkąta.
+        """
+        first = len(self.__triangles)
+        resolve = lambda node: first + (-2 - node) if node <= -2 else node
+        new_nodes = list(range(first, first + len(triangles)))
+
+        self.__triangles.append(triangles)
+        self.__neighbors.append([[resolve(node) for node in row] for row in neighbors])
+        self.__child_starts.append(np.zeros(len(triangles)))
+        self.__child_ends.append(np.zeros(len(triangles)))
+        self.__leaf_slots.append(np.full(len(triangles), -1))
+        extra_depth = int(self.__extra_depths.view[removed].max()) + 1
+        self.__extra_depths.append(np.full(len(triangles), extra_depth))
+        self.extra_depth = max(self.extra_depth, extra_depth)
+
+        # usunięte liście stają się wierzchołkami wewnętrznymi, a ich dziećmi są nachodzące na nie nowe trójkąty
+        for node, node_children in zip(removed, children):
+            start = len(self.__child_indices)
+            self.__child_indices.append([resolve(child) for child in node_children])
+            self.__child_starts.view[node] = start
+            self.__child_ends.view[node] = start + len(node_children)
+
+        leaf_ids, leaf_slots = self.__leaf_ids, self.__leaf_slots
+        free = sorted(leaf_slots.view[removed].tolist())
+        leaf_slots.view[removed] = -1
+        for slot, node in zip(free, new_nodes):
+            leaf_ids.view[slot] = node
+            leaf_slots.view[node] = slot
+        for node in new_nodes[len(free):]:
+            leaf_slots.view[node] = len(leaf_ids)
+            leaf_ids.append([node])
+        for slot in reversed(free[len(new_nodes):]):
+            last = len(leaf_ids) - 1
+            if slot != last:
+                moved = leaf_ids.view[last]
+                leaf_ids.view[slot] = moved
+                leaf_slots.view[moved] = slot
+            leaf_ids.truncate(last)
+
+        for node, triangle in zip(new_nodes, triangles):
+            self.__vertex_leaf.view[list(triangle)] = node
+
+        self.updates += 1
+        self.__sync()
+
+    def __relink_outside(self, outside: int, a: int, b: int, node: int):
+        """
+        Ustawia sąsiada trójkąta `outside` przez krawędź `(a, b)` na `node`
+        """
+        if outside < 0:
+            return
+        triangle = self.__triangles.view[outside].tolist()
+        opposite = next(k for k in range(3) if triangle[k] != a and triangle[k] != b)
+        self.__neighbors.view[outside, opposite] = node
+
+    def insert(self, x: float, y: float) -> int:
+        """
+        Wstawia wierzchołek do triangulacji, przywracając warunek Delaunaya zamianami przekątnych
+
+        Parameters
+        ----------
+            x: `float`
+                współrzędna x wierzchołka
+            y: `float`
+                współrzędna y wierzchołka
+
+        Returns
+        -------
+            `int`: indeks nowego wierzchołka
+
+        Raises
+        ------
+            `Exception`: jeśli punkt nie leży we wnętrzu zewnętrznego trójkąta albo jest już wierzchołkiem triangulacji
+        """
+        dag, triangles, neighbors = self.dag, self.__triangles.view, self.__neighbors.view
+        if not dag.contains(dag.root, x, y, strict=True):
+            raise Exception(f"Vertex ({x}, {y}) must lie inside the outer triangle")
+
+        leaf = dag.locate(x, y)
+        a, b, c = triangles[leaf].tolist()
+        # krawędzie brzegu wnęki uporządkowane przeciwnie do ruchu wskazówek zegara: (początek, koniec, trójkąt za krawędzią)
+        ring = [[a, b, int(neighbors[leaf, 2])], [b, c, int(neighbors[leaf, 0])], [c, a, int(neighbors[leaf, 1])]]
+        cavity = [leaf]
+
+        on_edges = [i for i, (u, w, _) in enumerate(ring) if orientation(*self.__point(u), *self.__point(w), x, y) == 0]
+        if len(on_edges) > 1:
+            raise Exception(f"Vertex ({x}, {y}) already exists")
+
+        def expand(i: int):
+            u, w, outside = ring[i]
+            triangle = triangles[outside].tolist()
+            iu, iw = triangle.index(u), triangle.index(w)
+            far = triangle[3 - iu - iw]
+            ring[i:i + 1] = [[u, far, int(neighbors[outside, iw])], [far, w, int(neighbors[outside, iu])]]
+            cavity.append(outside)
+
+        if on_edges:
+            expand(on_edges[0])
+
+        # zamiany przekątnych: trójkąt za krawędzią brzegu dołącza do wnęki, jeśli jego trzeci wierzchołek leży
+        # w okręgu opisanym na nowym trójkącie, a wnęka pozostaje gwiaździsta względem wstawianego punktu
+        i = 0
+        while i < len(ring):
+            u, w, outside = ring[i]
+            if outside >= 0:
+                triangle = triangles[outside].tolist()
+                far = triangle[3 - triangle.index(u) - triangle.index(w)]
+                pu, pw, pf = self.__point(u), self.__point(w), self.__point(far)
+                if (incircle(x, y, *pu, *pw, *pf) > 0 and orientation(x, y, *pu, *pf) > 0 and orientation(x, y, *pf, *pw) > 0):
+                    expand(i)
+                    continue
+            i += 1
+
+        vertex = len(self.__vertices)
+        self.__vertices.append([[x, y]])
+        self.__vertex_leaf.append([-1])
+
+        m = len(ring)
+        hole = [u for u, _, _ in ring]
+        position = {u: i for i, u in enumerate(hole)}
+
+        # nowy trójkąt i leży nad krawędzią brzegu i, czyli w wycinku i + 1 w sensie `link_hole`
+        new_triangles = [(vertex, u, w) for u, w, _ in ring]
+        new_neighbors = [[outside, -2 - (i + 1) % m, -2 - (i - 1) % m] for i, (_, _, outside) in enumerate(ring)]
+        links = link_hole((x, y), self.__vertices.view[hole], [tuple(position[v] for v in triangles[node].tolist()) for node in cavity])
+        children = [[-2 - (sector - 1) % m for sector in sectors] for sectors in links]
+
+        first = len(self.__triangles)
+        for i, (u, w, outside) in enumerate(ring):
+            self.__relink_outside(outside, u, w, first + i)
+        self.__replace(cavity, new_triangles, new_neighbors, children)
+
+        return vertex
+
+    def remove(self, vertex: int):
+        """
+        Usuwa wierzchołek z triangulacji, triangulując powstałą dziurę
+
+        Parameters
+        ----------
+            vertex: `int`
+                indeks usuwanego wierzchołka
+
+        Returns
+        -------
+            `None`
+
+        Raises
+        ------
+            `Exception`: jeśli wierzchołek nie istnieje albo należy do zewnętrznego trójkąta
+        """
+        if vertex in self.__outer_triangle:
+            raise Exception(f"Vertex {vertex} belongs to the outer triangle and cannot be removed")
+        if not 0 <= vertex < len(self.__vertices) or self.__vertex_leaf.view[vertex] < 0:
+            raise Exception(f"Vertex {vertex} does not exist")
+
+        triangles, neighbors = self.__triangles.view, self.__neighbors.view
+
+        # gwiazda wierzchołka: trójkąt star[j] to (vertex, hole[j], hole[j+1]), a outside[j] leży za krawędzią brzegu j
+        star, hole, outside = [], [], []
+        node = first = int(self.__vertex_leaf.view[vertex])
+        while True:
+            triangle = triangles[node].tolist()
+            k = triangle.index(vertex)
+            star.append(node)
+            hole.append(triangle[(k + 1) % 3])
+            outside.append(int(neighbors[node, k]))
+            node = int(neighbors[node, (k + 1) % 3])
+            if node == first:
+                break
+
+        m = len(hole)
+        local = triangulate_hole(self.__vertices.view[hole])
+        links = link_hole(self.__point(vertex), self.__vertices.view[hole], local)
+
+        local_neighbors = leaf_neighbors(np.array(local, dtype=np.int64).reshape(-1, 3)).tolist()
+        new_triangles, new_neighbors = [], []
+        first_node = len(self.__triangles)
+        for i, triangle in enumerate(local):
+            row = []
+            for k in range(3):
+                u, w = triangle[(k + 1) % 3], triangle[(k + 2) % 3]
+                if local_neighbors[i][k] >= 0:
+                    row.append(-2 - local_neighbors[i][k])
+                else:
+                    # krawędź brzegu dziury (hole[u], hole[u+1]) sąsiaduje z trójkątem spoza gwiazdy
+                    row.append(outside[u])
+                    self.__relink_outside(outside[u], hole[u], hole[w], first_node + i)
+            new_triangles.append(tuple(hole[v] for v in triangle))
+            new_neighbors.append(row)
+
+        # wycinek s w sensie `link_hole` to trójkąt gwiazdy star[s-1]
+        children = [[] for _ in range(m)]
+        for i, sectors in enumerate(links):
+            for sector in sectors:
+                children[(sector - 1) % m].append(-2 - i)
+
+        self.__vertex_leaf.view[vertex] = -1
+        self.__replace(star, new_triangles, new_neighbors, children)
@@ -0,0 +1,102 @@
+"""
+Wybór struktury lokalizacji punktów.
+
+Wszystkie struktury korzystają z tej samej triangulacji i zwracają te same indeksy trójkątów, a różnią się kosztem
+budowy, zapytań i pamięci (zmierzone przez `benchmarks/run.py --engines`):
+    - `walk` (`WalkLocator`): budowa prawie darmowa, zapytanie to krótkie przejście po trójkątach, które jednak
+      wydłuża się dla zdegenerowanych danych (długich, wąskich trójkątów)
+    - `slab` (`SlabLocator`): najszybsze zapytania, ale budowa i pamięć rosną szybciej niż liniowo (w najgorszym
+      przypadku kwadratowo), więc tylko dla małych triangulacji
+    - `kirkpatrick` (`Kirkpatrick`): najdroższa budowa, ale pamięć `O(n)` i zapytania `O(log n)` niezależnie od danych
+"""
+from typing import Dict, List, Type, Union
+from kirkpatrick_algorithm.kirkpatrick_point_location.jump_walk import WalkLocator
+from kirkpatrick_algorithm.kirkpatrick_point_location.locator import Locator
+from kirkpatrick_algorithm.kirkpatrick_point_location.point_location import Kirkpatrick
+from kirkpatrick_algorithm.kirkpatrick_point_location.slab import SlabLocator
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangulation import Triangulation
+
+ENGINES: Dict[str, Type[Locator]] = {
+    'kirkpatrick': Kirkpatrick,
+    'slab': SlabLocator,
+    'walk': WalkLocator,
+}
+
+# największa triangulacja, dla której `auto` wybiera podział na pasy; nawet dla zdegenerowanych danych podział ma
+# wtedy najwyżej około 0.75 * T^2 = 12 mln krawędzi (48 MiB)
+AUTO_SLAB_MAX_TRIANGLES = 4096
+
+# liczba zapytań na trójkąt, od której budowa drzewa Kirkpatricka (około 40 µs na trójkąt) zwraca się
+# na zapytaniach szybszych od przejścia po zdegenerowanej triangulacji
+AUTO_KIRKPATRICK_QUERIES_PER_TRIANGLE = 10
+
+
+def choose_engine(triangles: int, expected_queries: int = None) -> str:
+    """
+    Wybiera strukturę lokalizacji o najmniejszym łącznym koszcie budowy i zapytań:
+        - `slab` dla triangulacji do `AUTO_SLAB_MAX_TRIANGLES` trójkątów, jeśli zapytań jest co najmniej `T^1.5 / 2`
+          (od tej liczby szybsze zapytania zwracają koszt budowy podziału)
+        - `kirkpatrick`, jeśli zapytań jest co najmniej `AUTO_KIRKPATRICK_QUERIES_PER_TRIANGLE` na trójkąt
+        - `walk` w pozostałych przypadkach
+
+    Parameters
+    ----------
+        triangles: `int`
+            liczba trójkątów triangulacji
+        expected_queries: `int`
+            spodziewana liczba lokalizowanych punktów; domyślnie nieograniczona
+
+    Returns
+    -------
+        `str`: nazwa struktury w `ENGINES`
+    """
+    queries = float('inf') if expected_queries is None else expected_queries
+
+    if triangles <= AUTO_SLAB_MAX_TRIANGLES and queries >= triangles ** 1.5 / 2:
+        return 'slab'
+    if queries >= AUTO_KIRKPATRICK_QUERIES_PER_TRIANGLE * triangles:
+        return 'kirkpatrick'
+
+    return 'walk'
+
+
+def build_locator(polygon: Union[List[tuple[float, float]], Triangulation], holes: List[List[tuple[float, float]]] = None,
+                  constrained: bool = False, engine: str = 'auto', expected_queries: int = None, **options) -> Locator:
+    """
+    Trianguluje punkty wejściowe jak konstruktor klasy `Kirkpatrick` i buduje wybraną strukturę lokalizacji
+
+    Parameters
+    ----------
+        polygon: `List[tuple[float, float]]` lub `Triangulation`
+            punkty chmury punktów albo wierzchołki wielokąta; można też podać gotową triangulację
+            (np. z `Triangulation.from_subdivision`), wtedy `holes` i `constrained` są pomijane
+        holes: `List[List[tuple[float, float]]]`
+            wierzchołki kolejnych dziur wielokąta; podanie dziur oznacza `constrained=True`
+        constrained: `bool`
+            jeśli `True`, triangulacja zawiera boki wielokąta (i jego dziur)
+        engine: `str`
+            nazwa struktury z `ENGINES` albo `'auto'`, by wybrać ją funkcją `choose_engine`
+        expected_queries: `int`
+            spodziewana liczba lokalizowanych punktów, używana przy `engine='auto'`
+        options:
+            parametry funkcji `build` wybranej struktury
+
+    Returns
+    -------
+        `Locator`: zbudowana struktura
+
+    Raises
+    ------
+        `Exception`: jeśli podano nieznaną strukturę albo triangulacja lub budowa się nie powiodła
+    """
+    triangulation = polygon if isinstance(polygon, Triangulation) else Triangulation.from_polygon(polygon, holes, constrained)
+
+    if engine == 'auto':
+        engine = choose_engine(len(triangulation), expected_queries)
+    if engine not in ENGINES:
+        raise Exception(f"Unknown point location engine: {engine}")
+
+    locator = ENGINES[engine].from_triangulation(triangulation)
+    locator.build(**options)
+
+    return locator
@@ -0,0 +1,111 @@
+from typing import List
+import time
+import mapbox_earcut as earcut
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation
+
+
+def triangulate_hole(hole: np.ndarray) -> List[tuple[int, int, int]]:
+    """
+    Trianguluje dziurę powstałą po usunięciu wierzchołka algorytmem earcut
+
+    Parameters
+    ----------
+        hole: `np.ndarray`
+            współrzędne wierzchołków brzegu dziury uporządkowane przeciwnie do ruchu wskazówek zegara, kształt `(m, 2)`
+
+    Returns
+    -------
+        `List[tuple[int, int, int]]`: trójkąty jako trójki indeksów wierzchołków brzegu dziury,
+        zorientowane przeciwnie do ruchu wskazówek zegara
+    """
+    result = earcut.triangulate_float64(hole, np.array([len(hole)]))
+    points = hole.tolist()
+
+    triangles = []
+    for a, b, c in result.reshape(-1, 3).tolist():
+        if orientation(*points[a], *points[b], *points[c]) < 0:
+            b, c = c, b
+        triangles.append((a, b, c))
+
+    return triangles
+
+
+def link_hole(center: tuple[float, float], hole: np.ndarray, triangles: List[tuple[int, int, int]]) -> List[List[int]]:
+    """
+    Wyznacza, które usunięte trójkąty nakładają się na nowe trójkąty dziury.
+
+    Usunięte trójkąty tworzą wachlarz wokół usuniętego wierzchołka: trójkąt `i` to `(center, hole[i-1], hole[i])`
+    i zajmuje wycinek kątowy między półprostymi `center -> hole[i-1]` i `center -> hole[i]`. Ponieważ dziura jest
+    gwiaździsta względem `center`, nowy trójkąt nakłada się na usunięty trójkąt `i` dokładnie wtedy, gdy jego
+    zakres kątowy widziany z `center` ma z tym wycinkiem część wspólną o dodatniej mierze. Zakres ten składa się
+    z łuków między kolejnymi wierzchołkami nowego trójkąta, na których leżą one w skręcie w lewo względem `center`.
+    Dzięki temu powiązanie jest liniowe względem rozmiaru dziury i poprawne również wtedy, gdy jeden trójkąt
+    zawiera drugi bez przecinania się krawędzi.
+
+    Parameters
+    ----------
+        center: `tuple[float, float]`
+            współrzędne usuniętego wierzchołka
+        hole: `np.ndarray`
+            współrzędne wierzchołków brzegu dziury uporządkowane przeciwnie do ruchu wskazówek zegara, kształt `(m, 2)`
+        triangles: `List[tuple[int, int, int]]`
+            nowe trójkąty dziury jako trójki indeksów wierzchołków brzegu dziury
+
+    Returns
+    -------
+        `List[List[int]]`: dla każdego nowego trójkąta lista indeksów usuniętych trójkątów, na które się nakłada
+    """
+    m = len(hole)
+    points = hole.tolist()
+
+    links = []
+    for triangle in triangles:
+        i, j, k = sorted(triangle)
+        sectors = []
+        for start, end in ((i, j), (j, k), (k, i + m)):
+            if orientation(*center, *points[start], *points[end % m]) > 0:
+                sectors.extend(sector % m for sector in range(start + 1, end + 1))
+        links.append(sorted(sectors))
+
+    return links
+
+
+def retriangulate_holes(centers: np.ndarray, points: np.ndarray, offsets: np.ndarray, timings: List[float] = None) -> List[tuple[List[tuple[int, int, int]], List[List[int]]]]:
+    """
+    Trianguluje i wiąże z usuniętymi trójkątami wiele dziur naraz. Dziury powstałe w jednej rundzie mają rozłączne
+    wnętrza, a triangulacja dziury zależy tylko od jej brzegu, więc funkcję można wywoływać niezależnie
+    (także w różnych procesach) dla różnych fragmentów listy dziur.
+
+    Parameters
+    ----------
+        centers: `np.ndarray`
+            współrzędne usuniętych wierzchołków, kształt `(H, 2)`
+        points: `np.ndarray`
+            złączone współrzędne wierzchołków brzegów dziur, kształt `(M, 2)`
+        offsets: `np.ndarray`
+            brzeg dziury `i` to `points[offsets[i]:offsets[i+1]]`, kształt `(H+1,)`
+        timings: `List[float]`
+            jeśli podano, do `timings[0]` dodawany jest czas triangulacji dziur, a do `timings[1]` czas ich wiązania
+
+    Returns
+    -------
+        `List[tuple[List[tuple[int, int, int]], List[List[int]]]]`: dla każdej dziury wynik `triangulate_hole`
+        oraz `link_hole`
+    """
+    results = []
+    for center, start, end in zip(centers.tolist(), offsets[:-1].tolist(), offsets[1:].tolist()):
+        hole = points[start:end]
+        if timings is None:
+            triangles = triangulate_hole(hole)
+            results.append((triangles, link_hole(tuple(center), hole, triangles)))
+            continue
+
+        started = time.perf_counter()
+        triangles = triangulate_hole(hole)
+        triangulated = time.perf_counter()
+        results.append((triangles, link_hole(tuple(center), hole, triangles)))
+        timings[0] += triangulated - started
+        timings[1] += time.perf_counter() - triangulated
+
+    return results
@@ -0,0 +1,110 @@
+"""
+Strategie wyboru zbioru niezależnego wierzchołków usuwanych w jednej rundzie przetwarzania.
+
+W triangulacji o `n` wierzchołkach co najmniej `n/2` wierzchołków ma stopień nie większy niż 8, a każdy wybrany
+wierzchołek blokuje najwyżej 8 sąsiadów. Dlatego przy `max_degree >= 8` każda strategia usuwa w rundzie co najmniej
+`(n - 6) / 18` wierzchołków, a głębokość drzewa jest rzędu `O(log n)`. Strategie różnią się stałą w tym oszacowaniu.
+"""
+from typing import Callable, Dict, Iterable, List, Set
+import random
+from kirkpatrick_algorithm.kirkpatrick_point_location.adjacency import VertexAdjacency
+
+
+def _select(adjacency: VertexAdjacency, candidates: Iterable[int]) -> List[int]:
+    """
+    Wybiera zachłannie zbiór niezależny, rozpatrując kandydatów w podanej kolejności
+    """
+    visited = set()
+    independent_set = []
+
+    for point in candidates:
+        if point not in visited:
+            independent_set.append(point)
+            visited.update(adjacency.neighbors(point))
+
+    return independent_set
+
+
+def _candidates(adjacency: VertexAdjacency, excluded: Set[int], max_degree: int) -> List[int]:
+    """
+    Zwraca wierzchołki, które mogą należeć do zbioru niezależnego, w kolejności rosnących indeksów
+    """
+    return [point for point in adjacency.vertices() if point not in excluded and adjacency.degree(point) <= max_degree]
+
+
+def greedy(adjacency: VertexAdjacency, excluded: Set[int], max_degree: int, rng: random.Random) -> List[int]:
+    """
+    Rozpatruje wierzchołki w kolejności rosnących indeksów. Liczba rund zależy od numeracji wierzchołków.
+
+    Parameters
+    ----------
+        adjacency: `VertexAdjacency`
+            aktualna triangulacja
+        excluded: `Set[int]`
+            wierzchołki, których nie wolno usunąć (wierzchołki zewnętrznego trójkąta)
+        max_degree: `int`
+            maksymalny stopień usuwanego wierzchołka
+        rng: `random.Random`
+            generator liczb losowych (nieużywany)
+
+    Returns
+    -------
+        `List[int]`: indeksy wierzchołków tworzących zbiór niezależny
+    """
+    return _select(adjacency, _candidates(adjacency, excluded, max_degree))
+
+
+def low_degree(adjacency: VertexAdjacency, excluded: Set[int], max_degree: int, rng: random.Random) -> List[int]:
+    """
+    Rozpatruje wierzchołki od najmniejszego stopnia. Wybrany wierzchołek stopnia `d` blokuje tylko `d` sąsiadów,
+    więc zbiór jest zwykle większy niż przy strategii `greedy`, a drzewo płytsze.
+
+    Parameters
+    ----------
+        adjacency: `VertexAdjacency`
+            aktualna triangulacja
+        excluded: `Set[int]`
+            wierzchołki, których nie wolno usunąć (wierzchołki zewnętrznego trójkąta)
+        max_degree: `int`
+            maksymalny stopień usuwanego wierzchołka
+        rng: `random.Random`
+            generator liczb losowych (nieużywany)
+
+    Returns
+    -------
+        `List[int]`: indeksy wierzchołków tworzących zbiór niezależny
+    """
+    return _select(adjacency, sorted(_candidates(adjacency, excluded, max_degree), key=adjacency.degree))
+
+
+def randomized(adjacency: VertexAdjacency, excluded: Set[int], max_degree: int, rng: random.Random) -> List[int]:
+    """
+    Rozpatruje wierzchołki w losowej kolejności. Przy ustalonym ziarnie wynik jest powtarzalny.
+
+    Parameters
+    ----------
+        adjacency: `VertexAdjacency`
+            aktualna triangulacja
+        excluded: `Set[int]`
+            wierzchołki, których nie wolno usunąć (wierzchołki zewnętrznego trójkąta)
+        max_degree: `int`
+            maksymalny stopień usuwanego wierzchołka
+        rng: `random.Random`
+            generator liczb losowych
+
+    Returns
+    -------
+        `List[int]`: indeksy wierzchołków tworzących zbiór niezależny
+    """
+    candidates = _candidates(adjacency, excluded, max_degree)
+    rng.shuffle(candidates)
+    return _select(adjacency, candidates)
+
+
+IndependentSetStrategy = Callable[[VertexAdjacency, Set[int], int, random.Random], List[int]]
+
+STRATEGIES: Dict[str, IndependentSetStrategy] = {
+    'greedy': greedy,
+    'low_degree': low_degree,
+    'random': randomized,
+}
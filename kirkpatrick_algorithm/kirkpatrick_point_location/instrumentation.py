@@ -0,0 +1,175 @@
+"""
+Pomiary czasu i liczniki przetwarzania oraz zapytań.
+
+Pomiary włącza się funkcją `Kirkpatrick.enable_stats`, która zwraca obiekt `Stats` wypełniany w trakcie kolejnych
+wywołań `preprocess`, `rebalance` i zapytań. Gdy pomiary są wyłączone, jedynym kosztem jest sprawdzenie, czy obiekt
+`Stats` istnieje (raz na zapytanie albo rundę) oraz w predykatach, czy włączono ich zliczanie.
+
+Każdy zapisany pomiar może być dodatkowo przekazany do funkcji `hook(name, value, tags)`, np. w celu wysłania go
+do zewnętrznego systemu metryk:
+    - `phase.<faza>`: czas fazy w sekundach (`delaunay`, `constraints`, `planar_map`, `setup`, `independent_set`,
+      `removal`, `triangulation`, `linking`, `compile`), dla faz rundy z etykietą `round`
+    - `round.removed`, `round.holes`, `round.triangles`: liczba usuniętych wierzchołków, striangulowanych dziur
+      i nowych trójkątów rundy, z etykietą `round`
+    - `predicate.<predykat>`: liczba wywołań predykatu w trakcie przetwarzania (`orientation`, `orientation_exact`,
+      `incircle`, `incircle_exact`)
+    - `query.points`, `query.nodes_visited`, `query.containment_tests`, `query.walk_steps`: wartości dla jednego
+      wywołania funkcji zapytania, z etykietą `method`
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple
+from kirkpatrick_algorithm.kirkpatrick_point_location import predicates
+
+Hook = Callable[[str, float, Dict[str, object]], None]
+
+PREDICATES = ('orientation', 'orientation_exact', 'incircle', 'incircle_exact')
+
+
+class RoundStats(NamedTuple):
+    """
+    Pomiary jednej rundy usuwania zbioru niezależnego
+    """
+    round: int
+    vertices: int
+    removed: int
+    holes: int
+    triangles: int
+    independent_set: float
+    removal: float
+    triangulation: float
+    linking: float
+
+    @property
+    def seconds(self) -> float:
+        return self.independent_set + self.removal + self.triangulation + self.linking
+
+
+class QueryCounters:
+    """
+    Liczniki jednego wywołania funkcji zapytania: odwiedzone wierzchołki drzewa, testy przynależności punktu
+    do trójkąta oraz kroki przechodzenia po sąsiednich liściach
+    """
+    __slots__ = ('nodes', 'tests', 'steps')
+
+    def __init__(self):
+        self.nodes = 0
+        self.tests = 0
+        self.steps = 0
+
+
+class Stats:
+    """
+    Zebrane pomiary. Czasy faz są sumowane po wszystkich przetworzeniach (także przebudowach po zmianach
+    przyrostowych), a liczniki zapytań po wszystkich zapytaniach od włączenia pomiarów albo wywołania `reset`.
+    """
+
+    def __init__(self, hook: Hook = None):
+        self.hook = hook
+        self.reset()
+
+    def reset(self):
+        """
+        Zeruje wszystkie pomiary
+        """
+        self.phases: Dict[str, float] = {}
+        self.rounds: List[RoundStats] = []
+        self.predicates: Dict[str, int] = dict.fromkeys(PREDICATES, 0)
+        self.queries = 0
+        self.nodes_visited = 0
+        self.containment_tests = 0
+        self.walk_steps = 0
+
+    def emit(self, name: str, value: float, **tags):
+        """
+        Przekazuje pomiar do funkcji `hook`, jeśli ją podano
+        """
+        if self.hook is not None:
+            self.hook(name, value, tags)
+
+    def add_phase(self, name: str, seconds: float, **tags):
+        """
+        Dodaje czas fazy przetwarzania
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.emit(f"phase.{name}", seconds, **tags)
+
+    def add_round(self, round_stats: RoundStats):
+        """
+        Dodaje pomiary rundy usuwania zbioru niezależnego
+        """
+        self.rounds.append(round_stats)
+        for name in ('independent_set', 'removal', 'triangulation', 'linking'):
+            self.add_phase(name, getattr(round_stats, name), round=round_stats.round)
+        for name in ('removed', 'holes', 'triangles'):
+            self.emit(f"round.{name}", getattr(round_stats, name), round=round_stats.round)
+
+    def add_query(self, method: str, points: int, counters: QueryCounters):
+        """
+        Dodaje liczniki jednego wywołania funkcji zapytania
+        """
+        self.queries += points
+        self.nodes_visited += counters.nodes
+        self.containment_tests += counters.tests
+        self.walk_steps += counters.steps
+
+        if self.hook is not None:
+            self.emit('query.points', points, method=method)
+            self.emit('query.nodes_visited', counters.nodes, method=method)
+            self.emit('query.containment_tests', counters.tests, method=method)
+            self.emit('query.walk_steps', counters.steps, method=method)
+
+    @contextmanager
+    def counting_predicates(self, emit: bool = False) -> Iterator[None]:
+        """
+        Zlicza wywołania predykatów wewnątrz bloku `with`. Liczniki predykatów są wspólne dla całego procesu,
+        więc obejmują też wywołania z innych wątków wykonywane w tym czasie.
+
+        Parameters
+        ----------
+            emit: `bool`
+                jeśli `True`, po zakończeniu bloku liczby wywołań są przekazywane do funkcji `hook`
+        """
+        counts = dict.fromkeys(PREDICATES, 0)
+        previous = predicates.count_calls(counts)
+        try:
+            yield
+        finally:
+            predicates.count_calls(previous)
+            for name, count in counts.items():
+                self.predicates[name] += count
+                if previous is not None:
+                    previous[name] += count
+                if emit:
+                    self.emit(f"predicate.{name}", count)
+
+    def summary(self) -> dict:
+        """
+        Zwraca pomiary jako słownik:
+            - `phases`: suma czasów kolejnych faz w sekundach
+            - `rounds`: pomiary kolejnych rund jako słowniki
+            - `predicates`: liczba wywołań predykatów (`*_exact` to wywołania obliczeń dokładnych)
+            - `queries`: liczba zlokalizowanych punktów
+            - `nodes_visited`, `containment_tests`, `walk_steps`: sumy liczników zapytań
+            - `mean_nodes_visited`, `mean_containment_tests`: średnie liczniki na punkt
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `dict`: słownik z pomiarami
+        """
+        queries = max(self.queries, 1)
+
+        return {
+            'phases': dict(self.phases),
+            'rounds': [dict(round_stats._asdict(), seconds=round_stats.seconds) for round_stats in self.rounds],
+            'predicates': dict(self.predicates),
+            'queries': self.queries,
+            'nodes_visited': self.nodes_visited,
+            'containment_tests': self.containment_tests,
+            'walk_steps': self.walk_steps,
+            'mean_nodes_visited': self.nodes_visited / queries,
+            'mean_containment_tests': self.containment_tests / queries,
+        }
@@ -0,0 +1,92 @@
+"""
+Jądro przeszukiwania drzewa kompilowane biblioteką `numba` (wczytywane tylko przez moduł `kernels`, gdy jest ona
+zainstalowana). Funkcje odpowiadają `predicates.orientation`, `SearchDAG.contains` i `SearchDAG.locate`, ale zamiast
+liczyć dokładnie niepewne orientacje zwracają `UNRESOLVED`.
+"""
+import numba
+from kirkpatrick_algorithm.kirkpatrick_point_location.kernels import UNRESOLVED
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import ORIENTATION_ERROR_BOUND
+
+
+@numba.njit(nogil=True, cache=True)
+def _orientation(ax, ay, bx, by, cx, cy):
+    """
+    Znak orientacji trzech punktów albo `UNRESOLVED`, jeśli nie jest pewny (jak w `predicates.orientation`)
+    """
+    dx1, dy1, dx2, dy2 = bx - ax, by - ay, cx - ax, cy - ay
+    left = dx1 * dy2
+    right = dy1 * dx2
+    result = left - right
+
+    if abs(result) > ORIENTATION_ERROR_BOUND * (abs(left) + abs(right)):
+        return 1 if result > 0 else -1
+
+    # różnica liczb zmiennoprzecinkowych jest zerem tylko dla równych liczb, więc jeśli w obu iloczynach jest zerowy
+    # czynnik, dokładna orientacja jest zerowa (np. punkt na poziomej lub pionowej krawędzi)
+    if (dx1 == 0 or dy2 == 0) and (dy1 == 0 or dx2 == 0):
+        return 0
+    # punkt pokrywający się z końcem krawędzi
+    if cx == bx and cy == by:
+        return 0
+
+    return UNRESOLVED
+
+
+@numba.njit(nogil=True, cache=True)
+def _contains(vertices, triangles, node, x, y):
+    """
+    Przynależność punktu do domkniętego trójkąta jak w `SearchDAG.contains`: 1, 0 albo `UNRESOLVED`
+    """
+    a, b, c = triangles[node, 0], triangles[node, 1], triangles[node, 2]
+    x1, y1, x2, y2, x3, y3 = vertices[a, 0], vertices[a, 1], vertices[b, 0], vertices[b, 1], vertices[c, 0], vertices[c, 1]
+
+    first = _orientation(x1, y1, x2, y2, x, y)
+    if first == UNRESOLVED:
+        return UNRESOLVED
+    if first < 0:
+        return 0
+    second = _orientation(x2, y2, x3, y3, x, y)
+    if second == UNRESOLVED:
+        return UNRESOLVED
+    if second < 0:
+        return 0
+    third = _orientation(x3, y3, x1, y1, x, y)
+    if third == UNRESOLVED:
+        return UNRESOLVED
+
+    return 1 if third >= 0 and (first != 0 or second != 0 or third != 0) else 0
+
+
+@numba.njit(nogil=True, cache=True)
+def descend(vertices, triangles, child_starts, child_ends, child_indices, root, points, start, result):
+    """
+    Schodzi po drzewie dla każdego punktu paczki jak `SearchDAG.locate`, zapisując numer liścia, -1 albo `UNRESOLVED`
+    """
+    for i in range(len(points)):
+        x, y = points[i, 0], points[i, 1]
+
+        current = start[i]
+        if current < 0:
+            inside = _contains(vertices, triangles, root, x, y)
+            if inside != 1:
+                result[i] = UNRESOLVED if inside == UNRESOLVED else -1
+                continue
+            current = root
+
+        while child_starts[current] != child_ends[current]:
+            found = -1
+            for k in range(child_starts[current], child_ends[current]):
+                child = child_indices[k]
+                inside = _contains(vertices, triangles, child, x, y)
+                if inside == UNRESOLVED:
+                    found = UNRESOLVED
+                    break
+                if inside == 1:
+                    found = child
+                    break
+
+            current = found
+            if current < 0:
+                break
+
+        result[i] = current
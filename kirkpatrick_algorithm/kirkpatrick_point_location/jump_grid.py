@@ -0,0 +1,258 @@
+"""
+Siatka przyspieszająca przeszukiwanie drzewa.
+
+Prostokąt obejmujący wielokąt dzielony jest na jednakowe komórki, a każda komórka pamięta najgłębszy wierzchołek
+drzewa, którego trójkąt zawiera ją całą we wnętrzu (albo liść, jeśli komórka leży w jednym trójkącie triangulacji).
+Trójkąty istniejące jednocześnie w jednej rundzie mają rozłączne wnętrza, więc ścieżka od korzenia do liścia
+każdego punktu leżącego we wnętrzu trójkąta wierzchołka przechodzi przez ten wierzchołek. Przeszukiwanie może więc
+zacząć się od wierzchołka komórki i daje taki sam wynik jak przeszukiwanie od korzenia.
+
+W wersji adaptacyjnej komórki zawierające wiele wierzchołków wielokąta są dzielone rekurencyjnie na cztery (drzewo
+czwórkowe), więc gęste skupiska punktów dostają drobniejsze komórki niż puste obszary.
+"""
+from typing import Tuple, Union
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.search_dag import SearchDAG
+
+
+def _inside(dag: SearchDAG, nodes: np.ndarray, x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray) -> np.ndarray:
+    """
+    Sprawdza, czy komórki leżą we wnętrzach trójkątów wierzchołków drzewa. Trójkąt jest wypukły,
+    więc wystarczy sprawdzić cztery rogi komórki.
+    """
+    result = np.ones(len(nodes), dtype=bool)
+    for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1)):
+        result &= dag.contains_many(nodes, np.column_stack((x, y)), strict=True)
+
+    return result
+
+
+def _descend(dag: SearchDAG, nodes: np.ndarray, x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray) -> np.ndarray:
+    """
+    Dla każdej komórki schodzi od podanego wierzchołka tak długo, jak któreś dziecko zawiera całą komórkę.
+    Zwraca -1 dla komórek, które nie leżą we wnętrzu wierzchołka początkowego.
+    """
+    current = np.array(nodes, dtype=np.int64)
+    outside = ~_inside(dag, current, x0, y0, x1, y1)
+    current[outside] = -1
+    active = np.flatnonzero(~outside)
+
+    while active.size:
+        starts = dag.child_starts[current[active]]
+        counts = dag.child_ends[current[active]] - starts
+
+        found = np.full(len(active), -1, dtype=np.int64)
+        for j in range(counts.max(initial=0)):
+            candidates = np.flatnonzero((found < 0) & (counts > j))
+            children = dag.child_indices[starts[candidates] + j]
+            cells = active[candidates]
+            inside = _inside(dag, children, x0[cells], y0[cells], x1[cells], y1[cells])
+            found[candidates[inside]] = children[inside]
+
+        located = found >= 0
+        current[active[located]] = found[located]
+        active = active[located]
+
+    return current
+
+
+class JumpGrid:
+    """
+    Siatka (opcjonalnie z komórkami podzielonymi w drzewo czwórkowe) wskazująca wierzchołki drzewa,
+    od których można zacząć przeszukiwanie.
+
+    Komórka `(ix, iy)` siatki ma numer `iy * nx + ix`. Wierzchołek drzewa komórki `c` to `nodes[c]` (-1, jeśli
+    komórka nie leży we wnętrzu korzenia), a `children[c]` to numer pierwszej z czterech podkomórek
+    (kolejno lewa dolna, prawa dolna, lewa górna, prawa górna) lub -1, jeśli komórka nie jest dzielona.
+    """
+    __slots__ = ('dag', 'bounds', 'shape', 'nodes', 'children')
+
+    def __init__(self, dag: SearchDAG, bounds: Tuple[float, float, float, float], shape: Tuple[int, int], nodes: np.ndarray, children: np.ndarray):
+        self.dag = dag
+        self.bounds = bounds
+        self.shape = shape
+        self.nodes = nodes
+        self.children = children
+
+    @staticmethod
+    def build(dag: SearchDAG, points: np.ndarray, resolution: Union[int, Tuple[int, int]] = None,
+              adaptive: bool = False, max_depth: int = 8, capacity: int = 4) -> 'JumpGrid':
+        """
+        Buduje siatkę dla przetworzonego drzewa
+
+        Parameters
+        ----------
+            dag: `SearchDAG`
+                skompilowane drzewo przeszukiwania
+            points: `np.ndarray`
+                wierzchołki wielokąta (bez zewnętrznego trójkąta), kształt `(V, 2)`. Siatka pokrywa ich prostokąt otaczający.
+            resolution: `int` lub `Tuple[int, int]`
+                liczba komórek w każdym wymiarze albo para `(nx, ny)`, domyślnie tyle, by na komórkę przypadał
+                średnio jeden wierzchołek
+            adaptive: `bool`
+                jeśli `True`, komórki zawierające więcej niż `capacity` wierzchołków i nieleżące w jednym liściu
+                są dzielone na cztery
+            max_depth: `int`
+                maksymalna liczba podziałów komórki siatki w wersji adaptacyjnej
+            capacity: `int`
+                liczba wierzchołków w komórce, powyżej której komórka jest dzielona w wersji adaptacyjnej
+
+        Returns
+        -------
+            `JumpGrid`: zbudowana siatka
+
+        Raises
+        ------
+            `Exception`: jeśli rozdzielczość nie jest dodatnia
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if resolution is None:
+            resolution = max(1, int(np.ceil(np.sqrt(len(points)))))
+        nx, ny = (resolution, resolution) if np.isscalar(resolution) else resolution
+        nx, ny = int(nx), int(ny)
+        if nx < 1 or ny < 1:
+            raise Exception(f"Grid resolution must be positive, got {resolution}")
+
+        min_x, min_y = points.min(axis=0).tolist()
+        max_x, max_y = points.max(axis=0).tolist()
+        width, height = (max_x - min_x) / nx, (max_y - min_y) / ny
+
+        iy, ix = np.divmod(np.arange(nx * ny), nx)
+        x0, y0 = min_x + ix * width, min_y + iy * height
+        x1, y1 = x0 + width, y0 + height
+
+        level_nodes = _descend(dag, np.full(nx * ny, dag.root, dtype=np.int64), x0, y0, x1, y1)
+        nodes, children = [level_nodes], [np.full(nx * ny, -1, dtype=np.int64)]
+        count = nx * ny
+
+        if adaptive:
+            # komórka każdego wierzchołka na bieżącym poziomie drzewa czwórkowego (numerowana w obrębie poziomu)
+            cells = (np.minimum(((points[:, 1] - min_y) / height).astype(np.int64), ny - 1) * nx +
+                     np.minimum(((points[:, 0] - min_x) / width).astype(np.int64), nx - 1))
+
+            for _ in range(max_depth):
+                occupancy = np.bincount(cells, minlength=len(level_nodes))
+                is_leaf = dag.child_ends[level_nodes] == dag.child_starts[level_nodes]
+                parents = np.flatnonzero((level_nodes >= 0) & ~is_leaf & (occupancy > capacity))
+                if not parents.size:
+                    break
+
+                children[-1][parents] = count + 4 * np.arange(len(parents))
+
+                px0, py0, px1, py1 = x0[parents], y0[parents], x1[parents], y1[parents]
+                mx, my = (px0 + px1) / 2, (py0 + py1) / 2
+
+                position = np.full(len(level_nodes), -1, dtype=np.int64)
+                position[parents] = np.arange(len(parents))
+                kept = position[cells] >= 0
+                cells, owner = cells[kept], position[cells[kept]]
+                points = points[kept]
+                cells = 4 * owner + (points[:, 0] >= mx[owner]) + 2 * (points[:, 1] >= my[owner])
+
+                x0 = np.stack((px0, mx, px0, mx), axis=1).ravel()
+                y0 = np.stack((py0, py0, my, my), axis=1).ravel()
+                x1 = np.stack((mx, px1, mx, px1), axis=1).ravel()
+                y1 = np.stack((my, my, py1, py1), axis=1).ravel()
+
+                level_nodes = _descend(dag, np.repeat(level_nodes[parents], 4), x0, y0, x1, y1)
+                nodes.append(level_nodes)
+                children.append(np.full(len(level_nodes), -1, dtype=np.int64))
+                count += len(level_nodes)
+
+        return JumpGrid(dag, (min_x, min_y, max_x, max_y), (nx, ny), np.concatenate(nodes), np.concatenate(children))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Rozmiar tablic siatki w bajtach
+        """
+        return self.nodes.nbytes + self.children.nbytes
+
+    def start_nodes(self, points: np.ndarray) -> np.ndarray:
+        """
+        Wyznacza wierzchołki drzewa, od których można zacząć lokalizację punktów
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                punkty do lokalizacji, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: wierzchołki, we wnętrzu których leżą punkty, albo -1 dla punktów, które trzeba
+            lokalizować od korzenia, kształt `(N,)`
+        """
+        min_x, min_y, max_x, max_y = self.bounds
+        nx, ny = self.shape
+        x, y = points[:, 0], points[:, 1]
+
+        width = np.full(len(points), (max_x - min_x) / nx)
+        height = np.full(len(points), (max_y - min_y) / ny)
+        with np.errstate(invalid='ignore'):
+            ix, iy = np.floor((x - min_x) / width[:1]), np.floor((y - min_y) / height[:1])
+            valid = np.flatnonzero((ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny))
+
+        ix, iy = ix[valid].astype(np.int64), iy[valid].astype(np.int64)
+        cells = iy * nx + ix
+        x0, y0 = min_x + ix * width[valid], min_y + iy * height[valid]
+        width, height = width[valid], height[valid]
+
+        active = np.flatnonzero(self.children[cells] >= 0)
+        while active.size:
+            width[active] /= 2
+            height[active] /= 2
+            right = x[valid[active]] >= x0[active] + width[active]
+            top = y[valid[active]] >= y0[active] + height[active]
+            x0[active] += right * width[active]
+            y0[active] += top * height[active]
+            cells[active] = self.children[cells[active]] + right + 2 * top
+            active = active[self.children[cells[active]] >= 0]
+
+        result = np.full(len(points), -1, dtype=np.int64)
+        result[valid] = self.nodes[cells]
+
+        # zaokrąglenia przy wyznaczaniu komórki mogą przypisać punkt z brzegu sąsiedniej komórce,
+        # więc przynależność do wnętrza wierzchołka jest sprawdzana dokładnie
+        checked = np.flatnonzero(result >= 0)
+        result[checked[~self.dag.contains_many(result[checked], points[checked], strict=True)]] = -1
+
+        return result
+
+    def start_node(self, x: float, y: float) -> int:
+        """
+        Wersja `start_nodes` dla jednego punktu
+
+        Parameters
+        ----------
+            x: `float`
+                współrzędna x punktu
+            y: `float`
+                współrzędna y punktu
+
+        Returns
+        -------
+            `int`: wierzchołek, we wnętrzu którego leży punkt, albo -1
+        """
+        min_x, min_y, max_x, max_y = self.bounds
+        nx, ny = self.shape
+        width, height = (max_x - min_x) / nx, (max_y - min_y) / ny
+
+        if not (min_x <= x and min_y <= y):
+            return -1
+        ix, iy = int((x - min_x) // width), int((y - min_y) // height)
+        if ix >= nx or iy >= ny:
+            return -1
+
+        cell = iy * nx + ix
+        x0, y0 = min_x + ix * width, min_y + iy * height
+        while self.children[cell] >= 0:
+            width, height = width / 2, height / 2
+            right, top = x >= x0 + width, y >= y0 + height
+            x0, y0 = x0 + right * width, y0 + top * height
+            cell = int(self.children[cell]) + right + 2 * top
+
+        node = int(self.nodes[cell])
+        if node < 0 or not self.dag.contains(node, x, y, strict=True):
+            return -1
+
+        return node
@@ -0,0 +1,273 @@
+"""
+Lokalizacja punktów metodą jump-and-walk (E. Mücke, I. Saias, B. Zhu, "Fast randomized point location without
+preprocessing in two- and three-dimensional Delaunay triangulations").
+
+Z triangulacji losowana jest próbka trójkątów (punktów orientacyjnych), a zapytanie zaczyna się od trójkąta próbki,
+którego środek ciężkości leży najbliżej punktu (skok, drzewo k-d), i przechodzi po sąsiednich trójkątach przez
+krawędź, względem której punkt leży po złej stronie (visibility walk). Budowa to tylko wyznaczenie sąsiedztwa
+trójkątów i drzewa k-d próbki, więc struktura opłaca się, gdy zapytań jest niewiele w porównaniu z rozmiarem
+triangulacji. W triangulacji Delaunaya takie przejście zawsze dochodzi do celu; w triangulacji z ograniczeniami
+może się zapętlić, dlatego po `max_steps` krokach punkt lokalizowany jest przez sprawdzenie wszystkich trójkątów.
+"""
+from planegeometry.structures.planarmaps import Triangle
+from scipy.spatial import cKDTree
+from typing import List
+import time
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.locator import Locator
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation, orientation_many
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangulation import Triangulation, counterclockwise
+from kirkpatrick_algorithm.kirkpatrick_point_location.walk import leaf_neighbors
+
+# domyślna liczba trójkątów triangulacji przypadająca na jeden punkt orientacyjny
+WALK_LANDMARK_SPACING = 16
+
+# domyślna maksymalna liczba kroków przejścia, po której punkt lokalizowany jest przez sprawdzenie wszystkich trójkątów
+WALK_MAX_STEPS = 1024
+
+
+class WalkLocator(Locator):
+    """
+    Triangulacja z sąsiedztwem trójkątów i drzewem k-d środków ciężkości próbki trójkątów
+    """
+    name = 'walk'
+
+    def __init__(self, triangulation: Triangulation):
+        """
+            Konstruktor klasy WalkLocator. Struktura jest budowana dopiero funkcją `build`.
+
+            Parmeters
+            ---------
+                triangulation: `Triangulation`
+                    triangulacja, w której lokalizowane są punkty
+        """
+        self.__triangulation = triangulation
+        self.__store = None
+        self.__neighbors = None
+        self.__landmarks = None
+        self.__tree = None
+        self.__max_steps = WALK_MAX_STEPS
+        self.__build_seconds = None
+        self.__queries = 0
+        self.__steps = 0
+        self.__fallbacks = 0
+
+    def build(self, spacing: int = WALK_LANDMARK_SPACING, max_steps: int = WALK_MAX_STEPS, seed: int = 0):
+        """
+        Wyznacza sąsiedztwo trójkątów i losuje punkty orientacyjne
+
+        Parameters
+        ----------
+            spacing: `int`
+                liczba trójkątów przypadająca na jeden punkt orientacyjny; przejście ma średnio około `sqrt(spacing)` kroków
+            max_steps: `int`
+                maksymalna liczba kroków przejścia, po której sprawdzane są wszystkie trójkąty
+            seed: `int`
+                ziarno losowania punktów orientacyjnych
+
+        Returns
+        -------
+            `None`
+
+        Raises
+        ------
+            `Exception`: jeśli struktura została już zbudowana
+        """
+        if self.__store is not None:
+            raise Exception("Jump-and-walk locator is already built")
+
+        started = time.perf_counter()
+        points = np.asarray(self.__triangulation.points, dtype=np.float64)
+        triangles = counterclockwise(points, self.__triangulation.triangles)
+
+        rng = np.random.default_rng(seed)
+        count = max(1, -(-len(triangles) // max(spacing, 1)))
+        landmarks = np.sort(rng.choice(len(triangles), count, replace=False))
+
+        self.__neighbors = leaf_neighbors(triangles)
+        self.__landmarks = landmarks
+        self.__tree = cKDTree(points[triangles[landmarks]].mean(axis=1))
+        self.__max_steps = max_steps
+        self.__store = TriangleStore(points, triangles)
+        self.__build_seconds = time.perf_counter() - started
+
+    def __scan(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Lokalizuje punkty, sprawdzając wszystkie trójkąty; zwraca pierwszy trójkąt zawierający punkt albo -1
+        """
+        corners = self.__store.vertices[self.__store.triangles]
+        result = np.full(len(x), -1, dtype=np.int64)
+        for i, (px, py) in enumerate(zip(x.tolist(), y.tolist())):
+            inside = np.ones(len(corners), dtype=bool)
+            for a, b in ((1, 2), (2, 0), (0, 1)):
+                inside &= orientation_many(corners[:, a, 0], corners[:, a, 1], corners[:, b, 0], corners[:, b, 1], px, py) >= 0
+            found = np.flatnonzero(inside)
+            if found.size:
+                result[i] = found[0]
+
+        self.__fallbacks += len(x)
+
+        return result
+
+    def query(self, point: (float, float)) -> Triangle:
+        """
+        Lokalizuje punkt, przechodząc od najbliższego punktu orientacyjnego. Wynik jest zgodny z wynikiem `query_many`.
+
+        Parameters
+        ----------
+            point: `(float, float)`
+                Punkt do przeszukiwań
+
+        Returns
+        -------
+            `Triangle`: Znaleziony trójkąt albo `None` dla punktów spoza zewnętrznego trójkąta
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            raise Exception("Jump-and-walk locator is not built")
+
+        x, y = float(point[0]), float(point[1])
+        vertices, triangles, neighbors = self.__store.vertices, self.__store.triangles, self.__neighbors
+        current = int(self.__landmarks[self.__tree.query((x, y))[1]])
+        self.__queries += 1
+
+        steps = 0
+        while steps < self.__max_steps:
+            steps += 1
+            corners = vertices.take(triangles[current], axis=0).tolist()
+            # kolejność sprawdzania krawędzi zmienia się z krokiem, co utrudnia zapętlenie w triangulacji z ograniczeniami
+            for k in range(steps, steps + 3):
+                edge = k % 3
+                (x1, y1), (x2, y2) = corners[(edge + 1) % 3], corners[(edge + 2) % 3]
+                if orientation(x1, y1, x2, y2, x, y) < 0:
+                    current = int(neighbors[current, edge])
+                    break
+            else:
+                self.__steps += steps
+                return self.__store.triangle(current)
+
+            if current < 0:
+                self.__steps += steps
+                return None
+
+        self.__steps += steps
+        found = int(self.__scan(np.array([x]), np.array([y]))[0])
+
+        return self.__store.triangle(found) if found >= 0 else None
+
+    def query_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Lokalizuje wiele punktów naraz, wykonując kolejne kroki przejścia wektorowo dla całej paczki.
+        Wynik jest zgodny z wynikiem `query`.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, kształt `(N,)`.
+            Dla punktów spoza zewnętrznego trójkąta zwracane jest -1.
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            raise Exception("Jump-and-walk locator is not built")
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        vertices, triangles, neighbors = self.__store.vertices, self.__store.triangles, self.__neighbors
+        self.__queries += len(points)
+
+        result = np.full(len(points), -1, dtype=np.int64)
+        current = self.__landmarks[self.__tree.query(points)[1]].astype(np.int64)
+        active = np.arange(len(points))
+
+        steps = 0
+        while active.size and steps < self.__max_steps:
+            steps += 1
+            self.__steps += len(active)
+            corners = vertices[triangles[current[active]]]
+            px, py = x[active], y[active]
+
+            # dla każdego punktu pierwsza (w kolejności zależnej od kroku) krawędź, względem której leży po złej stronie
+            move = np.full(len(active), -1, dtype=np.int64)
+            for k in range(steps + 2, steps - 1, -1):
+                edge = k % 3
+                a, b = corners[:, (edge + 1) % 3], corners[:, (edge + 2) % 3]
+                outside = orientation_many(a[:, 0], a[:, 1], b[:, 0], b[:, 1], px, py) < 0
+                move[outside] = edge
+
+            done = move < 0
+            result[active[done]] = current[active[done]]
+
+            moving = active[~done]
+            current[moving] = neighbors[current[moving], move[~done]]
+            active = moving[current[moving] >= 0]
+
+        if active.size:
+            result[active] = self.__scan(x[active], y[active])
+
+        return result
+
+    def get_triangles(self) -> List[Triangle]:
+        """
+        Zwraca listę trójkątów triangulacji w kolejności indeksów zwracanych przez `query_many`
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `List[Triangle]`: lista trójkątów albo pusta lista, jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            return []
+
+        return [self.__store.triangle(triangle) for triangle in range(len(self.__store))]
+
+    def stats(self) -> dict:
+        """
+        Zwraca statystyki struktury:
+            - `engine`: `'walk'`
+            - `triangles`: liczba trójkątów triangulacji
+            - `build_seconds`: czas budowy w sekundach
+            - `memory_bytes`: rozmiar struktur danych w bajtach (drzewo k-d liczone jako współrzędne jego punktów)
+            - `landmarks`: liczba punktów orientacyjnych
+            - `queries`: liczba zlokalizowanych punktów
+            - `mean_walk_steps`: średnia liczba kroków przejścia na punkt
+            - `fallbacks`: liczba punktów zlokalizowanych przez sprawdzenie wszystkich trójkątów
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `dict`: słownik ze statystykami
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            raise Exception("Jump-and-walk locator is not built")
+
+        return {
+            'engine': self.name,
+            'triangles': len(self.__store),
+            'build_seconds': self.__build_seconds,
+            'memory_bytes': self.__store.nbytes + self.__neighbors.nbytes + self.__landmarks.nbytes + self.__tree.data.nbytes,
+            'landmarks': len(self.__landmarks),
+            'queries': self.__queries,
+            'mean_walk_steps': self.__steps / max(self.__queries, 1),
+            'fallbacks': self.__fallbacks,
+        }
@@ -0,0 +1,127 @@
+"""
+Skompilowane jądro przeszukiwania drzewa dla paczek punktów.
+
+Jeśli zainstalowana jest biblioteka `numba` (`pip install kirkpatrick[jit]`), całe zejście po drzewie dla paczki
+punktów wykonywane jest w skompilowanej pętli po tablicach `SearchDAG`, bez przechodzenia przez interpreter na
+każdym poziomie drzewa. Jądro zwalnia GIL, więc paczki lokalizowane w wielu wątkach (np. w serwerze z modułu
+`service` albo we własnej puli wątków) wykonują się równolegle.
+
+Orientacje liczone są w arytmetyce zmiennoprzecinkowej z tym samym oszacowaniem błędu co w module `predicates`.
+Punkty, dla których któryś test przynależności nie jest pewny, jądro oznacza jako nierozstrzygnięte, a te lokalizowane
+są zwykłą ścieżką numpy z obliczeniami dokładnymi, więc wyniki są zawsze identyczne z `SearchDAG.locate`.
+
+Biblioteka `numba` wczytywana jest dopiero przy pierwszej paczce co najmniej `JIT_MIN_POINTS` punktów, a jądro
+kompilowane jest raz i zapisywane w pamięci podręcznej `numba`. Jądro można wyłączyć zmienną środowiskową
+`KIRKPATRICK_JIT=0` albo funkcją `set_enabled(False)`.
+"""
+from typing import Callable
+import importlib.util
+import os
+import numpy as np
+
+# najmniejsza paczka punktów, dla której opłaca się wczytać i skompilować jądro; mniejsze paczki korzystają
+# z jądra dopiero wtedy, gdy jest już skompilowane
+JIT_MIN_POINTS = 10000
+
+# wynik jądra dla punktów, których lokalizacja wymaga obliczeń dokładnych
+UNRESOLVED = -2
+
+_enabled = os.environ.get('KIRKPATRICK_JIT', '1') != '0'
+
+# skompilowane jądro, `None` przed pierwszą próbą kompilacji i `False`, jeśli `numba` nie jest dostępna
+_kernel = None
+
+
+def _compile() -> Callable:
+    """
+    Wczytuje moduł `jit_descent` z jądrem kompilowanym biblioteką `numba`; zwraca `False`, jeśli nie jest ona zainstalowana
+    (albo nie da się jej wczytać, np. z powodu niezgodnej wersji numpy)
+    """
+    try:
+        from kirkpatrick_algorithm.kirkpatrick_point_location.jit_descent import descend
+    except ImportError:
+        return False
+
+    return descend
+
+
+def set_enabled(enabled: bool) -> bool:
+    """
+    Włącza albo wyłącza skompilowane jądro
+
+    Parameters
+    ----------
+        enabled: `bool`
+            `False` wymusza lokalizację ścieżką numpy
+
+    Returns
+    -------
+        `bool`: poprzednie ustawienie
+    """
+    global _enabled
+    previous, _enabled = _enabled, enabled
+    return previous
+
+
+def available() -> bool:
+    """
+    Sprawdza, czy jądro jest włączone i czy biblioteka `numba` jest zainstalowana (bez jej wczytywania)
+    """
+    if not _enabled or _kernel is False:
+        return False
+
+    return _kernel is not None or importlib.util.find_spec('numba') is not None
+
+
+def descent_kernel(points: int) -> Callable:
+    """
+    Zwraca skompilowane jądro do lokalizacji paczki o podanej liczbie punktów albo `None`, jeśli należy użyć ścieżki numpy
+
+    Parameters
+    ----------
+        points: `int`
+            liczba punktów paczki
+
+    Returns
+    -------
+        `Callable`: funkcja `(vertices, triangles, child_starts, child_ends, child_indices, root, points, start, result)`
+        albo `None`
+    """
+    global _kernel
+    if not _enabled or _kernel is False:
+        return None
+
+    if _kernel is None:
+        if points < JIT_MIN_POINTS:
+            return None
+        _kernel = _compile()
+
+    return _kernel or None
+
+
+def locate_many(kernel: Callable, dag, points: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """
+    Lokalizuje paczkę punktów skompilowanym jądrem
+
+    Parameters
+    ----------
+        kernel: `Callable`
+            jądro zwrócone przez `descent_kernel`
+        dag: `SearchDAG`
+            drzewo przeszukiwania
+        points: `np.ndarray`
+            punkty do lokalizacji, kształt `(N, 2)`
+        start: `np.ndarray`
+            wierzchołki początkowe jak w `SearchDAG.locate_many` albo `None`
+
+    Returns
+    -------
+        `np.ndarray`: numery liści, -1 dla punktów spoza korzenia albo `UNRESOLVED`, kształt `(N,)`
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    start = np.full(len(points), -1, dtype=np.int64) if start is None else np.ascontiguousarray(start, dtype=np.int64)
+    result = np.empty(len(points), dtype=np.int64)
+
+    kernel(dag.store.vertices, dag.store.triangles, dag.child_starts, dag.child_ends, dag.child_indices, dag.root, points, start, result)
+
+    return result
@@ -0,0 +1,147 @@
+"""
+Wspólny interfejs struktur lokalizacji punktów.
+
+Każda struktura (`Kirkpatrick`, `SlabLocator`, `WalkLocator`) powstaje z tej samej triangulacji (`Triangulation`),
+jest budowana funkcją `build`, a zapytania zwracają trójkąty tej triangulacji: `query` jako obiekt `Triangle`,
+a `query_many` jako indeksy w liście `get_triangles()`. Punkty leżące we wnętrzach trójkątów są więc lokalizowane
+przez wszystkie struktury tak samo, a punkty leżące na wspólnych krawędziach mogą trafić do różnych trójkątów
+zawierających je.
+"""
+from abc import ABC, abstractmethod
+from planegeometry.structures.planarmaps import Triangle
+from typing import List
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangulation import Triangulation
+
+
+class Locator(ABC):
+    """
+    Struktura lokalizacji punktów w triangulacji
+    """
+    # nazwa struktury, pod którą jest dostępna w `engines.ENGINES`
+    name: str = None
+
+    @classmethod
+    def from_triangulation(cls, triangulation: Triangulation) -> 'Locator':
+        """
+        Tworzy niezbudowaną strukturę dla gotowej triangulacji
+
+        Parameters
+        ----------
+            triangulation: `Triangulation`
+                triangulacja, w której lokalizowane są punkty
+
+        Returns
+        -------
+            `Locator`: struktura, którą trzeba jeszcze zbudować funkcją `build`
+        """
+        return cls(triangulation)
+
+    @classmethod
+    def from_polygon(cls, polygon: List[tuple[float, float]], holes: List[List[tuple[float, float]]] = None,
+                     constrained: bool = False) -> 'Locator':
+        """
+        Tworzy niezbudowaną strukturę dla chmury punktów albo wielokąta z dziurami. Parametry jak w `Triangulation.from_polygon`.
+
+        Returns
+        -------
+            `Locator`: struktura, którą trzeba jeszcze zbudować funkcją `build`
+        """
+        return cls.from_triangulation(Triangulation.from_polygon(polygon, holes, constrained))
+
+    @classmethod
+    def from_subdivision(cls, vertices: List[tuple[float, float]], edges: np.ndarray, faces: np.ndarray) -> 'Locator':
+        """
+        Tworzy niezbudowaną strukturę dla podziału płaszczyzny na ściany (np. regiony administracyjne o wspólnych granicach).
+        Triangulacja zawiera wszystkie krawędzie podziału, a każdy trójkąt dostaje etykietę ściany, w której leży.
+
+        Parameters
+        ----------
+            vertices: `List[tuple[float, float]]`
+                współrzędne wierzchołków podziału, wspólne dla sąsiednich ścian
+            edges: `np.ndarray`
+                krawędzie podziału jako pary indeksów wierzchołków, kształt `(E, 2)`
+            faces: `np.ndarray`
+                etykiety (nieujemne liczby całkowite) ścian po lewej i prawej stronie krawędzi `u -> v`, -1 jeśli po danej
+                stronie nie ma ściany, kształt `(E, 2)`. Krawędź wspólna dla dwóch ścian może wystąpić raz z obiema
+                etykietami albo osobno dla każdej ściany (z -1 po drugiej stronie).
+
+        Returns
+        -------
+            `Locator`: struktura, którą trzeba jeszcze zbudować funkcją `build`
+
+        Raises
+        ------
+            `Exception`: jeśli dane mają złe kształty lub etykiety, krawędzie się przecinają, ściany na siebie nachodzą
+            albo ich brzegi nie są domknięte
+        """
+        return cls.from_triangulation(Triangulation.from_subdivision(vertices, edges, faces))
+
+    @abstractmethod
+    def build(self, **options):
+        """
+        Buduje strukturę. Opcje zależą od struktury.
+
+        Raises
+        ------
+            `Exception`: jeśli struktura została już zbudowana
+        """
+
+    @abstractmethod
+    def query(self, point: (float, float)) -> Triangle:
+        """
+        Lokalizuje punkt
+
+        Parameters
+        ----------
+            point: `(float, float)`
+                Punkt do przeszukiwań
+
+        Returns
+        -------
+            `Triangle`: trójkąt zawierający punkt albo `None` dla punktów spoza zewnętrznego trójkąta
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+
+    @abstractmethod
+    def query_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Lokalizuje wiele punktów naraz
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, kształt `(N,)`.
+            Dla punktów spoza zewnętrznego trójkąta zwracane jest -1.
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+
+    @abstractmethod
+    def get_triangles(self) -> List[Triangle]:
+        """
+        Zwraca listę trójkątów triangulacji w kolejności indeksów zwracanych przez `query_many`
+        """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Zwraca statystyki zbudowanej struktury. Każda struktura zwraca co najmniej pola:
+            - `engine`: nazwa struktury
+            - `triangles`: liczba trójkątów triangulacji
+            - `build_seconds`: czas budowy w sekundach
+            - `memory_bytes`: rozmiar struktur danych w bajtach
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
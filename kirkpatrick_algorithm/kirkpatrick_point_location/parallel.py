@@ -0,0 +1,182 @@
+"""
+Równoległa lokalizacja punktów w puli procesów.
+
+Tablice przetworzonego indeksu umieszczane są raz w pamięci współdzielonej (`multiprocessing.shared_memory`),
+a procesy robocze tworzą na nich widoki bez kopiowania. Punkty i wyniki również przekazywane są przez pamięć
+współdzieloną, więc do procesów wysyłane są tylko nazwy segmentów i zakresy indeksów.
+"""
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+import multiprocessing
+import sys
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.search_dag import SearchDAG
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+
+ArrayDescription = Tuple[str, str, Tuple[int, ...]]
+
+_worker_segments = {}
+_worker_dag = None
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Dołącza do istniejącego segmentu pamięci współdzielonej, nie rejestrując go do usunięcia przy wyjściu procesu
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # przed Pythonem 3.13 dołączenie rejestruje segment w resource_trackerze, który usunąłby go przy wyjściu
+    # procesu roboczego (albo zgłosił błąd przy podwójnym wyrejestrowaniu), więc rejestrację wyłączamy
+    register = shared_memory.resource_tracker.register
+    shared_memory.resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        shared_memory.resource_tracker.register = register
+
+
+def _view(description: ArrayDescription, segment: shared_memory.SharedMemory = None) -> np.ndarray:
+    """
+    Zwraca tablicę opartą na segmencie pamięci współdzielonej w procesie roboczym. Segmenty indeksu
+    są dołączane raz na cały czas życia procesu.
+    """
+    name, dtype, shape = description
+    if segment is None:
+        if name not in _worker_segments:
+            _worker_segments[name] = _attach(name)
+        segment = _worker_segments[name]
+
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _initialize_worker(index: Dict[str, ArrayDescription], root: int):
+    global _worker_dag
+
+    store = TriangleStore(_view(index['vertices']), _view(index['triangles']))
+    leaf_ids = _view(index['leaf_ids']) if 'leaf_ids' in index else None
+    leaf_slots = _view(index['leaf_slots']) if 'leaf_slots' in index else None
+    _worker_dag = SearchDAG(store, None, _view(index['child_indices']), root, _view(index['level_offsets']),
+                            _view(index['child_starts']), _view(index['child_ends']), leaf_ids, leaf_slots)
+
+
+def _locate_range(points: ArrayDescription, result: ArrayDescription, start: int, end: int):
+    points_segment, result_segment = _attach(points[0]), _attach(result[0])
+    try:
+        located = _worker_dag.leaf_positions(_worker_dag.locate_many(_view(points, points_segment)[start:end]))
+        _view(result, result_segment)[start:end] = located
+    finally:
+        points_segment.close()
+        result_segment.close()
+
+
+class ParallelLocator:
+    """
+    Pula procesów lokalizujących punkty w przetworzonym indeksie umieszczonym w pamięci współdzielonej.
+    Obiekt należy zamknąć funkcją `close` albo używać go w bloku `with`.
+    """
+    def __init__(self, dag: SearchDAG, processes: int = None):
+        """
+            Konstruktor klasy ParallelLocator. Kopiuje tablice indeksu do pamięci współdzielonej i uruchamia pulę procesów.
+
+            Parmeters
+            ---------
+                dag: `SearchDAG`
+                    skompilowane drzewo przeszukiwania
+                processes: `int`
+                    liczba procesów roboczych, domyślnie liczba rdzeni procesora
+        """
+        self.__processes = processes or multiprocessing.cpu_count()
+        self.__segments = []
+
+        index = {
+            'vertices': self.__share(dag.store.vertices),
+            'triangles': self.__share(dag.store.triangles),
+            'child_starts': self.__share(dag.child_starts),
+            'child_ends': self.__share(dag.child_ends),
+            'child_indices': self.__share(dag.child_indices),
+            'level_offsets': self.__share(dag.level_offsets),
+        }
+        if dag.leaf_ids is not None:
+            index['leaf_ids'] = self.__share(dag.leaf_ids)
+            index['leaf_slots'] = self.__share(dag.leaf_slots)
+        self.__pool = multiprocessing.Pool(self.__processes, initializer=_initialize_worker, initargs=(index, int(dag.root)))
+
+    def __share(self, array: np.ndarray) -> ArrayDescription:
+        """
+        Kopiuje tablicę do nowego segmentu pamięci współdzielonej i zwraca jego opis
+        """
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.__segments.append(segment)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+
+        return segment.name, array.dtype.str, array.shape
+
+    def query_many(self, points: np.ndarray, chunk_size: int = None) -> np.ndarray:
+        """
+        Lokalizuje punkty, dzieląc je na fragmenty przetwarzane równolegle. Wynik jest w kolejności punktów
+        i jest identyczny z wynikiem `Kirkpatrick.query_many`.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+            chunk_size: `int`
+                liczba punktów w jednym zadaniu, domyślnie tak, by na każdy proces przypadały około 4 zadania
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, -1 dla punktów spoza
+            zewnętrznego trójkąta, kształt `(N,)`
+        """
+        points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        chunk_size = chunk_size or -(-len(points) // (4 * self.__processes))
+
+        points_segment = shared_memory.SharedMemory(create=True, size=points.nbytes)
+        result_segment = shared_memory.SharedMemory(create=True, size=len(points) * np.dtype(np.int64).itemsize)
+        try:
+            np.ndarray(points.shape, dtype=points.dtype, buffer=points_segment.buf)[...] = points
+            points_description = (points_segment.name, points.dtype.str, points.shape)
+            result_description = (result_segment.name, np.dtype(np.int64).str, (len(points),))
+
+            tasks = [(points_description, result_description, start, min(start + chunk_size, len(points)))
+                     for start in range(0, len(points), chunk_size)]
+            self.__pool.starmap(_locate_range, tasks)
+
+            return np.ndarray((len(points),), dtype=np.int64, buffer=result_segment.buf).copy()
+        finally:
+            for segment in (points_segment, result_segment):
+                segment.close()
+                segment.unlink()
+
+    def close(self):
+        """
+        Zamyka pulę procesów i zwalnia pamięć współdzieloną
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `None`
+        """
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+        for segment in self.__segments:
+            segment.close()
+            segment.unlink()
+        self.__segments = []
+
+    def __enter__(self) -> 'ParallelLocator':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
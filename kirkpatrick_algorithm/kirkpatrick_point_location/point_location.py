@@ -1,112 +1,409 @@
-from scipy.spatial import Delaunay
-from planegeometry.structures.planarmaps import PlanarMap, Point, Segment, Triangle
-from typing import List
-import mapbox_earcut as earcut
+from planegeometry.structures.planarmaps import Triangle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Union
+import random
+import threading
+import time
 import numpy as np
-from kirkpatrick_algorithm.visualizer.main import Visualizer
+from kirkpatrick_algorithm.kirkpatrick_point_location.adjacency import VertexAdjacency
+from kirkpatrick_algorithm.kirkpatrick_point_location.child_order import order_children
+from kirkpatrick_algorithm.kirkpatrick_point_location.dynamic import DynamicTriangulation
+from kirkpatrick_algorithm.kirkpatrick_point_location.holes import retriangulate_holes
+from kirkpatrick_algorithm.kirkpatrick_point_location.independent_set import STRATEGIES, IndependentSetStrategy
+from kirkpatrick_algorithm.kirkpatrick_point_location.instrumentation import Hook, QueryCounters, RoundStats, Stats
+from kirkpatrick_algorithm.kirkpatrick_point_location.jump_grid import JumpGrid
+from kirkpatrick_algorithm.kirkpatrick_point_location.locator import Locator
+from kirkpatrick_algorithm.kirkpatrick_point_location.parallel import ParallelLocator
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation_many
+from kirkpatrick_algorithm.kirkpatrick_point_location.search_dag import SearchDAG
+from kirkpatrick_algorithm.kirkpatrick_point_location.serialization import read_index, write_index
+from kirkpatrick_algorithm.kirkpatrick_point_location.streaming import PointSource, StreamProgress, locate_stream, write_stream
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangulation import Triangulation
+from kirkpatrick_algorithm.kirkpatrick_point_location.walk import leaf_neighbors, walk
 
-class Kirkpatrick: 
-    def __init__(self, polygon: List[tuple[float, float]]):
+# minimalna liczba dziur w rundzie, od której opłaca się triangulować je w wielu procesach
+PARALLEL_MIN_HOLES = 4096
+
+# domyślna maksymalna liczba liści odwiedzanych przy przechodzeniu od podpowiedzi
+WALK_MAX_STEPS = 8
+
+# liczba punktów losowanych jednostajnie do porównania kolejności dzieci, gdy nie podano próbki zapytań
+CHILD_ORDER_EVALUATION_SIZE = 10000
+
+# liczba poziomów, o które zmiany przyrostowe mogą wydłużyć ścieżki w drzewie, zanim zostanie ono zbudowane od nowa
+REBALANCE_EXTRA_DEPTH = 16
+
+class Kirkpatrick(Locator):
+    name = 'kirkpatrick'
+
+    def __init__(self, polygon: List[tuple[float, float]], holes: List[List[tuple[float, float]]] = None, constrained: bool = False):
         """
             Konstruktor klasy Kirkpatrick. Inicjalizuje wszystkie pola potrzebne do działania biblioteki.
             Dodaje zewnętrzny trójkąt, następnie wykonuje triangulację Delaunaya, a na końcu konwertuje striangulowany
-            wielokąt do postaci listy sąsiedztwa.
+            wielokąt do postaci listy sąsiedztwa. Jeśli wielokąt ma być traktowany jako wielokąt, a nie chmura punktów
+            (`constrained` albo podane dziury), do triangulacji wstawiane są jego boki, a każdy trójkąt dostaje
+            informację, czy leży we wnętrzu wielokąta (funkcja `contains`).
 
             Parmeters
             ---------
                 polygon: `List[tuple[float, float]]`
                     lista krotek oznaczających współrzędne kolejnych punktów chmury punktów
+                holes: `List[List[tuple[float, float]]]`
+                    wierzchołki kolejnych dziur wielokąta; podanie dziur oznacza `constrained=True`
+                constrained: `bool`
+                    jeśli `True`, triangulacja zawiera boki wielokąta (i jego dziur)
+
+            Raises
+            ------
+                `Exception`: jeśli boki wielokąta lub dziur się przecinają albo dziury leżą poza wielokątem
+        """
+        self.__initialize(Triangulation.from_polygon(polygon, holes, constrained))
+
+    @classmethod
+    def from_triangulation(cls, triangulation: Triangulation) -> 'Kirkpatrick':
+        """
+        Tworzy obiekt biblioteki dla gotowej triangulacji (np. wspólnej z innymi strukturami lokalizacji)
+
+        Parameters
+        ----------
+            triangulation: `Triangulation`
+                triangulacja z zewnętrznym trójkątem
+
+        Returns
+        -------
+            `Kirkpatrick`: nieprzetworzony obiekt biblioteki
         """
-        self.__original_polygon = polygon
+        kirkpatrick = cls.__new__(cls)
+        kirkpatrick.__initialize(triangulation)
 
-        outer_triangle = self.__add_outer_triangle(polygon)
-        self.__polygon_with_triangle = self.__original_polygon + outer_triangle
+        return kirkpatrick
 
-        outer_triangle = [Point(x, y) for x, y in outer_triangle]
+    def __initialize(self, triangulation: Triangulation):
+        """
+        Konwertuje triangulację do postaci listy sąsiedztwa i inicjalizuje pozostałe pola
+
+        Parameters
+        ----------
+            triangulation: `Triangulation`
+                triangulacja z zewnętrznym trójkątem
 
-        self.__root_triangle = Triangle(outer_triangle[0], outer_triangle[1], outer_triangle[2])
-        self.__outer_triangle = set(outer_triangle)
+        Returns
+        -------
+            `None`
+        """
+        self.__original_polygon = triangulation.original
+        self.__outer_triangle = set(triangulation.outer_triangle)
+        self.__delaunay_triangulation = triangulation.delaunay
+        self.__initial_triangles = triangulation.triangles
+        self.__leaf_labels = triangulation.labels
 
-        self.__delaunay_triangulation = Delaunay(self.__polygon_with_triangle)
-        self.__polygon_planar_map = self.__get_planar_map(self.__delaunay_triangulation)
+        # czasy faz konstruktora są mierzone zawsze (kilka wywołań zegara), bo pomiary włącza się dopiero na gotowym obiekcie
+        self.__construction_phases = dict(triangulation.phases)
+
+        started = time.perf_counter()
+        if self.__leaf_labels is not None:
+            self.__adjacency = VertexAdjacency.from_triangles(self.__delaunay_triangulation.points, self.__initial_triangles,
+                                                              sorted(self.__outer_triangle))
+        else:
+            self.__adjacency = VertexAdjacency.from_delaunay(self.__delaunay_triangulation)
+        self.__construction_phases['planar_map'] = time.perf_counter() - started
 
         self.__preproccessed = False
 
-        self.__triangles_graph = {}
-        self.__triangles_list = []
-    
-    def __add_outer_triangle(self, polygon: List[tuple[float, float]]) -> List[tuple[float, float]]:
+        self.__triangle_store = None
+        self.__current_triangles = {}
+        self.__search_dag = None
+        self.__removed_per_round = []
+        self.__jump_grid = None
+        self.__grid_parameters = None
+        self.__leaf_neighbors = None
+        self.__leaf_lookup = None
+        self.__dynamic = None
+        self.__rebalance_thread = None
+        self.__rebalance_error = None
+        self.__build_seconds = None
+        self.__stats = None
+
+    def __remove_independent_set(self, indepndent_set: List[int]) -> (List[List[int]], int, List[List[int]]):
+        """
+        Usuwa zbiór niezależnych punktów z wielokąta
+        
+        Parameters
+        ----------
+            indepndent_set: `List[int]`
+                lista indeksów punktów tworzących zbiór niezależnych punktów
+
+        Returns
+        -------
+            `List[List[int]]`: lista indeksów punktów tworzących dziurę powstałą przez usunięcie punktu,
+                uporządkowanych przeciwnie do ruchu wskazówek zegara
+            'int': ilość usuniętych wierzchołków
+            `List[List[int]]`: lista numerów usuniętych trójkątów
         """
-            Oblicza współrzędne wierzchołków trójkąta zawierającego wszystkie punkty chmury punktów
+        holes = []
+        removed_triangles = []
+        deleted_nodes = 0
 
-            Parameters
-            ----------
-                polygon: `List[tuple[float, float]]`
-                    lista krotek oznaczających współrzędne kolejnych punktów
+        for independent_point in indepndent_set:
+            if independent_point not in self.__outer_triangle:
+                holes.append(self.__adjacency.remove_vertex(independent_point))
+                removed_triangles.append([])
+                for i in range(len(holes[-1])):
+                    removed_triangles[-1].append(self.__current_triangles.pop(self.__triangle_key(independent_point, holes[-1][i-1], holes[-1][i])))
+
+                deleted_nodes += 1
+
+        return holes, deleted_nodes, removed_triangles
+
+    def __triangle_key(self, a: int, b: int, c: int) -> (int, int, int):
+        """
+        Zwraca klucz trójkąta używany w słowniku aktualnych trójkątów triangulacji
+        
+        Parameters
+        ----------
+            a, b, c: `int`
+                indeksy wierzchołków trójkąta
+
+        Returns
+        -------
+            `(int, int, int)`: posortowane indeksy wierzchołków trójkąta
+        """
+        return tuple(sorted((a, b, c)))
+
+    def __add_triangle(self, a: int, b: int, c: int) -> int:
+        """
+        Dodaje trójkąt do magazynu trójkątów i do słownika aktualnych trójkątów triangulacji
+        
+        Parameters
+        ----------
+            a, b, c: `int`
+                indeksy wierzchołków trójkąta
 
-            Returns
-            -------
-                `List[tuple[float, float]]`: lista wierzchołków zewnętrznego trójkąta
+        Returns
+        -------
+            `int`: numer dodanego trójkąta
         """
-        min_x = min(polygon, key=lambda p: p[0])[0]
-        max_x = max(polygon, key=lambda p: p[0])[0]
-        min_y = min(polygon, key=lambda p: p[1])[1]
-        max_y = max(polygon, key=lambda p: p[1])[1]
+        triangle = self.__triangle_store.add(a, b, c)
+        self.__current_triangles[self.__triangle_key(a, b, c)] = triangle
+        return triangle
 
-        a = (max_x - min_x)
-        b = (max_y - min_y)
+    def __retriangulate(self, centers: List[int], holes: List[List[int]], executor: ProcessPoolExecutor, workers: int,
+                        timings: List[float] = None) -> list:
+        """
+        Trianguluje dziury jednej rundy i wiąże nowe trójkąty z usuniętymi. Jeśli podano pulę procesów, a dziur jest
+        wystarczająco dużo, lista dziur dzielona jest na ciągłe fragmenty przetwarzane równolegle, a wyniki łączone
+        są w kolejności dziur, więc są identyczne jak przy przetwarzaniu sekwencyjnym.
+        
+        Parameters
+        ----------
+            centers: `List[int]`
+                indeksy usuniętych wierzchołków
+            holes: `List[List[int]]`
+                indeksy wierzchołków brzegów dziur
+            executor: `ProcessPoolExecutor`
+                pula procesów lub `None`
+            workers: `int`
+                liczba procesów w puli
+            timings: `List[float]`
+                czasy triangulacji i wiązania dziur, jak w `retriangulate_holes`; przy przetwarzaniu równoległym
+                cały czas wykonania w procesach dodawany jest do czasu triangulacji
 
-        min_x -= a*0.4
-        max_x += a*0.4
-        min_y -= b*0.4
-        max_y += b*0.4
+        Returns
+        -------
+            `list`: dla każdej dziury para (nowe trójkąty, powiązania), jak w `retriangulate_holes`
+        """
+        vertices = self.__triangle_store.vertices
+        offsets = np.zeros(len(holes) + 1, dtype=np.int64)
+        np.cumsum([len(hole) for hole in holes], out=offsets[1:])
+        points = vertices[np.concatenate(holes)] if holes else np.empty((0, 2))
+        centers = vertices[centers]
 
-        a = (max_x - min_x)
-        b = (max_y - min_y)
+        if executor is None or len(holes) < PARALLEL_MIN_HOLES:
+            return retriangulate_holes(centers, points, offsets, timings)
 
-        sqrt_d = np.sqrt(4/3*b*b)
+        started = time.perf_counter()
+        bounds = np.linspace(0, len(holes), workers * 4 + 1).astype(np.int64)
+        chunks = [(centers[lo:hi], points[offsets[lo]:offsets[hi]], offsets[lo:hi + 1] - offsets[lo])
+                  for lo, hi in zip(bounds[:-1], bounds[1:]) if lo < hi]
 
-        d = (2*a + sqrt_d)/2
+        results = [result for chunk in executor.map(retriangulate_holes, *zip(*chunks)) for result in chunk]
+        if timings is not None:
+            timings[0] += time.perf_counter() - started
 
-        shift = (d - a)/2
-        H = d*np.sqrt(3)/2
+        return results
 
-        return [(max_x + shift, min_y),(min_x - shift, min_y), ((max_x - min_x)/2 + min_x, min_y + H)]
-    
-    def __get_planar_map(self, delaunay: Delaunay) -> PlanarMap:
+    def preprocess(self, strategy: Union[str, IndependentSetStrategy] = 'greedy', max_degree: int = 8, seed: int = None, workers: int = None):
+        """
+        Przetwarza wielokąt budując drzewo przeszukiwania
+        
+        Parameters
+        ----------
+            strategy: `str` lub `IndependentSetStrategy`
+                strategia wyboru zbioru niezależnego: `'greedy'`, `'low_degree'`, `'random'`
+                albo własna funkcja o sygnaturze jak w module `independent_set`
+            max_degree: `int`
+                maksymalny stopień usuwanego wierzchołka; dla wartości mniejszych niż 8 przetwarzanie może utknąć
+            seed: `int`
+                ziarno generatora liczb losowych dla strategii `'random'`
+            workers: `int`
+                liczba procesów, w których triangulowane są dziury jednej rundy; wynik nie zależy od liczby procesów
+
+        Returns
+        -------
+            `None`
+        
+        Raises
+        ------
+            `Exception` jeśli próbowano wywyołać przetwarzanie więcej niż raz, podano nieznaną strategię
+            lub w którejś rundzie nie udało się znaleźć żadnego wierzchołka do usunięcia
+        """
+        if self.__preproccessed:
+            raise Exception("Already preproccessed")
+
+        started = time.perf_counter()
+        build = lambda: self.__build(self.__delaunay_triangulation.points, self.__initial_triangles, self.__adjacency,
+                                     strategy, max_degree, seed, workers)
+        if self.__stats is None:
+            self.__search_dag, self.__removed_per_round = build()
+        else:
+            with self.__stats.counting_predicates(emit=True):
+                self.__search_dag, self.__removed_per_round = build()
+
+        self.__build_seconds = time.perf_counter() - started
+        self.__preproccessed = True
+
+    def build(self, **options):
         """
-        Konwertuje striangulowany wielokąt do postaci listy sąsiedztwa w obiekcie typu `PlanarMap`
+        Przetwarza wielokąt jak `preprocess` (wspólny interfejs struktur lokalizacji z modułu `locator`)
 
         Parameters
         ----------
-            delaunay: `Delaunay`
-                striangulowany wielokąt w obiekcie typu `Delaunay` z biblioteki `SciPy` 
+            options:
+                parametry `preprocess`
 
         Returns
         -------
-            `PlanarMap`: reprezentacja wielokąta za pomocą listy sąsiedztwa
+            `None`
+
+        Raises
+        ------
+            `Exception` jak w `preprocess`
         """
-        set_of_edges = set()
-        points = [Point(p[0], p[1]) for p in delaunay.points]
+        self.preprocess(**options)
 
-        get_edge = lambda a, b: (min(a, b), max(a, b))
+    def __build(self, points: np.ndarray, triangles: np.ndarray, adjacency: VertexAdjacency, strategy: Union[str, IndependentSetStrategy],
+                max_degree: int, seed: int, workers: int) -> (SearchDAG, List[int]):
+        """
+        Buduje drzewo przeszukiwania dla triangulacji, której liśćmi są podane trójkąty (w podanej kolejności).
+        Parametry `strategy`, `max_degree`, `seed` i `workers` jak w `preprocess`.
 
-        for a, b, c in delaunay.simplices:
-            set_of_edges.add(get_edge(a, b))
-            set_of_edges.add(get_edge(b, c))
-            set_of_edges.add(get_edge(a, c))
+        Parameters
+        ----------
+            points: `np.ndarray`
+                współrzędne wierzchołków, kształt `(V, 2)`
+            triangles: `np.ndarray`
+                trójkąty triangulacji w dowolnej orientacji, kształt `(T, 3)`
+            adjacency: `VertexAdjacency`
+                lista sąsiedztwa tej triangulacji, zmieniana w trakcie budowy
 
-        segments = [Segment(points[a], points[b]) for a, b in set_of_edges]
+        Returns
+        -------
+            `SearchDAG`: skompilowane drzewo
+            `List[int]`: liczba wierzchołków usuniętych w kolejnych rundach
+        """
+        if not callable(strategy):
+            if strategy not in STRATEGIES:
+                raise Exception(f"Unknown independent set strategy: {strategy}")
+            strategy = STRATEGIES[strategy]
+        rng = random.Random(seed)
+        stats = self.__stats
+        started = time.perf_counter()
+        
+        v = len(np.unique(triangles))
 
-        dcel_map = PlanarMap(segments[0])
-        for i in range(1, len(segments)):
-            dcel_map.add_edge(segments[i])
+        self.__adjacency = adjacency
+        self.__current_triangles = {}
+        self.__triangle_store = TriangleStore(points)
 
-        return dcel_map
-    
-    def __get_independent_set(self) -> List[Point]:
+        # wyszukiwanie zakłada, że wszystkie trójkąty są zorientowane przeciwnie do ruchu wskazówek zegara;
+        # nowe trójkąty dziur już takie są, a trójkąty triangulacji Delaunaya trzeba ewentualnie odwrócić
+        simplices = np.array(triangles, dtype=np.int64).reshape(-1, 3)
+        corners = self.__triangle_store.vertices[simplices]
+        clockwise = orientation_many(corners[:, 0, 0], corners[:, 0, 1], corners[:, 1, 0], corners[:, 1, 1], corners[:, 2, 0], corners[:, 2, 1]) < 0
+        simplices[clockwise] = simplices[clockwise][:, ::-1]
+
+        for a, b, c in simplices.tolist():
+            self.__add_triangle(a, b, c)
+
+        n_leaves = len(self.__triangle_store)
+        level_offsets = [0, n_leaves]
+        removed_per_round = []
+        triangles_graph = {}
+
+        if stats is not None:
+            stats.add_phase('setup', time.perf_counter() - started)
+
+        executor = ProcessPoolExecutor(workers) if workers and workers > 1 else None
+        try:
+            while v > 3:
+                started = time.perf_counter()
+                independent_set = strategy(self.__adjacency, self.__outer_triangle, max_degree, rng)
+                if not independent_set:
+                    raise Exception(f"No vertex of degree at most {max_degree} can be removed")
+
+                selected = time.perf_counter()
+                holes_points, removed, all_removed_triangles = self.__remove_independent_set(independent_set)
+
+                v -= removed
+                removed_per_round.append(removed)
+
+                # czasy triangulacji i wiązania poszczególnych dziur są mierzone tylko przy włączonych pomiarach
+                timings = [0.0, 0.0] if stats is not None else None
+                removed_at = time.perf_counter()
+                retriangulated = self.__retriangulate(independent_set, holes_points, executor, workers, timings)
+                triangulated = time.perf_counter()
+
+                new_count = len(self.__triangle_store)
+                for hole_points, removed_triangles, (new_triangles, links) in zip(holes_points, all_removed_triangles, retriangulated):
+                    for (a, b, c), sectors in zip(new_triangles, links):
+                        a, b, c = hole_points[a], hole_points[b], hole_points[c]
+                        self.__adjacency.add_triangle(a, b, c)
+                        triangles_graph[self.__add_triangle(a, b, c)] = [removed_triangles[sector] for sector in sectors]
+
+                level_offsets.append(len(self.__triangle_store))
+
+                if stats is not None:
+                    stats.add_round(RoundStats(len(removed_per_round), v + removed, removed, len(holes_points),
+                                               len(self.__triangle_store) - new_count, selected - started, removed_at - selected,
+                                               timings[0], timings[1] + time.perf_counter() - triangulated))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        started = time.perf_counter()
+        self.__triangle_store.freeze()
+        root = self.__current_triangles[self.__triangle_key(*self.__outer_triangle)]
+        dag = SearchDAG.from_graph(self.__triangle_store, triangles_graph, root, np.array(level_offsets))
+
+        self.__adjacency = None
+        self.__current_triangles = None
+
+        if stats is not None:
+            stats.add_phase('compile', time.perf_counter() - started)
+
+        return dag, removed_per_round
+
+    def memory_usage(self) -> dict:
         """
-        Oblicza zbiór niezależnych punktów z wielokąta
+        Zwraca rozmiar struktur danych przetworzonego wielokąta w bajtach, z podziałem na składowe:
+            - `vertices`: współrzędne wierzchołków
+            - `leaves`: trójki indeksów trójkątów triangulacji początkowej
+            - `dag_nodes`: trójki indeksów pozostałych wierzchołków drzewa oraz tablica przesunięć CSR
+            - `edges`: krawędzie drzewa (numery dzieci)
+            - `grid`: siatka przyspieszająca zbudowana funkcją `build_grid` (0, jeśli jej nie zbudowano)
+            - `labels`: etykiety liści triangulacji z ograniczeniami (0 dla zwykłej triangulacji)
+            - `total`: suma powyższych
         
         Parameters
         ----------
@@ -114,131 +411,528 @@ class Kirkpatrick:
 
         Returns
         -------
-            `List[Point]`: lista punktów tworzących zbiór niezależny
+            `dict`: słownik z rozmiarami poszczególnych składowych
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
         """
-        visited = set()
-        independent_set = []
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
 
-        for point in self.__polygon_planar_map.iterpoints():
-            if point not in visited and point not in self.__outer_triangle and self.__polygon_planar_map.degree(point) < 9:
-                independent_set.append(point)
-                
-                for adjacent_point in self.__polygon_planar_map.iteradjacent(point):
-                    visited.add(adjacent_point)
+        dag = self.__search_dag
+        leaves = dag.n_leaves * dag.store.triangles.itemsize * 3
+        offsets = dag.child_offsets.nbytes if dag.child_offsets is not None else dag.child_starts.nbytes + dag.child_ends.nbytes
+        usage = {
+            'vertices': dag.store.vertices.nbytes,
+            'leaves': leaves,
+            'dag_nodes': dag.store.triangles.nbytes - leaves + offsets,
+            'edges': dag.child_indices.nbytes,
+            'grid': self.__jump_grid.nbytes if self.__jump_grid is not None else 0,
+            'labels': self.__leaf_labels.nbytes if self.__leaf_labels is not None else 0,
+        }
+        usage['total'] = sum(usage.values())
 
-        return independent_set
+        return usage
     
-    def __remove_independent_set(self, indepndent_set: List[Point]) -> (List[List[Point]], int, List[List[Triangle]]):
+    def dag_stats(self) -> dict:
         """
-        Usuwa zbiór niezależnych punktów z wielokąta
+        Zwraca statystyki drzewa przeszukiwania:
+            - `rounds`: liczba rund usuwania zbioru niezależnego
+            - `removed_per_round`: liczba wierzchołków usuniętych w kolejnych rundach
+            - `nodes`: liczba wierzchołków drzewa
+            - `max_out_degree`: największa liczba dzieci wierzchołka wewnętrznego
+            - `mean_out_degree`: średnia liczba dzieci wierzchołka wewnętrznego
+            - `depth`: długość najdłuższej ścieżki od korzenia do liścia
+            - `updates`: liczba przyrostowych zmian od ostatniego zbudowania drzewa
         
         Parameters
         ----------
-            indepndent_set: `List[Point]`
-                lista punktów tworzących zbiór niezależnych punktów
+            `None`
 
         Returns
         -------
-            `List[List[Point]]`: lista punktów tworzących dziurę powstałą przez 
-            'int': ilość usuniętych wierzchołków
-            `List[List[Triangle]]`: lista usuniętych trójkątów
+            `dict`: słownik ze statystykami
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
         """
-        holes = []
-        removed_triangles = []
-        deleted_nodes = 0
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
 
-        for independent_point in indepndent_set:
-            if independent_point not in self.__outer_triangle:
-                outedges = sorted(list(self.__polygon_planar_map.iteroutedges(independent_point)), key=lambda e: (e.target - e.source).alpha())
-                holes.append([outedge.target for outedge in outedges])
-                removed_triangles.append([])
-                for i in range(len(holes[-1])):
-                    removed_triangles[-1].append(Triangle(independent_point, holes[-1][i-1], holes[-1][i]))
+        dag = self.__search_dag
+        out_degrees = dag.child_ends - dag.child_starts
+        out_degrees = out_degrees[out_degrees > 0]
 
-                self.__polygon_planar_map.del_node(independent_point)
-                deleted_nodes += 1
+        return {
+            'rounds': len(self.__removed_per_round),
+            'removed_per_round': list(self.__removed_per_round),
+            'nodes': len(dag),
+            'max_out_degree': int(out_degrees.max(initial=0)),
+            'mean_out_degree': float(out_degrees.mean()) if len(out_degrees) else 0.0,
+            'depth': dag.depth(),
+            'updates': self.__dynamic.updates if self.__dynamic is not None else 0,
+        }
 
-        return holes, deleted_nodes, removed_triangles
-    
-    def __triangle_intersect(self, t1: Triangle, t2: Triangle) -> bool:
+    def stats(self) -> dict:
         """
-        Sprawdza czy dwa tójkąty nakładają się na siebie
-        
+        Zwraca statystyki jak pozostałe struktury lokalizacji z modułu `locator`:
+            - `engine`: `'kirkpatrick'`
+            - `triangles`: liczba trójkątów triangulacji
+            - `build_seconds`: czas przetwarzania w sekundach (`None` dla wczytanego indeksu)
+            - `memory_bytes`: rozmiar struktur danych w bajtach (`total` z `memory_usage`)
+            - `depth`: długość najdłuższej ścieżki od korzenia do liścia
+
         Parameters
         ----------
-            t1: `Triangle`
-                pierwszy trójkąt
-            t2: `Triangle`
-                drugi trójkąt
+            `None`
 
         Returns
         -------
-            `bool`: wartość logiczna mówiąca czy trójkąty mają część wspólną
+            `dict`: słownik ze statystykami
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
         """
-        for t1_segment in t1.itersegments():
-            for t2_segment in t2.itersegments():
-                if t1_segment.intersect(t2_segment):
-                    return True
-                
-        return False
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        return {
+            'engine': self.name,
+            'triangles': self.__search_dag.n_leaves,
+            'build_seconds': self.__build_seconds,
+            'memory_bytes': self.memory_usage()['total'],
+            'depth': self.__search_dag.depth(),
+        }
 
-    def preprocess(self):
+    def enable_stats(self, hook: Hook = None) -> Stats:
         """
-        Przetwarza wielokąt budując drzewo przeszukiwania
+        Włącza pomiary przetwarzania i zapytań. Zwrócony obiekt `Stats` jest wypełniany w trakcie kolejnych wywołań
+        `preprocess`, `rebalance`, `query`, `query_many`, `locate_trajectory`, `query_label` i `query_labels`:
+            - czasy faz konstruktora (`delaunay`, `constraints`, `planar_map`) i przetwarzania (`setup`,
+              `independent_set`, `removal`, `triangulation` algorytmem earcut, `linking` z drzewem, `compile`)
+            - pomiary kolejnych rund: liczba usuniętych wierzchołków, dziur i nowych trójkątów oraz czasy faz
+            - liczba wywołań predykatów geometrycznych, w tym obliczeń dokładnych
+            - liczba odwiedzonych wierzchołków drzewa, testów przynależności i kroków po sąsiednich liściach
+        Gdy pomiary są wyłączone, ich koszt jest pomijalny. Zapytania w puli procesów (`parallel_locator`) nie są mierzone.
+
+        Parameters
+        ----------
+            hook: `Callable[[str, float, dict], None]`
+                funkcja wywoływana dla każdego pomiaru z jego nazwą, wartością i etykietami
+                (nazwy opisane są w module `instrumentation`)
+
+        Returns
+        -------
+            `Stats`: obiekt z pomiarami
+        """
+        stats = Stats(hook)
+        for name, seconds in self.__construction_phases.items():
+            stats.add_phase(name, seconds)
+
+        self.__stats = stats
+        return stats
+
+    def disable_stats(self) -> Stats:
+        """
+        Wyłącza pomiary
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `Stats`: zebrane pomiary albo `None`, jeśli pomiary nie były włączone
+        """
+        stats, self.__stats = self.__stats, None
+        return stats
+
+    def get_stats(self) -> Stats:
+        """
+        Zwraca obiekt z pomiarami albo `None`, jeśli pomiary nie są włączone (`enable_stats`)
+        """
+        return self.__stats
+
+    def __measured(self, method: str, points: int, locate: Callable[[QueryCounters], object]) -> object:
+        """
+        Wywołuje funkcję lokalizującą z licznikami zapytania i zapisuje je w pomiarach
+        """
+        stats = self.__stats
+        counters = QueryCounters()
+        with stats.counting_predicates():
+            result = locate(counters)
+        stats.add_query(method, points, counters)
+
+        return result
+
+    def build_grid(self, resolution: Union[int, tuple[int, int]] = None, adaptive: bool = False, max_depth: int = 8, capacity: int = 4):
+        """
+        Buduje siatkę przyspieszającą zapytania. Siatka pokrywa prostokąt otaczający wierzchołki wielokąta, a każda
+        komórka pamięta najgłębszy wierzchołek drzewa zawierający ją całą, więc `query` i `query_many` zaczynają
+        przeszukiwanie w połowie drzewa albo kończą je od razu w liściu. Wyniki zapytań się nie zmieniają.
         
         Parameters
         ----------
+            resolution: `int` lub `tuple[int, int]`
+                liczba komórek siatki w każdym wymiarze albo para `(nx, ny)`, domyślnie około jednej komórki na wierzchołek
+            adaptive: `bool`
+                jeśli `True`, komórki z więcej niż `capacity` wierzchołkami są dzielone rekurencyjnie na cztery
+                (drzewo czwórkowe), co pomaga przy punktach tworzących skupiska
+            max_depth: `int`
+                maksymalna liczba podziałów komórki w wersji adaptacyjnej
+            capacity: `int`
+                liczba wierzchołków w komórce, powyżej której komórka jest dzielona
+
+        Returns
+        -------
             `None`
 
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        dag = self.__search_dag
+        inner = np.zeros(len(dag.store.vertices), dtype=bool)
+        inner[np.unique(dag.store.triangles[dag.leaf_nodes()])] = True
+        inner[list(self.__outer_triangle)] = False
+
+        self.__jump_grid = JumpGrid.build(dag, dag.store.vertices[inner], resolution, adaptive, max_depth, capacity)
+        self.__grid_parameters = (resolution, adaptive, max_depth, capacity)
+
+    def optimize_child_order(self, sample: np.ndarray = None, evaluation: np.ndarray = None, seed: int = 0) -> dict:
+        """
+        Zmienia kolejność sprawdzania dzieci wierzchołków drzewa tak, by zapytania wykonywały jak najmniej testów
+        przynależności. Jeśli podano próbkę zapytań, dzieci porządkowane są malejąco według liczby punktów próbki,
+        które do nich zeszły, a w pozostałych przypadkach malejąco według pola części wspólnej z rodzicem (co jest
+        najlepszą kolejnością dla zapytań o rozkładzie jednostajnym). Wynikiem jest porównanie średniej liczby testów
+        na zapytanie przed zmianą i po niej.
+
+        Zmienia się tylko kolejność sprawdzania dzieci, więc punkt leżący we wnętrzu trójkąta jest lokalizowany
+        tak samo, ale punkt leżący na wspólnej krawędzi kilku trójkątów może trafić do innego z nich (zawsze tego
+        samego dla `query` i `query_many`). Kolejność jest zapisywana funkcją `save`, ale przebudowa drzewa
+        (`rebalance`) przywraca kolejność domyślną.
+
+        Parameters
+        ----------
+            sample: `np.ndarray`
+                próbka zapytań, kształt `(N, 2)`; domyślnie dzieci porządkowane są według pól
+            evaluation: `np.ndarray`
+                punkty, dla których porównywana jest liczba testów, kształt `(M, 2)`; domyślnie próbka zapytań,
+                a bez próbki `CHILD_ORDER_EVALUATION_SIZE` punktów losowanych jednostajnie z prostokąta otaczającego wielokąt
+            seed: `int`
+                ziarno generatora punktów losowanych do porównania
+
+        Returns
+        -------
+            `dict`: słownik z polami:
+                - `weights`: `'hits'` albo `'area'`
+                - `points`: liczba punktów, dla których porównano liczbę testów
+                - `tests_before`, `tests_after`: średnia liczba testów przynależności na zapytanie
+                - `nodes_visited`: średnia liczba odwiedzonych wierzchołków drzewa (nie zależy od kolejności)
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        self.__wait_for_rebalance()
+        dag = self.__search_dag
+        grid = self.__grid(dag)
+
+        if sample is not None:
+            sample = np.asarray(sample, dtype=np.float64).reshape(-1, 2)
+        if evaluation is None and sample is not None:
+            evaluation = sample
+        elif evaluation is None:
+            inner = np.unique(dag.store.triangles[dag.leaf_nodes()])
+            vertices = dag.store.vertices[np.setdiff1d(inner, sorted(self.__outer_triangle))]
+            rng = np.random.default_rng(seed)
+            evaluation = rng.uniform(vertices.min(axis=0), vertices.max(axis=0), (CHILD_ORDER_EVALUATION_SIZE, 2))
+        evaluation = np.asarray(evaluation, dtype=np.float64).reshape(-1, 2)
+
+        def tests() -> (float, float):
+            counters = QueryCounters()
+            dag.locate_many(evaluation, grid.start_nodes(evaluation) if grid is not None else None, counters)
+            return counters.tests / max(len(evaluation), 1), counters.nodes / max(len(evaluation), 1)
+
+        before, nodes = tests()
+
+        hits = None
+        if sample is not None:
+            hits = np.zeros(len(dag.child_indices), dtype=np.int64)
+            dag.locate_many(sample, grid.start_nodes(sample) if grid is not None else None, hits=hits)
+        order_children(dag, hits)
+
+        after, _ = tests()
+
+        return {
+            'weights': 'area' if sample is None else 'hits',
+            'points': len(evaluation),
+            'tests_before': before,
+            'tests_after': after,
+            'nodes_visited': nodes,
+        }
+
+    def insert_vertex(self, point: (float, float), auto_rebalance: bool = True) -> int:
+        """
+        Wstawia wierzchołek do przetworzonego wielokąta bez ponownego przetwarzania. Zmieniane są tylko trójkąty
+        wokół nowego wierzchołka (triangulacja pozostaje triangulacją Delaunaya), a zastąpione liście drzewa dostają
+        jako dzieci nowe trójkąty, więc koszt zależy od rozmiaru zmiany, a nie od liczby wierzchołków. Pozycje
+        pozostałych trójkątów w liście `get_triangles()` się nie zmieniają. Siatka zbudowana funkcją `build_grid`
+        przestaje być używana aż do przebudowy drzewa.
+
+        Parameters
+        ----------
+            point: `(float, float)`
+                współrzędne nowego wierzchołka, leżące we wnętrzu zewnętrznego trójkąta
+            auto_rebalance: `bool`
+                jeśli `True`, drzewo jest budowane od nowa w tle (`rebalance(background=True)`), gdy zmiany wydłużyły
+                ścieżki w drzewie o więcej niż `REBALANCE_EXTRA_DEPTH` poziomów
+
+        Returns
+        -------
+            `int`: indeks nowego wierzchołka, którego można użyć w `remove_vertex`
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony, punkt leży poza zewnętrznym trójkątem,
+            jest już wierzchołkiem triangulacji albo triangulacja zawiera boki wielokąta (`constrained`)
+        """
+        dynamic = self.__thaw()
+        vertex = dynamic.insert(float(point[0]), float(point[1]))
+        self.__updated(dynamic, auto_rebalance)
+
+        return vertex
+
+    def remove_vertex(self, vertex: int, auto_rebalance: bool = True):
+        """
+        Usuwa wierzchołek z przetworzonego wielokąta bez ponownego przetwarzania. Dziura po wierzchołku jest
+        triangulowana tak jak w rundach przetwarzania, a usunięte liście drzewa dostają jako dzieci nowe trójkąty.
+        Pozostałe uwagi jak w `insert_vertex`.
+
+        Parameters
+        ----------
+            vertex: `int`
+                indeks usuwanego wierzchołka (pozycja w wielokącie przekazanym do konstruktora albo wynik `insert_vertex`)
+            auto_rebalance: `bool`
+                jak w `insert_vertex`
+
         Returns
         -------
             `None`
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony, wierzchołek nie istnieje, należy do
+            zewnętrznego trójkąta albo triangulacja zawiera boki wielokąta (`constrained`)
+        """
+        dynamic = self.__thaw()
+        dynamic.remove(int(vertex))
+        self.__updated(dynamic, auto_rebalance)
+
+    def rebalance(self, background: bool = False, strategy: Union[str, IndependentSetStrategy] = 'greedy', max_degree: int = 8):
+        """
+        Buduje drzewo przeszukiwania od nowa z aktualnej triangulacji, przywracając logarytmiczną głębokość po wielu
+        zmianach przyrostowych. Pozycje trójkątów w liście `get_triangles()` się nie zmieniają. Jeśli zbudowano siatkę
+        funkcją `build_grid`, jest ona budowana ponownie z tymi samymi parametrami.
+
+        Parameters
+        ----------
+            background: `bool`
+                jeśli `True`, drzewo budowane jest w osobnym wątku, a do czasu jego podmiany zapytania korzystają ze
+                starego drzewa; kolejna zmiana wierzchołków czeka na zakończenie przebudowy
+            strategy: `str` lub `IndependentSetStrategy`
+                strategia wyboru zbioru niezależnego, jak w `preprocess`
+            max_degree: `int`
+                maksymalny stopień usuwanego wierzchołka, jak w `preprocess`
+
+        Returns
+        -------
+            `None`
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        self.__wait_for_rebalance()
+        if self.__dynamic is None:
+            return
+
+        dynamic = self.__dynamic
+        vertices = np.array(dynamic.dag.store.vertices)
+        triangles = dynamic.leaf_triangles()
+
+        if not background:
+            self.__rebalance(dynamic, vertices, triangles, strategy, max_degree)
+            return
+
+        self.__rebalance_thread = threading.Thread(target=self.__rebalance, args=(dynamic, vertices, triangles, strategy, max_degree), daemon=True)
+        self.__rebalance_thread.start()
+
+    def __rebalance(self, dynamic: DynamicTriangulation, vertices: np.ndarray, triangles: np.ndarray,
+                    strategy: Union[str, IndependentSetStrategy], max_degree: int):
+        """
+        Buduje drzewo dla kopii triangulacji i podmienia je, jeśli w międzyczasie nie było zmian.
+        Błąd przebudowy w tle jest zapamiętywany i zgłaszany przy następnej zmianie.
+        """
+        try:
+            adjacency = VertexAdjacency.from_triangles(vertices, triangles, sorted(self.__outer_triangle))
+            dag, removed_per_round = self.__build(vertices, triangles, adjacency, strategy, max_degree, None, None)
+
+            grid = None
+            if self.__grid_parameters is not None:
+                inner = np.zeros(len(vertices), dtype=bool)
+                inner[np.unique(triangles)] = True
+                inner[list(self.__outer_triangle)] = False
+                grid = JumpGrid.build(dag, vertices[inner], *self.__grid_parameters)
+
+            if self.__dynamic is dynamic:
+                self.__removed_per_round = removed_per_round
+                self.__search_dag = dag
+                self.__jump_grid = grid
+                self.__dynamic = None
+        except Exception as error:
+            self.__rebalance_error = error
+
+    def __wait_for_rebalance(self):
+        """
+        Czeka na zakończenie przebudowy drzewa w tle i zgłasza jej ewentualny błąd
+        """
+        if self.__rebalance_thread is not None:
+            self.__rebalance_thread.join()
+            self.__rebalance_thread = None
+
+        if self.__rebalance_error is not None:
+            error, self.__rebalance_error = self.__rebalance_error, None
+            raise error
+
+    def __thaw(self) -> DynamicTriangulation:
+        """
+        Zwraca triangulację zmienianą przyrostowo, tworząc ją z aktualnego drzewa przy pierwszej zmianie
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+        if self.__leaf_labels is not None:
+            raise Exception("Incremental updates are not supported for constrained triangulations")
+
+        self.__wait_for_rebalance()
+        if self.__dynamic is None:
+            self.__dynamic = DynamicTriangulation(self.__search_dag, self.__outer_triangle)
+
+        return self.__dynamic
+
+    def __updated(self, dynamic: DynamicTriangulation, auto_rebalance: bool):
+        """
+        Podmienia drzewo na drzewo zmienione przyrostowo i unieważnia struktury zależne od liści
+        """
+        self.__jump_grid = None
+        self.__leaf_lookup = None
+        self.__search_dag = dynamic.dag
+
+        if auto_rebalance and dynamic.extra_depth > REBALANCE_EXTRA_DEPTH:
+            self.rebalance(background=True)
+
+    def save(self, path: str):
+        """
+        Zapisuje przetworzony wielokąt do pliku binarnego, który można wczytać funkcją `Kirkpatrick.load`
         
+        Parameters
+        ----------
+            path: `str`
+                ścieżka do pliku
+
+        Returns
+        -------
+            `None`
+
         Raises
         ------
-            `Exception` jeśli próbowano wywyołać przetwarzanie więcej niż raz
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony
         """
-        if self.__preproccessed:
-            raise Exception("Already preproccessed")
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        dag = self.__search_dag
+        child_offsets, child_indices = dag.compact()
+        arrays = {
+            'vertices': dag.store.vertices,
+            'triangles': dag.store.triangles,
+            'child_offsets': child_offsets,
+            'child_indices': child_indices,
+            'level_offsets': dag.level_offsets,
+            'removed_per_round': np.array(self.__removed_per_round, dtype=np.int64),
+        }
+        if dag.leaf_ids is not None:
+            arrays['leaf_ids'] = dag.leaf_ids
+        if self.__leaf_labels is not None:
+            arrays['leaf_labels'] = self.__leaf_labels
+        meta = {
+            'root': int(dag.root),
+            'outer_triangle': sorted(self.__outer_triangle),
+        }
+
+        write_index(path, arrays, meta)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'Kirkpatrick':
+        """
+        Wczytuje przetworzony wielokąt zapisany funkcją `save`. Zwrócony obiekt od razu obsługuje zapytania.
         
-        v = len(self.__polygon_with_triangle)
-
-        for a, b, c in self.__delaunay_triangulation.simplices:
-            triangle = Triangle(Point(self.__polygon_with_triangle[a][0], self.__polygon_with_triangle[a][1]),
-                                Point(self.__polygon_with_triangle[b][0], self.__polygon_with_triangle[b][1]),
-                                Point(self.__polygon_with_triangle[c][0], self.__polygon_with_triangle[c][1]))
-            
-            self.__triangles_list.append(triangle)
-            self.__triangles_graph[triangle] = []
-
-
-        while v > 3:
-            independent_set = self.__get_independent_set()
-            holes_points, removed, all_removed_triangles = self.__remove_independent_set(independent_set)
-
-            v -= removed
-
-            for hole_points, removed_triangles in zip(holes_points, all_removed_triangles):
-                verts = np.array([[point.x, point.y] for point in hole_points]).reshape(-1, 2)
-                rings = np.array([len(verts)])
-                result = earcut.triangulate_float64(verts, rings)
-
-                for a, b, c in result.reshape(-1,3):
-                    new_triangle = Triangle(hole_points[a], hole_points[b], hole_points[c])
-
-                    for segment in new_triangle.itersegments():
-                        if not self.__polygon_planar_map.has_edge(segment):
-                            self.__polygon_planar_map.add_edge(segment)
-
-                    if not new_triangle in self.__triangles_graph:
-                        self.__triangles_graph[new_triangle] = []
-                        
-                    for old_triangle in removed_triangles:
-                        if self.__triangle_intersect(new_triangle, old_triangle):
-                            self.__triangles_graph[new_triangle].append(old_triangle)
-                    
-        self.__preproccessed = True
-    
+        Parameters
+        ----------
+            path: `str`
+                ścieżka do pliku
+            mmap: `bool`
+                jeśli `True`, tablice są odwzorowane w pamięci bez kopiowania, więc wczytanie jest natychmiastowe,
+                a wiele procesów korzystających z tego samego pliku współdzieli pamięć
+
+        Returns
+        -------
+            `Kirkpatrick`: przetworzony obiekt biblioteki
+
+        Raises
+        ------
+            `Exception`: jeśli plik nie jest indeksem lub ma nieobsługiwaną wersję formatu
+        """
+        arrays, meta = read_index(path, mmap)
+
+        kirkpatrick = cls.__new__(cls)
+        kirkpatrick.__original_polygon = None
+        kirkpatrick.__outer_triangle = set(meta['outer_triangle'])
+        kirkpatrick.__delaunay_triangulation = None
+        kirkpatrick.__initial_triangles = None
+        kirkpatrick.__leaf_labels = arrays.get('leaf_labels')
+        kirkpatrick.__adjacency = None
+        kirkpatrick.__triangle_store = TriangleStore(arrays['vertices'], arrays['triangles'])
+        kirkpatrick.__current_triangles = None
+        kirkpatrick.__search_dag = SearchDAG(kirkpatrick.__triangle_store, arrays['child_offsets'], arrays['child_indices'],
+                                             meta['root'], arrays['level_offsets'], leaf_ids=arrays.get('leaf_ids'))
+        kirkpatrick.__removed_per_round = arrays['removed_per_round'].tolist()
+        kirkpatrick.__jump_grid = None
+        kirkpatrick.__grid_parameters = None
+        kirkpatrick.__leaf_neighbors = None
+        kirkpatrick.__leaf_lookup = None
+        kirkpatrick.__dynamic = None
+        kirkpatrick.__rebalance_thread = None
+        kirkpatrick.__rebalance_error = None
+        kirkpatrick.__construction_phases = {}
+        kirkpatrick.__build_seconds = None
+        kirkpatrick.__stats = None
+        kirkpatrick.__preproccessed = True
+
+        return kirkpatrick
+
     def get_triangles(self) -> List[Triangle]:
         """
         Zwraca listę striangulowanych trójkątów
@@ -250,16 +944,78 @@ class Kirkpatrick:
         -------
             `List[Triangle]`: lista wszystkich trójkątów po pierwszej triangulacji
         """
-        return self.__triangles_list
+        if self.__search_dag is None:
+            return []
+
+        return self.__search_dag.leaves()
+
+    def __neighbors(self, dag: SearchDAG) -> np.ndarray:
+        """
+        Zwraca sąsiedztwo liści drzewa `dag` indeksowane numerami jego wierzchołków, wyznaczając je przy pierwszym użyciu
+        """
+        dynamic = self.__dynamic
+        if dynamic is not None and dynamic.dag is dag:
+            return dynamic.neighbors
+
+        # drzewo może zostać podmienione przez przebudowę w tle, więc zapamiętane sąsiedztwo jest związane z drzewem
+        if self.__leaf_neighbors is None or self.__leaf_neighbors[0] is not dag:
+            leaf_ids = dag.leaf_nodes()
+            local = leaf_neighbors(dag.store.triangles[leaf_ids])
+            if dag.leaf_ids is None:
+                neighbors = local
+            else:
+                neighbors = np.full((len(dag), 3), -1, dtype=np.int64)
+                neighbors[leaf_ids] = np.where(local >= 0, leaf_ids[local], -1)
+            self.__leaf_neighbors = (dag, neighbors)
+
+        return self.__leaf_neighbors[1]
+
+    def __leaf_index(self, dag: SearchDAG, triangle: Triangle) -> int:
+        """
+        Zwraca numer wierzchołka drzewa `dag` będącego liściem odpowiadającym obiektowi `Triangle` albo -1, jeśli taki liść nie istnieje
+        """
+        if self.__leaf_lookup is None or self.__leaf_lookup[0] is not dag:
+            leaf_ids = dag.leaf_nodes()
+            corners = dag.store.vertices[dag.store.triangles[leaf_ids]].tolist()
+            self.__leaf_lookup = (dag, {frozenset(map(tuple, leaf)): node for node, leaf in zip(leaf_ids.tolist(), corners)})
+
+        key = frozenset(((triangle.pt1.x, triangle.pt1.y), (triangle.pt2.x, triangle.pt2.y), (triangle.pt3.x, triangle.pt3.y)))
+        return self.__leaf_lookup[1].get(key, -1)
+
+    def __grid(self, dag: SearchDAG) -> JumpGrid:
+        """
+        Zwraca siatkę przyspieszającą zbudowaną dla drzewa `dag` albo `None`
+        """
+        grid = self.__jump_grid
+        return grid if grid is not None and grid.dag is dag else None
+
+    def __locate(self, dag: SearchDAG, x: float, y: float, hint: int, max_steps: int, counters: QueryCounters = None) -> int:
+        """
+        Lokalizuje punkt, zaczynając od liścia `hint` (jeśli jest nieujemny), a w razie niepowodzenia w drzewie
+        """
+        if hint >= 0:
+            leaf = walk(dag.store, self.__neighbors(dag), hint, x, y, max_steps, counters)
+            if leaf >= 0:
+                return leaf
 
-    def query(self, point: (float, float)) -> Triangle:
+        grid = self.__grid(dag)
+        start = grid.start_node(x, y) if grid is not None else None
+        return dag.locate(x, y, start, counters)
+
+    def query(self, point: (float, float), hint: Union[int, Triangle] = None, max_steps: int = WALK_MAX_STEPS) -> Triangle:
         """
-        Przeszukuje drzewo trójkątów
+        Przeszukuje drzewo trójkątów. Jeśli podano podpowiedź (np. wynik poprzedniego zapytania dla pobliskiego punktu),
+        przeszukiwanie zaczyna się od niej i przechodzi przez sąsiednie trójkąty, a dopiero po `max_steps` krokach
+        schodzi po drzewie. Wynik nie zależy od podpowiedzi.
         
         Parameters
         ----------
             point: `(float, float)`
                 Punkt do przeszukiwań
+            hint: `int` lub `Triangle`
+                indeks trójkąta w liście `get_triangles()` albo trójkąt, od którego zaczyna się przeszukiwanie
+            max_steps: `int`
+                maksymalna liczba trójkątów odwiedzonych przed zejściem po drzewie
 
         Returns
         -------
@@ -272,20 +1028,310 @@ class Kirkpatrick:
         if not self.__preproccessed:
             raise Exception("Polygon is not preproccessed")
         
-        point = Point(point[0], point[1])
+        dag = self.__search_dag
+        if hint is None:
+            hint = -1
+        elif isinstance(hint, Triangle):
+            hint = self.__leaf_index(dag, hint)
+        elif 0 <= hint < dag.n_leaves:
+            hint = dag.leaf_node(hint)
+        else:
+            hint = -1
+
+        x, y, hint = float(point[0]), float(point[1]), int(hint)
+        if self.__stats is None:
+            node = self.__locate(dag, x, y, hint, max_steps)
+        else:
+            node = self.__measured('query', 1, lambda counters: self.__locate(dag, x, y, hint, max_steps, counters))
 
-        if not point in self.__root_triangle:
+        if node < 0:
             return None
-        
-        current = self.__root_triangle
-        while self.__triangles_graph[current]:
-            for triangle in self.__triangles_graph[current]:
-                if point in triangle:
-                    current = triangle
-                    break
-
-        return current
-    
+
+        return dag.triangle(node)
+
+    def locate_trajectory(self, points: np.ndarray, max_steps: int = WALK_MAX_STEPS) -> np.ndarray:
+        """
+        Lokalizuje kolejne punkty trajektorii, zaczynając przeszukiwanie każdego z nich od trójkąta poprzedniego punktu.
+        Dla punktów leżących blisko siebie koszt zapytania jest prawie stały. Wynik jest zgodny z wynikiem `query_many`.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                kolejne punkty trajektorii, kształt `(N, 2)`
+            max_steps: `int`
+                maksymalna liczba trójkątów odwiedzonych przed zejściem po drzewie
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, kształt `(N,)`.
+            Dla punktów spoza zewnętrznego trójkąta zwracane jest -1.
+
+        Raises
+        ------
+            `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        dag = self.__search_dag
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+        def locate_all(counters: QueryCounters = None) -> np.ndarray:
+            result = np.empty(len(points), dtype=np.int64)
+            previous = -1
+            for i, (x, y) in enumerate(points.tolist()):
+                located = self.__locate(dag, x, y, previous, max_steps, counters)
+                result[i] = located
+                if located >= 0:
+                    previous = located
+
+            return result
+
+        result = locate_all() if self.__stats is None else self.__measured('locate_trajectory', len(points), locate_all)
+
+        return dag.leaf_positions(result)
+
+    def query_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Lokalizuje wiele punktów naraz. Drzewo przeszukiwane jest poziomami dla całej paczki punktów,
+        a przynależność do trójkątów sprawdzana jest wektorowo. Wynik jest zgodny z wynikiem `query`.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, kształt `(N,)`.
+            Dla punktów spoza zewnętrznego trójkąta zwracane jest -1.
+
+        Raises
+        ------
+            `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        dag = self.__search_dag
+        grid = self.__grid(dag)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        start = grid.start_nodes(points) if grid is not None else None
+
+        if self.__stats is None:
+            return dag.leaf_positions(dag.locate_many(points, start))
+
+        return dag.leaf_positions(self.__measured('query_many', len(points), lambda counters: dag.locate_many(points, start, counters)))
+
+    def query_label(self, point: (float, float)) -> int:
+        """
+        Zwraca etykietę ściany zawierającej punkt: 0 dla wnętrza wielokąta utworzonego z `constrained=True`
+        albo etykietę ściany podziału utworzonego funkcją `from_subdivision`. Punkty leżące na krawędzi między
+        ścianami dostają etykietę jednej z nich, zawsze tej samej dla tego samego indeksu.
+
+        Parameters
+        ----------
+            point: `(float, float)`
+                Punkt do przeszukiwań
+
+        Returns
+        -------
+            `int`: etykieta ściany albo -1, jeśli punkt nie leży w żadnej ścianie
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony albo został striangulowany bez ograniczeń
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+        if self.__leaf_labels is None:
+            raise Exception("Polygon was triangulated without constraints, pass constrained=True")
+
+        # triangulacja z ograniczeniami nie jest zmieniana przyrostowo, więc numery liści są ich pozycjami
+        dag, x, y = self.__search_dag, float(point[0]), float(point[1])
+        if self.__stats is None:
+            node = self.__locate(dag, x, y, -1, 0)
+        else:
+            node = self.__measured('query_label', 1, lambda counters: self.__locate(dag, x, y, -1, 0, counters))
+
+        return int(self.__leaf_labels[node]) if node >= 0 else -1
+
+    def query_labels(self, points: np.ndarray) -> np.ndarray:
+        """
+        Wektorowa wersja `query_label`. Punkty lokalizowane są jak w `query_many`, a etykiety odczytywane są
+        z tablicy etykiet liści.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: etykiety ścian, -1 dla punktów spoza wszystkich ścian, kształt `(N,)`
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony albo został striangulowany bez ograniczeń
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+        if self.__leaf_labels is None:
+            raise Exception("Polygon was triangulated without constraints, pass constrained=True")
+
+        located = self.query_many(points)
+        labels = np.full(len(located), -1, dtype=self.__leaf_labels.dtype)
+        found = located >= 0
+        labels[found] = self.__leaf_labels[located[found]]
+
+        return labels
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """
+        Sprawdza, czy punkty leżą w wielokącie (z uwzględnieniem dziur) albo w którejś ścianie podziału płaszczyzny.
+        Każdy punkt lokalizowany jest jednym zejściem po drzewie jak w `query_many`, a przynależność znalezionego
+        trójkąta do wielokąta jest wyznaczona przy budowie triangulacji. Punkty leżące na brzegu wielokąta mogą
+        zostać zaliczone do wnętrza albo nie, ale zawsze tak samo dla tego samego indeksu.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do sprawdzenia, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: tablica `bool`, `True` dla punktów we wnętrzu wielokąta, kształt `(N,)`
+
+        Raises
+        ------
+            `Exception`: jeśli wielokąt nie został jeszcze przetworzony albo został striangulowany bez ograniczeń
+            (bez `constrained=True` ani dziur)
+        """
+        return self.query_labels(points) >= 0
+
+    def get_labels(self) -> np.ndarray:
+        """
+        Zwraca etykiety ścian trójkątów w kolejności listy `get_triangles()`
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `np.ndarray`: etykiety ścian, -1 dla trójkątów spoza ścian, albo `None` dla triangulacji bez ograniczeń
+        """
+        return None if self.__leaf_labels is None else np.array(self.__leaf_labels)
+
+    def parallel_locator(self, processes: int = None) -> ParallelLocator:
+        """
+        Tworzy pulę procesów lokalizujących punkty, które współdzielą przetworzony wielokąt przez pamięć współdzieloną.
+        Pulę można wykorzystać do wielu wywołań `query_many`; należy ją zamknąć funkcją `close` albo użyć w bloku `with`.
+
+        Parameters
+        ----------
+            processes: `int`
+                liczba procesów roboczych, domyślnie liczba rdzeni procesora
+
+        Returns
+        -------
+            `ParallelLocator`: pula procesów
+
+        Raises
+        ------
+            `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        return ParallelLocator(self.__search_dag, processes)
+
+    def query_many_parallel(self, points: np.ndarray, processes: int = None, chunk_size: int = None) -> np.ndarray:
+        """
+        Lokalizuje wiele punktów równolegle w puli procesów. Wynik jest zgodny z wynikiem `query_many`.
+        Przy wielokrotnych wywołaniach lepiej raz utworzyć pulę funkcją `parallel_locator`.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+            processes: `int`
+                liczba procesów roboczych, domyślnie liczba rdzeni procesora
+            chunk_size: `int`
+                liczba punktów w jednym zadaniu
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, kształt `(N,)`.
+            Dla punktów spoza zewnętrznego trójkąta zwracane jest -1.
+
+        Raises
+        ------
+            `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+        """
+        with self.parallel_locator(processes) as locator:
+            return locator.query_many(points, chunk_size)
+
+    def locate_stream(self, source: PointSource, chunk_size: int = 1 << 20, file_format: str = None, delimiter: str = ',',
+                      progress: Callable[[StreamProgress], None] = None, processes: int = None) -> Iterator[np.ndarray]:
+        """
+        Lokalizuje punkty z dużego pliku fragmentami, zwracając wyniki kolejnych fragmentów. W pamięci jest naraz
+        tylko jeden fragment punktów i wyników.
+
+        Parameters
+        ----------
+            source: `str`, `np.ndarray` lub iterowalny obiekt tablic
+                ścieżka do pliku CSV, `.npy` lub binarnego (pary `float64`), tablica albo gotowe fragmenty punktów
+            chunk_size: `int`
+                liczba punktów we fragmencie
+            file_format: `str`
+                `'csv'`, `'npy'` albo `'binary'`, domyślnie rozpoznawany po rozszerzeniu pliku
+            delimiter: `str`
+                separator kolumn pliku CSV
+            progress: `Callable[[StreamProgress], None]`
+                funkcja wywoływana po każdym fragmencie z liczbą przetworzonych punktów i przepustowością
+            processes: `int`
+                jeśli podano, fragmenty lokalizowane są w puli procesów jak w `query_many_parallel`
+
+        Returns
+        -------
+            `Iterator[np.ndarray]`: indeksy znalezionych trójkątów dla kolejnych fragmentów, jak w `query_many`
+
+        Raises
+        ------
+            `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+        """
+        if not self.__preproccessed:
+            raise Exception("Polygon is not preproccessed")
+
+        if processes is None:
+            yield from locate_stream(self.query_many, source, chunk_size, file_format, delimiter, progress)
+            return
+
+        with self.parallel_locator(processes) as locator:
+            yield from locate_stream(locator.query_many, source, chunk_size, file_format, delimiter, progress)
+
+    def locate_file(self, source: PointSource, output: str, chunk_size: int = 1 << 20, file_format: str = None, delimiter: str = ',',
+                    progress: Callable[[StreamProgress], None] = None, processes: int = None) -> int:
+        """
+        Lokalizuje punkty z dużego pliku fragmentami i zapisuje wyniki do surowego pliku binarnego z liczbami `int64`,
+        który można odczytać przez `np.memmap(output, dtype='<i8')`. Parametry jak w `locate_stream`.
+
+        Parameters
+        ----------
+            output: `str`
+                ścieżka do pliku wynikowego
+
+        Returns
+        -------
+            `int`: liczba zlokalizowanych punktów
+
+        Raises
+        ------
+            `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+        """
+        return write_stream(self.locate_stream(source, chunk_size, file_format, delimiter, progress, processes), output)
+
     def query_with_show(self, point: (float, float), draw_point=True):
         """
         Przeszukuje drzewo trójkątów, i rysuje wynik zawierający:
@@ -305,7 +1351,14 @@ class Kirkpatrick:
         Raises
         ------
             `Exception`: jeśli próbowano wywyołać przeszukiwanie bez wcześniejszego przetworzenia
+            albo nie zainstalowano bibliotek do rysowania
         """
+        # biblioteki do rysowania są opcjonalne i wczytywane dopiero tutaj, żeby nie spowalniać importu biblioteki
+        try:
+            from kirkpatrick_algorithm.visualizer.main import Visualizer
+        except ImportError as error:
+            raise Exception("Plotting requires the visualization extra: pip install kirkpatrick[visualization]") from error
+
         vis = Visualizer()
         t = self.query(point)
         if t is not None:
@@ -314,7 +1367,7 @@ class Kirkpatrick:
         if draw_point:
             vis.add_point(point, zorder=10)
 
-        for t in self.__triangles_list:
+        for t in self.get_triangles():
             vis.add_polygon([(t.pt1.x, t.pt1.y), (t.pt2.x, t.pt2.y), (t.pt3.x, t.pt3.y)], fill=False, color="blue")
 
         vis.show()
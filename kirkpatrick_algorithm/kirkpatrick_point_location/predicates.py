@@ -0,0 +1,176 @@
+"""
+Predykaty geometryczne używane przy przetwarzaniu i lokalizacji punktów.
+
+Orientacja trzech punktów liczona jest najpierw w arytmetyce zmiennoprzecinkowej. Jeśli wartość bezwzględna
+wyznacznika przekracza oszacowanie błędu zaokrągleń, jego znak jest na pewno poprawny; w przeciwnym razie
+(rzadko, tylko dla punktów prawie współliniowych) wynik liczony jest dokładnie na ułamkach. Dzięki temu
+wszystkie testy przynależności są spójne: punkt leżący w trójkącie rodzica leży w którymś z jego dzieci.
+"""
+from fractions import Fraction
+import numpy as np
+
+# względny błąd zaokrąglenia arytmetyki float64 oraz oszacowanie błędu wyznacznika orientacji
+# (J. R. Shewchuk, "Adaptive Precision Floating-Point Arithmetic and Fast Robust Geometric Predicates")
+EPSILON = 2.0 ** -53
+ORIENTATION_ERROR_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+INCIRCLE_ERROR_BOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+
+# liczniki wywołań predykatów (moduł `instrumentation`), `None`, gdy zliczanie jest wyłączone
+_counts = None
+
+
+def count_calls(counts: dict) -> dict:
+    """
+    Włącza zliczanie wywołań predykatów do słownika `counts` (z kluczami jak w `instrumentation.PREDICATES`)
+    albo wyłącza je dla `None`
+
+    Parameters
+    ----------
+        counts: `dict`
+            słownik liczników albo `None`
+
+    Returns
+    -------
+        `dict`: poprzedni słownik liczników albo `None`
+    """
+    global _counts
+    previous, _counts = _counts, counts
+    return previous
+
+
+def orientation_exact(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> int:
+    """
+    Oblicza orientację trzech punktów w arytmetyce dokładnej
+
+    Parameters
+    ----------
+        ax, ay, bx, by, cx, cy: `float`
+            współrzędne punktów a, b, c
+
+    Returns
+    -------
+        `int`: 1 gdy punkty tworzą skręt w lewo, -1 gdy w prawo, 0 gdy są współliniowe
+    """
+    if _counts is not None:
+        _counts['orientation_exact'] += 1
+
+    ax, ay, bx, by, cx, cy = (Fraction(value) for value in (ax, ay, bx, by, cx, cy))
+    result = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (result > 0) - (result < 0)
+
+
+def orientation(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> int:
+    """
+    Oblicza orientację trzech punktów. Wynik liczony jest w arytmetyce zmiennoprzecinkowej, a jeśli
+    jego znak nie jest pewny w świetle oszacowania błędu, obliczenie powtarzane jest dokładnie.
+
+    Parameters
+    ----------
+        ax, ay, bx, by, cx, cy: `float`
+            współrzędne punktów a, b, c
+
+    Returns
+    -------
+        `int`: 1 gdy punkty tworzą skręt w lewo, -1 gdy w prawo, 0 gdy są współliniowe
+    """
+    if _counts is not None:
+        _counts['orientation'] += 1
+
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    result = left - right
+
+    if abs(result) > ORIENTATION_ERROR_BOUND * (abs(left) + abs(right)):
+        return 1 if result > 0 else -1
+
+    return orientation_exact(ax, ay, bx, by, cx, cy)
+
+
+def orientation_many(ax: np.ndarray, ay: np.ndarray, bx: np.ndarray, by: np.ndarray, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+    """
+    Wektorowa wersja `orientation`. Znak wyznacznika liczony jest w arytmetyce zmiennoprzecinkowej dla wszystkich
+    trójek naraz, a dokładne obliczenie wykonywane jest tylko dla trójek, których wynik nie jest pewny.
+
+    Parameters
+    ----------
+        ax, ay, bx, by, cx, cy: `np.ndarray`
+            współrzędne punktów a, b, c, tablice o tym samym kształcie `(N,)`
+
+    Returns
+    -------
+        `np.ndarray`: tablica `int8` o wartościach 1, -1 lub 0, kształt `(N,)`
+    """
+    if _counts is not None:
+        _counts['orientation'] += np.size(ax)
+
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    result = left - right
+
+    signs = np.sign(result).astype(np.int8)
+    uncertain = np.flatnonzero(np.abs(result) <= ORIENTATION_ERROR_BOUND * (np.abs(left) + np.abs(right)))
+    for i in uncertain.tolist():
+        signs[i] = orientation_exact(ax[i], ay[i], bx[i], by[i], cx[i], cy[i])
+
+    return signs
+
+
+def incircle_exact(ax: float, ay: float, bx: float, by: float, cx: float, cy: float, dx: float, dy: float) -> int:
+    """
+    Sprawdza w arytmetyce dokładnej, czy punkt d leży wewnątrz okręgu opisanego na trójkącie abc
+
+    Parameters
+    ----------
+        ax, ay, bx, by, cx, cy: `float`
+            współrzędne wierzchołków trójkąta zorientowanego przeciwnie do ruchu wskazówek zegara
+        dx, dy: `float`
+            współrzędne sprawdzanego punktu
+
+    Returns
+    -------
+        `int`: 1 gdy punkt leży wewnątrz okręgu, -1 gdy na zewnątrz, 0 gdy na okręgu
+    """
+    if _counts is not None:
+        _counts['incircle_exact'] += 1
+
+    ax, ay, bx, by, cx, cy, dx, dy = (Fraction(value) for value in (ax, ay, bx, by, cx, cy, dx, dy))
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    result = ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+              (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+              (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+    return (result > 0) - (result < 0)
+
+
+def incircle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float, dx: float, dy: float) -> int:
+    """
+    Sprawdza, czy punkt d leży wewnątrz okręgu opisanego na trójkącie abc. Podobnie jak w `orientation` wynik
+    liczony jest w arytmetyce zmiennoprzecinkowej i powtarzany dokładnie, jeśli jego znak nie jest pewny.
+
+    Parameters
+    ----------
+        ax, ay, bx, by, cx, cy: `float`
+            współrzędne wierzchołków trójkąta zorientowanego przeciwnie do ruchu wskazówek zegara
+        dx, dy: `float`
+            współrzędne sprawdzanego punktu
+
+    Returns
+    -------
+        `int`: 1 gdy punkt leży wewnątrz okręgu, -1 gdy na zewnątrz, 0 gdy na okręgu
+    """
+    if _counts is not None:
+        _counts['incircle'] += 1
+
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift, blift, clift = adx * adx + ady * ady, bdx * bdx + bdy * bdy, cdx * cdx + cdy * cdy
+
+    result = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift + (abs(cdxady) + abs(adxcdy)) * blift +
+                 (abs(adxbdy) + abs(bdxady)) * clift)
+
+    if abs(result) > INCIRCLE_ERROR_BOUND * permanent:
+        return 1 if result > 0 else -1
+
+    return incircle_exact(ax, ay, bx, by, cx, cy, dx, dy)
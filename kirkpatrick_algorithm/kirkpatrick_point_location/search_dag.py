@@ -0,0 +1,406 @@
+from planegeometry.structures.planarmaps import Triangle
+from typing import Dict, List
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location import kernels
+from kirkpatrick_algorithm.kirkpatrick_point_location.instrumentation import QueryCounters
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation, orientation_many
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+
+
+class SearchDAG:
+    """
+    Drzewo przeszukiwania (DAG) zapisane w płaskich tablicach w formacie CSR.
+
+    Wierzchołki drzewa to trójkąty z magazynu `TriangleStore` i mają te same numery. Liście mają numery
+    `0..n_leaves-1` zgodne z kolejnością trójkątów triangulacji początkowej. Dzieci wierzchołka `i` to
+    `child_indices[child_offsets[i]:child_offsets[i+1]]`. Wierzchołki powstałe w rundzie `r` mają numery
+    z przedziału `level_offsets[r]..level_offsets[r+1]-1` (runda 0 to liście), a ich dzieci mają zawsze mniejsze numery.
+
+    Wszystkie trójkąty w magazynie są zorientowane przeciwnie do ruchu wskazówek zegara. Punkt należy do trójkąta,
+    gdy nie leży na prawo od żadnej z jego krawędzi (trójkąt jest domknięty), a trójkąty zdegenerowane (o zerowym
+    polu) nie zawierają żadnego punktu. Orientacje liczone są predykatami z modułu `predicates`, więc wynik jest
+    dokładny: punkt należący do trójkąta rodzica należy do co najmniej jednego z jego dzieci, a spośród nich
+    wybierane jest pierwsze w kolejności `child_indices`. Każdy punkt korzenia trafia więc do dokładnie jednego liścia.
+
+    Drzewo zmieniane przyrostowo (moduł `dynamic`) nie ma tablicy `child_offsets`: dzieci wierzchołka `i` to
+    `child_indices[child_starts[i]:child_ends[i]]`, a dawne liście dostają dzieci o większych numerach niż
+    ich rodzice. Liście nie mają wtedy kolejnych numerów, więc `leaf_ids[k]` to numer `k`-tego liścia, a `leaf_slots`
+    odwzorowuje numer wierzchołka na pozycję liścia (-1 dla wierzchołków wewnętrznych).
+    """
+    __slots__ = ('store', 'child_offsets', 'child_indices', 'root', 'level_offsets', 'child_starts', 'child_ends', 'leaf_ids', 'leaf_slots')
+
+    def __init__(self, store: TriangleStore, child_offsets: np.ndarray, child_indices: np.ndarray, root: int, level_offsets: np.ndarray,
+                 child_starts: np.ndarray = None, child_ends: np.ndarray = None, leaf_ids: np.ndarray = None, leaf_slots: np.ndarray = None):
+        self.store = store
+        self.child_offsets = child_offsets
+        self.child_indices = child_indices
+        self.root = root
+        self.level_offsets = level_offsets
+        self.child_starts = child_offsets[:-1] if child_starts is None else child_starts
+        self.child_ends = child_offsets[1:] if child_ends is None else child_ends
+        self.leaf_ids = leaf_ids
+        if leaf_ids is not None and leaf_slots is None:
+            leaf_slots = np.full(len(store), -1, dtype=np.int64)
+            leaf_slots[leaf_ids] = np.arange(len(leaf_ids))
+        self.leaf_slots = leaf_slots
+
+    @property
+    def n_leaves(self) -> int:
+        """
+        Liczba liści drzewa
+        """
+        if self.leaf_ids is not None:
+            return len(self.leaf_ids)
+
+        return int(self.level_offsets[1])
+
+    def leaf_node(self, position: int) -> int:
+        """
+        Zwraca numer wierzchołka drzewa będącego liściem o podanej pozycji w liście `leaves()`
+        """
+        return position if self.leaf_ids is None else int(self.leaf_ids[position])
+
+    def leaf_nodes(self) -> np.ndarray:
+        """
+        Zwraca numery wierzchołków drzewa będących liśćmi, w kolejności listy `leaves()`
+        """
+        return np.arange(self.n_leaves) if self.leaf_ids is None else np.asarray(self.leaf_ids)
+
+    def leaf_positions(self, nodes: np.ndarray) -> np.ndarray:
+        """
+        Zamienia numery liści (wynik `locate_many`) na ich pozycje w liście `leaves()`, zachowując -1
+        """
+        if self.leaf_slots is None:
+            return nodes
+
+        positions = np.full(len(nodes), -1, dtype=np.int64)
+        found = nodes >= 0
+        positions[found] = self.leaf_slots[nodes[found]]
+
+        return positions
+
+    def compact(self) -> (np.ndarray, np.ndarray):
+        """
+        Zwraca listy dzieci w formacie CSR (`child_offsets`, `child_indices`), także dla drzewa zmienianego przyrostowo
+        """
+        if self.child_offsets is not None:
+            return self.child_offsets, self.child_indices
+
+        counts = self.child_ends - self.child_starts
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        positions = np.repeat(self.child_starts - offsets[:-1], counts) + np.arange(offsets[-1])
+
+        return offsets, np.ascontiguousarray(self.child_indices[positions])
+
+    @staticmethod
+    def from_graph(store: TriangleStore, graph: Dict[int, List[int]], root: int, level_offsets: np.ndarray) -> 'SearchDAG':
+        """
+        Kompiluje słownikową reprezentację drzewa do postaci tablicowej
+
+        Parameters
+        ----------
+            store: `TriangleStore`
+                zamrożony magazyn wszystkich trójkątów drzewa
+            graph: `Dict[int, List[int]]`
+                słownik mapujący numer trójkąta na listę numerów jego dzieci
+            root: `int`
+                numer korzenia drzewa
+            level_offsets: `np.ndarray`
+                numery pierwszych wierzchołków powstałych w kolejnych rundach, zakończone liczbą wszystkich wierzchołków
+
+        Returns
+        -------
+            `SearchDAG`: skompilowane drzewo
+        """
+        child_counts = np.zeros(len(store), dtype=np.int64)
+        for node, children in graph.items():
+            child_counts[node] = len(children)
+
+        child_offsets = np.zeros(len(store) + 1, dtype=np.int64)
+        np.cumsum(child_counts, out=child_offsets[1:])
+        child_indices = np.fromiter((child for node in range(len(store)) for child in graph.get(node, ())),
+                                    dtype=np.int32, count=child_offsets[-1])
+
+        return SearchDAG(store, child_offsets, child_indices, root, level_offsets)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def depth(self) -> int:
+        """
+        Oblicza długość najdłuższej ścieżki od korzenia do liścia, przetwarzając wierzchołki rundami
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `int`: głębokość drzewa
+        """
+        depths = np.zeros(len(self), dtype=np.int64)
+
+        if self.leaf_ids is not None:
+            # po zmianach przyrostowych numery nie wyznaczają kolejności topologicznej, więc głębokości
+            # poprawiane są dla wszystkich wierzchołków wewnętrznych naraz, aż przestaną się zmieniać
+            offsets, children = self.compact()
+            internal = np.flatnonzero(np.diff(offsets))
+            while internal.size:
+                updated = np.maximum.reduceat(depths[children], offsets[internal]) + 1
+                if np.array_equal(updated, depths[internal]):
+                    break
+                depths[internal] = updated
+
+            return int(depths[self.root])
+
+        for start, end in zip(self.level_offsets[1:-1].tolist(), self.level_offsets[2:].tolist()):
+            if start == end:
+                continue
+            children = self.child_indices[self.child_offsets[start]:self.child_offsets[end]]
+            depths[start:end] = np.maximum.reduceat(depths[children], self.child_offsets[start:end] - self.child_offsets[start]) + 1
+
+        return int(depths[self.root])
+
+    def triangle(self, node: int) -> Triangle:
+        """
+        Tworzy obiekt `Triangle` dla wierzchołka drzewa
+
+        Parameters
+        ----------
+            node: `int`
+                numer wierzchołka drzewa
+
+        Returns
+        -------
+            `Triangle`: trójkąt odpowiadający wierzchołkowi
+        """
+        return self.store.triangle(node)
+
+    def leaves(self) -> List[Triangle]:
+        """
+        Zwraca listę trójkątów triangulacji początkowej (liści drzewa)
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `List[Triangle]`: lista liści w kolejności ich numerów
+        """
+        return [self.triangle(node) for node in self.leaf_nodes().tolist()]
+
+    def contains(self, node: int, x: float, y: float, strict: bool = False) -> bool:
+        """
+        Sprawdza, czy punkt należy do trójkąta wierzchołka drzewa
+
+        Parameters
+        ----------
+            node: `int`
+                numer wierzchołka drzewa
+            x: `float`
+                współrzędna x punktu
+            y: `float`
+                współrzędna y punktu
+            strict: `bool`
+                jeśli `True`, sprawdza przynależność do wnętrza trójkąta (bez brzegu)
+
+        Returns
+        -------
+            `bool`: wartość logiczna mówiąca czy punkt należy do trójkąta
+        """
+        (x1, y1), (x2, y2), (x3, y3) = self.store.vertices.take(self.store.triangles[node], axis=0).tolist()
+        bound = 1 if strict else 0
+
+        first = orientation(x1, y1, x2, y2, x, y)
+        if first < bound:
+            return False
+        second = orientation(x2, y2, x3, y3, x, y)
+        if second < bound:
+            return False
+        third = orientation(x3, y3, x1, y1, x, y)
+
+        # wszystkie trzy orientacje są zerowe tylko dla trójkąta zdegenerowanego i punktu na jego prostej
+        return third >= bound and (first or second or third) != 0
+
+    def contains_many(self, nodes: np.ndarray, points: np.ndarray, strict: bool = False) -> np.ndarray:
+        """
+        Wektorowa wersja `contains`. Używa tych samych predykatów, więc wyniki są identyczne.
+
+        Parameters
+        ----------
+            nodes: `np.ndarray`
+                numery wierzchołków drzewa, kształt `(M,)`
+            points: `np.ndarray`
+                sprawdzane punkty, kształt `(M, 2)`
+            strict: `bool`
+                jeśli `True`, sprawdza przynależność do wnętrza trójkątów (bez brzegu)
+
+        Returns
+        -------
+            `np.ndarray`: tablica wartości logicznych, kształt `(M,)`
+        """
+        triangles = self.store.vertices[self.store.triangles[nodes]]
+        x, y = points[:, 0], points[:, 1]
+        bound = 1 if strict else 0
+
+        result = np.ones(len(nodes), dtype=bool)
+        nonzero = np.zeros(len(nodes), dtype=bool)
+        for i, j in ((0, 1), (1, 2), (2, 0)):
+            signs = orientation_many(triangles[:, i, 0], triangles[:, i, 1], triangles[:, j, 0], triangles[:, j, 1], x, y)
+            result &= signs >= bound
+            nonzero |= signs != 0
+
+        return result & nonzero
+
+    def locate(self, x: float, y: float, start: int = None, counters: QueryCounters = None) -> int:
+        """
+        Schodzi po drzewie od korzenia (albo od podanego wierzchołka) do liścia zawierającego punkt
+
+        Parameters
+        ----------
+            x: `float`
+                współrzędna x punktu
+            y: `float`
+                współrzędna y punktu
+            start: `int`
+                wierzchołek, od którego zaczyna się przeszukiwanie. Punkt musi leżeć we wnętrzu jego trójkąta,
+                wtedy wynik jest taki sam jak przy przeszukiwaniu od korzenia. Domyślnie (lub dla -1) korzeń.
+            counters: `QueryCounters`
+                jeśli podano, zwiększane są w nim liczby odwiedzonych wierzchołków i testów przynależności
+
+        Returns
+        -------
+            `int`: numer liścia zawierającego punkt lub -1, jeśli punkt leży poza korzeniem
+        """
+        if counters is not None:
+            return self.__locate_counted(x, y, start, counters)
+
+        if start is None or start < 0:
+            if not self.contains(self.root, x, y):
+                return -1
+            start = self.root
+
+        starts, ends, children = self.child_starts, self.child_ends, self.child_indices
+        current = start
+        while starts[current] != ends[current]:
+            for child in children[starts[current]:ends[current]].tolist():
+                if self.contains(child, x, y):
+                    current = child
+                    break
+            else:
+                # przy spójnych predykatach nie powinno się zdarzyć, ale nie pozwala na zapętlenie
+                return -1
+
+        return current
+
+    def __locate_counted(self, x: float, y: float, start: int, counters: QueryCounters) -> int:
+        """
+        Wersja `locate` zliczająca odwiedzone wierzchołki i testy przynależności, osobna, by nie spowalniać zwykłych zapytań
+        """
+        if start is None or start < 0:
+            counters.tests += 1
+            if not self.contains(self.root, x, y):
+                return -1
+            start = self.root
+
+        starts, ends, children = self.child_starts, self.child_ends, self.child_indices
+        current = start
+        counters.nodes += 1
+        while starts[current] != ends[current]:
+            for child in children[starts[current]:ends[current]].tolist():
+                counters.tests += 1
+                if self.contains(child, x, y):
+                    current = child
+                    counters.nodes += 1
+                    break
+            else:
+                return -1
+
+        return current
+
+    def locate_many(self, points: np.ndarray, start: np.ndarray = None, counters: QueryCounters = None, hits: np.ndarray = None) -> np.ndarray:
+        """
+        Lokalizuje paczkę punktów skompilowanym jądrem z modułu `kernels`, jeśli jest dostępne, a w przeciwnym razie
+        (oraz przy zliczaniu `counters` lub `hits`) schodząc po drzewie poziomami dla wszystkich punktów naraz.
+        Wynik nie zależy od wybranej ścieżki.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                punkty do lokalizacji, kształt `(N, 2)`
+            start: `np.ndarray`
+                wierzchołki, od których zaczyna się przeszukiwanie dla kolejnych punktów, jak w `locate`,
+                kształt `(N,)`. Wartość -1 oznacza korzeń. Domyślnie wszystkie punkty zaczynają od korzenia.
+            counters: `QueryCounters`
+                jak w `locate`, zsumowane dla wszystkich punktów
+            hits: `np.ndarray`
+                jeśli podano, `hits[k]` zwiększane jest o liczbę punktów, które zeszły do dziecka `child_indices[k]`,
+                kształt jak `child_indices`
+
+        Returns
+        -------
+            `np.ndarray`: numery liści zawierających punkty, -1 dla punktów spoza korzenia, kształt `(N,)`
+        """
+        kernel = kernels.descent_kernel(len(points)) if counters is None and hits is None else None
+        if kernel is None:
+            return self.__locate_levels(points, start, counters, hits)
+
+        result = kernels.locate_many(kernel, self, points, start)
+
+        # punkty, dla których jądro nie rozstrzygnęło któregoś testu, lokalizowane są z obliczeniami dokładnymi
+        unresolved = np.flatnonzero(result == kernels.UNRESOLVED)
+        if unresolved.size:
+            result[unresolved] = self.__locate_levels(points[unresolved], start[unresolved] if start is not None else None)
+
+        return result
+
+    def __locate_levels(self, points: np.ndarray, start: np.ndarray = None, counters: QueryCounters = None, hits: np.ndarray = None) -> np.ndarray:
+        """
+        Lokalizuje paczkę punktów poziomami w numpy; parametry i wynik jak w `locate_many`
+        """
+        result = np.full(len(points), -1, dtype=np.int64)
+
+        current = np.full(len(points), self.root, dtype=np.int64)
+        if start is None:
+            active = np.flatnonzero(self.contains_many(current, points))
+        else:
+            start = np.asarray(start, dtype=np.int64)
+            jumped = start >= 0
+            current[jumped] = start[jumped]
+            from_root = np.flatnonzero(~jumped)
+            inside = from_root[self.contains_many(current[from_root], points[from_root])]
+            active = np.sort(np.concatenate([np.flatnonzero(jumped), inside]))
+
+        if counters is not None:
+            counters.tests += len(points) if start is None else len(from_root)
+
+        while active.size:
+            if counters is not None:
+                counters.nodes += len(active)
+
+            starts = self.child_starts[current[active]]
+            counts = self.child_ends[current[active]] - starts
+
+            is_leaf = counts == 0
+            result[active[is_leaf]] = current[active[is_leaf]]
+            active, starts, counts = active[~is_leaf], starts[~is_leaf], counts[~is_leaf]
+
+            found = np.full(len(active), -1, dtype=np.int64)
+            for j in range(counts.max(initial=0)):
+                candidates = np.flatnonzero((found < 0) & (counts > j))
+                nodes = self.child_indices[starts[candidates] + j]
+                inside = self.contains_many(nodes, points[active[candidates]])
+                found[candidates[inside]] = nodes[inside]
+                if counters is not None:
+                    counters.tests += len(candidates)
+                if hits is not None:
+                    np.add.at(hits, starts[candidates[inside]] + j, 1)
+
+            # punkty, które nie trafiły do żadnego dziecka, zostają z wynikiem -1
+            located = found >= 0
+            current[active[located]] = found[located]
+            active = active[located]
+
+        return result
@@ -0,0 +1,109 @@
+"""
+Binarny format zapisu przetworzonego indeksu.
+
+Plik zaczyna się 8-bajtowym znacznikiem `MAGIC`, po którym następują numer wersji formatu i długość nagłówka
+(dwie liczby `uint32` little-endian) oraz nagłówek w postaci JSON. Nagłówek opisuje typ, kształt i położenie
+każdej tablicy w pliku oraz dodatkowe metadane. Tablice zapisane są w kolejności little-endian i wyrównane do
+64 bajtów, więc przy wczytywaniu można je bez kopiowania odwzorować w pamięci (`mmap`) i współdzielić między
+procesami przez pamięć podręczną stron systemu operacyjnego.
+"""
+from typing import Dict, Tuple
+import json
+import struct
+import numpy as np
+
+MAGIC = b'KIRKIDX\x00'
+# wersja 2: wszystkie trójkąty zapisane są w orientacji przeciwnej do ruchu wskazówek zegara
+VERSION = 2
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_index(path: str, arrays: Dict[str, np.ndarray], meta: dict):
+    """
+    Zapisuje tablice i metadane indeksu do pliku
+
+    Parameters
+    ----------
+        path: `str`
+            ścieżka do pliku
+        arrays: `Dict[str, np.ndarray]`
+            zapisywane tablice
+        meta: `dict`
+            metadane, które da się zapisać w formacie JSON
+
+    Returns
+    -------
+        `None`
+    """
+    arrays = {name: np.ascontiguousarray(array, dtype=np.asarray(array).dtype.newbyteorder('<')) for name, array in arrays.items()}
+
+    # przesunięcia tablic zależą od długości nagłówka, a nagłówek zawiera przesunięcia, więc
+    # liczymy je względem początku obszaru danych, który zaczyna się po wyrównanym nagłówku
+    descriptions, offset = {}, 0
+    for name, array in arrays.items():
+        descriptions[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({'arrays': descriptions, 'meta': meta}).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    with open(path, 'wb') as file:
+        file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        file.write(header)
+        for name, array in arrays.items():
+            file.seek(data_start + descriptions[name]['offset'])
+            file.write(array.tobytes())
+        file.truncate(data_start + offset)
+
+
+def read_index(path: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Wczytuje tablice i metadane indeksu z pliku
+
+    Parameters
+    ----------
+        path: `str`
+            ścieżka do pliku
+        mmap: `bool`
+            jeśli `True`, tablice są tylko do odczytu i odwzorowane w pamięci bez kopiowania,
+            w przeciwnym razie plik jest wczytywany do pamięci
+
+    Returns
+    -------
+        `Dict[str, np.ndarray]`: wczytane tablice
+        `dict`: metadane
+
+    Raises
+    ------
+        `Exception`: jeśli plik nie jest indeksem lub ma nieobsługiwaną wersję formatu
+    """
+    with open(path, 'rb') as file:
+        magic, version, header_length = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise Exception(f"{path} is not a Kirkpatrick index file")
+        if version != VERSION:
+            raise Exception(f"Unsupported index format version {version}, expected {VERSION}")
+        header = json.loads(file.read(header_length).decode('utf-8'))
+
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+
+    arrays = {}
+    for name, description in header['arrays'].items():
+        dtype = np.dtype(description['dtype'])
+        count = int(np.prod(description['shape'], dtype=np.int64))
+        start = data_start + description['offset']
+        array = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(description['shape'])
+        arrays[name] = array if mmap else np.asarray(array)
+
+    return arrays, header['meta']
@@ -0,0 +1,838 @@
+"""
+Serwer lokalizacji punktów oparty na asyncio, z klientem i generatorem obciążenia.
+
+Serwer wczytuje przetworzony indeks (`Kirkpatrick.load`) i odpowiada na zapytania przez gniazdo TCP lub gniazdo
+uniksowe. Zapytania wielu klientów przychodzące w tym samym czasie są łączone w paczki (micro-batching)
+i lokalizowane jednym wywołaniem `query_many` (albo `query_labels`) w osobnym wątku, więc koszt wywołania
+rozkłada się na wiele małych zapytań, a pętla zdarzeń w tym czasie przyjmuje kolejne zapytania.
+
+Protokół składa się z ramek: długość ramki (`uint32` little-endian) i treść. Pierwszy bajt treści określa jej format:
+    - `B` (binarny): nagłówek `BINARY_HEADER` (format, metoda, numer zapytania, liczba punktów), a po nim punkty jako
+      pary `float64` w zapytaniu albo wyniki jako `int64` w odpowiedzi
+    - `J` (JSON): obiekt `{"id": ..., "method": ..., "points": [[x, y], ...]}` w zapytaniu
+      i `{"id": ..., "result": ...}` albo `{"id": ..., "error": ...}` w odpowiedzi
+    - `E` (błąd zapytania binarnego): numer zapytania (`uint64`) i komunikat w UTF-8
+Dostępne metody to `query_many` i `query_labels` (numery 0 i 1 w formacie binarnym) oraz `stats` (tylko JSON),
+zwracająca statystyki serwera. Odpowiedzi na zapytania jednego połączenia mogą przychodzić w innej kolejności
+niż zapytania i są rozpoznawane po numerze.
+
+Przeciążenie: serwer przyjmuje naraz co najwyżej `max_pending` punktów oczekujących na lokalizację, a z jednego
+połączenia co najwyżej `max_inflight` zapytań. Po przekroczeniu limitów przestaje czytać z połączeń, więc klienci
+są spowalniani przez mechanizm kontroli przepływu TCP. Zapytania większe niż `max_request` punktów są odrzucane.
+
+Przykłady:
+    python -m kirkpatrick_algorithm.kirkpatrick_point_location.service serve index.kp --port 8765
+    python -m kirkpatrick_algorithm.kirkpatrick_point_location.service load --port 8765 --requests 100000
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Union
+import argparse
+import asyncio
+import json
+import struct
+import sys
+import time
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.point_location import Kirkpatrick
+
+DEFAULT_PORT = 8765
+
+FRAME_HEADER = struct.Struct('<I')
+BINARY_HEADER = struct.Struct('<cBQI')
+ERROR_HEADER = struct.Struct('<cQ')
+
+METHODS = ('query_many', 'query_labels')
+
+# największa dopuszczalna ramka; dłuższa oznacza błąd protokołu i zamknięcie połączenia
+MAX_FRAME = 1 << 28
+
+# liczba ostatnich zapytań, z których liczone są percentyle opóźnień
+LATENCY_WINDOW = 10000
+
+
+class Request(NamedTuple):
+    """
+    Zdekodowane zapytanie
+    """
+    binary: bool
+    method: str
+    id: int
+    points: np.ndarray
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    Czyta jedną ramkę protokołu
+
+    Parameters
+    ----------
+        reader: `asyncio.StreamReader`
+            strumień połączenia
+
+    Returns
+    -------
+        `bytes`: treść ramki albo `None`, jeśli połączenie zostało zamknięte przed początkiem ramki
+
+    Raises
+    ------
+        `Exception`: jeśli ramka jest dłuższa niż `MAX_FRAME`
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as error:
+        if error.partial:
+            raise
+        return None
+
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise Exception(f"Frame of {length} bytes exceeds the limit of {MAX_FRAME} bytes")
+
+    return await reader.readexactly(length)
+
+
+def frame(payload: bytes) -> bytes:
+    """
+    Dodaje do treści nagłówek z długością ramki
+    """
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def encode_request(request_id: int, method: str, points: np.ndarray = None, binary: bool = True) -> bytes:
+    """
+    Koduje zapytanie
+
+    Parameters
+    ----------
+        request_id: `int`
+            numer zapytania, przepisywany do odpowiedzi
+        method: `str`
+            `'query_many'`, `'query_labels'` albo `'stats'` (tylko w formacie JSON)
+        points: `np.ndarray`
+            punkty do lokalizacji, kształt `(N, 2)`
+        binary: `bool`
+            jeśli `True`, zapytanie kodowane jest binarnie, w przeciwnym razie jako JSON
+
+    Returns
+    -------
+        `bytes`: treść ramki
+    """
+    if not binary:
+        message = {'id': request_id, 'method': method}
+        if points is not None:
+            message['points'] = np.asarray(points, dtype=np.float64).reshape(-1, 2).tolist()
+        return b'J' + json.dumps(message).encode()
+
+    points = np.ascontiguousarray(points, dtype='<f8').reshape(-1, 2)
+    return BINARY_HEADER.pack(b'B', METHODS.index(method), request_id, len(points)) + points.tobytes()
+
+
+def decode_request(payload: bytes) -> Request:
+    """
+    Dekoduje zapytanie
+
+    Parameters
+    ----------
+        payload: `bytes`
+            treść ramki
+
+    Returns
+    -------
+        `Request`: zapytanie
+
+    Raises
+    ------
+        `Exception`: jeśli zapytanie jest niepoprawne
+    """
+    if payload[:1] == b'J':
+        message = json.loads(payload[1:])
+        method = message.get('method')
+        if method not in METHODS and method != 'stats':
+            raise Exception(f"Unknown method: {method}")
+        points = np.asarray(message.get('points', []), dtype=np.float64).reshape(-1, 2)
+        return Request(False, method, int(message.get('id', 0)), points)
+
+    if payload[:1] != b'B' or len(payload) < BINARY_HEADER.size:
+        raise Exception("Unknown message format")
+
+    _, method, request_id, count = BINARY_HEADER.unpack_from(payload)
+    if method >= len(METHODS):
+        raise Exception(f"Unknown method: {method}")
+    if len(payload) != BINARY_HEADER.size + count * 16:
+        raise Exception(f"Expected {count} points, got {len(payload) - BINARY_HEADER.size} bytes")
+
+    points = np.frombuffer(payload, dtype='<f8', offset=BINARY_HEADER.size).reshape(-1, 2)
+    return Request(True, METHODS[method], request_id, points)
+
+
+def encode_response(request: Request, result: Union[np.ndarray, dict]) -> bytes:
+    """
+    Koduje odpowiedź w formacie zapytania
+    """
+    if not request.binary:
+        return b'J' + json.dumps({'id': request.id, 'result': result if isinstance(result, dict) else result.tolist()}).encode()
+
+    result = np.ascontiguousarray(result, dtype='<i8')
+    return BINARY_HEADER.pack(b'B', METHODS.index(request.method), request.id, len(result)) + result.tobytes()
+
+
+def encode_error(request_id: int, message: str, binary: bool) -> bytes:
+    """
+    Koduje odpowiedź z błędem zapytania
+    """
+    if not binary:
+        return b'J' + json.dumps({'id': request_id, 'error': message}).encode()
+
+    return ERROR_HEADER.pack(b'E', request_id) + message.encode()
+
+
+def decode_response(payload: bytes) -> (int, object, str):
+    """
+    Dekoduje odpowiedź
+
+    Parameters
+    ----------
+        payload: `bytes`
+            treść ramki
+
+    Returns
+    -------
+        `int`: numer zapytania
+        `object`: wynik (`np.ndarray` dla lokalizacji, `dict` dla statystyk) albo `None`
+        `str`: komunikat błędu albo `None`
+    """
+    if payload[:1] == b'J':
+        message = json.loads(payload[1:])
+        result = message.get('result')
+        if isinstance(result, list):
+            result = np.array(result, dtype=np.int64)
+        return message.get('id', 0), result, message.get('error')
+
+    if payload[:1] == b'E':
+        _, request_id = ERROR_HEADER.unpack_from(payload)
+        return request_id, None, payload[ERROR_HEADER.size:].decode()
+
+    _, _, request_id, _ = BINARY_HEADER.unpack_from(payload)
+    return request_id, np.frombuffer(payload, dtype='<i8', offset=BINARY_HEADER.size).astype(np.int64), None
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """
+    Zwraca percentyle opóźnień w milisekundach
+
+    Parameters
+    ----------
+        latencies: `List[float]`
+            opóźnienia w sekundach
+
+    Returns
+    -------
+        `Dict[str, float]`: `p50`, `p95`, `p99` i `max` (zera, jeśli nie ma pomiarów)
+    """
+    if not latencies:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+    return {'p50': p50, 'p95': p95, 'p99': p99, 'max': float(values.max())}
+
+
+class ServiceStats:
+    """
+    Statystyki serwera: liczby zapytań, punktów i paczek, przepustowość od uruchomienia oraz percentyle opóźnień
+    ostatnich `LATENCY_WINDOW` zapytań (od odebrania zapytania do wysłania odpowiedzi)
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.connections = 0
+        self.requests = 0
+        self.points = 0
+        self.batches = 0
+        self.batched_points = 0
+        self.max_batch_points = 0
+        self.errors = 0
+        self.rejected = 0
+        self.pending_points = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def summary(self) -> dict:
+        """
+        Zwraca statystyki jako słownik, który da się zapisać w formacie JSON
+        """
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+
+        return {
+            'uptime_s': elapsed,
+            'connections': self.connections,
+            'requests': self.requests,
+            'points': self.points,
+            'batches': self.batches,
+            'mean_batch_points': self.batched_points / self.batches if self.batches else 0.0,
+            'max_batch_points': self.max_batch_points,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'pending_points': self.pending_points,
+            'requests_per_second': self.requests / elapsed,
+            'points_per_second': self.points / elapsed,
+            'latency_ms': latency_summary(list(self.latencies)),
+        }
+
+
+class MicroBatcher:
+    """
+    Łączy zapytania oczekujące w tym samym czasie w paczki i lokalizuje je jednym wywołaniem funkcji danej metody.
+    Paczka zamykana jest, gdy liczba punktów osiągnie `max_batch` albo minie `max_delay` sekund od pierwszego
+    zapytania; zapytania przychodzące w trakcie lokalizacji paczki trafiają do następnej.
+    """
+
+    def __init__(self, functions: Dict[str, Callable[[np.ndarray], np.ndarray]], stats: ServiceStats,
+                 max_batch: int = 1 << 16, max_delay: float = 1e-3, max_pending: int = 1 << 20):
+        """
+            Konstruktor klasy MicroBatcher.
+
+            Parmeters
+            ---------
+                functions: `Dict[str, Callable[[np.ndarray], np.ndarray]]`
+                    funkcje lokalizujące paczkę punktów dla kolejnych metod
+                stats: `ServiceStats`
+                    statystyki uzupełniane o liczby paczek
+                max_batch: `int`
+                    liczba punktów, po której paczka jest zamykana bez czekania
+                max_delay: `float`
+                    maksymalny czas oczekiwania na kolejne zapytania w sekundach
+                max_pending: `int`
+                    maksymalna liczba oczekujących punktów, powyżej której `submit` czeka na zwolnienie miejsca
+        """
+        self.__functions = functions
+        self.__stats = stats
+        self.__max_batch = max_batch
+        self.__max_delay = max_delay
+        self.__max_pending = max_pending
+        self.__queue = asyncio.Queue()
+        self.__capacity = asyncio.Condition()
+        self.__executor = ThreadPoolExecutor(1)
+        self.__task = asyncio.ensure_future(self.__run())
+
+    async def submit(self, method: str, points: np.ndarray) -> np.ndarray:
+        """
+        Dodaje zapytanie do następnej paczki i czeka na jego wynik
+
+        Parameters
+        ----------
+            method: `str`
+                nazwa metody
+            points: `np.ndarray`
+                punkty zapytania, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: wyniki dla punktów zapytania
+        """
+        count = len(points)
+        async with self.__capacity:
+            # zapytanie większe niż limit jest przyjmowane, gdy nic innego nie czeka
+            await self.__capacity.wait_for(lambda: self.__stats.pending_points == 0 or self.__stats.pending_points + count <= self.__max_pending)
+            self.__stats.pending_points += count
+
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((method, points, future))
+        try:
+            return await future
+        finally:
+            async with self.__capacity:
+                self.__stats.pending_points -= count
+                self.__capacity.notify_all()
+
+    async def __run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.__queue.get()]
+            count = len(batch[0][1])
+            deadline = loop.time() + self.__max_delay
+
+            while count < self.__max_batch:
+                if self.__queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.__queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.__queue.get_nowait()
+                batch.append(item)
+                count += len(item[1])
+
+            await self.__execute(batch)
+
+    async def __execute(self, batch: list):
+        loop = asyncio.get_running_loop()
+
+        for method in METHODS:
+            requests = [(points, future) for name, points, future in batch if name == method and not future.done()]
+            if not requests:
+                continue
+
+            points = np.concatenate([points for points, _ in requests]) if len(requests) > 1 else requests[0][0]
+            self.__stats.batches += 1
+            self.__stats.batched_points += len(points)
+            self.__stats.max_batch_points = max(self.__stats.max_batch_points, len(points))
+
+            try:
+                result = await loop.run_in_executor(self.__executor, self.__functions[method], points)
+            except Exception as error:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            offset = 0
+            for request_points, future in requests:
+                if not future.done():
+                    future.set_result(result[offset:offset + len(request_points)])
+                offset += len(request_points)
+
+    async def close(self):
+        """
+        Zatrzymuje łączenie zapytań w paczki i wątek lokalizujący paczki
+        """
+        self.__task.cancel()
+        try:
+            await self.__task
+        except asyncio.CancelledError:
+            pass
+        self.__executor.shutdown()
+
+
+class PointLocationServer:
+    """
+    Serwer lokalizacji punktów dla przetworzonego obiektu `Kirkpatrick`
+    """
+
+    def __init__(self, kirkpatrick: Kirkpatrick, max_batch: int = 1 << 16, max_delay: float = 1e-3, max_pending: int = 1 << 20,
+                 max_request: int = 1 << 20, max_inflight: int = 64):
+        """
+            Konstruktor klasy PointLocationServer. Serwer należy uruchomić funkcją `start`.
+
+            Parmeters
+            ---------
+                kirkpatrick: `Kirkpatrick`
+                    przetworzony obiekt biblioteki (np. wczytany funkcją `Kirkpatrick.load`)
+                max_batch: `int`
+                    liczba punktów, po której paczka jest lokalizowana bez czekania na kolejne zapytania
+                max_delay: `float`
+                    maksymalny czas oczekiwania na kolejne zapytania do paczki w sekundach
+                max_pending: `int`
+                    maksymalna liczba punktów oczekujących na lokalizację
+                max_request: `int`
+                    maksymalna liczba punktów jednego zapytania
+                max_inflight: `int`
+                    maksymalna liczba obsługiwanych naraz zapytań jednego połączenia
+        """
+        self.__kirkpatrick = kirkpatrick
+        self.__max_batch = max_batch
+        self.__max_delay = max_delay
+        self.__max_pending = max_pending
+        self.__max_request = max_request
+        self.__max_inflight = max_inflight
+        self.__server = None
+        self.__batcher = None
+        self.stats = ServiceStats()
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT, path: str = None) -> asyncio.AbstractServer:
+        """
+        Uruchamia serwer na gnieździe TCP albo na gnieździe uniksowym
+
+        Parameters
+        ----------
+            host: `str`
+                adres gniazda TCP
+            port: `int`
+                port gniazda TCP (0 oznacza dowolny wolny port)
+            path: `str`
+                ścieżka gniazda uniksowego; jeśli podano, `host` i `port` są ignorowane
+
+        Returns
+        -------
+            `asyncio.AbstractServer`: uruchomiony serwer
+        """
+        functions = {'query_many': self.__kirkpatrick.query_many, 'query_labels': self.__kirkpatrick.query_labels}
+        self.__batcher = MicroBatcher(functions, self.stats, self.__max_batch, self.__max_delay, self.__max_pending)
+
+        if path is not None:
+            self.__server = await asyncio.start_unix_server(self.__handle_connection, path)
+        else:
+            self.__server = await asyncio.start_server(self.__handle_connection, host, port)
+
+        return self.__server
+
+    @property
+    def address(self):
+        """
+        Adres gniazda uruchomionego serwera (para `(host, port)` albo ścieżka gniazda uniksowego)
+        """
+        return self.__server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        """
+        Obsługuje połączenia do czasu anulowania
+        """
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def close(self):
+        """
+        Zamyka serwer i zatrzymuje łączenie zapytań w paczki
+        """
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        if self.__batcher is not None:
+            await self.__batcher.close()
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats.connections += 1
+        inflight = asyncio.Semaphore(self.__max_inflight)
+        lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            while True:
+                try:
+                    payload = await read_frame(reader)
+                except Exception as error:
+                    self.stats.errors += 1
+                    await self.__write(writer, lock, encode_error(0, str(error), True))
+                    break
+                if payload is None:
+                    break
+
+                received = time.perf_counter()
+                await inflight.acquire()
+                task = asyncio.ensure_future(self.__respond(payload, received, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: inflight.release())
+        except ConnectionError:
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self.stats.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __respond(self, payload: bytes, received: float, writer: asyncio.StreamWriter, lock: asyncio.Lock):
+        binary, request_id = payload[:1] != b'J', 0
+        try:
+            request = decode_request(payload)
+            binary, request_id = request.binary, request.id
+
+            if request.method == 'stats':
+                result = self.stats.summary()
+            elif len(request.points) > self.__max_request:
+                self.stats.rejected += 1
+                raise Exception(f"Request of {len(request.points)} points exceeds the limit of {self.__max_request} points")
+            else:
+                result = await self.__batcher.submit(request.method, request.points)
+
+            response = encode_response(request, result)
+            self.stats.requests += 1
+            self.stats.points += len(request.points)
+        except Exception as error:
+            self.stats.errors += 1
+            response = encode_error(request_id, str(error), binary)
+
+        await self.__write(writer, lock, response)
+        self.stats.latencies.append(time.perf_counter() - received)
+
+    @staticmethod
+    async def __write(writer: asyncio.StreamWriter, lock: asyncio.Lock, payload: bytes):
+        # odpowiedzi wielu zapytań jednego połączenia są wysyłane po kolei
+        async with lock:
+            writer.write(frame(payload))
+            await writer.drain()
+
+
+class ServiceClient:
+    """
+    Klient serwera lokalizacji punktów. Wiele zapytań może być wysyłanych jednocześnie przez jedno połączenie.
+    Klienta należy zamknąć funkcją `close`.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, binary: bool = True):
+        """
+            Konstruktor klasy ServiceClient. Zwykle klienta tworzy się funkcją `ServiceClient.connect`.
+
+            Parmeters
+            ---------
+                reader: `asyncio.StreamReader`
+                    strumień odczytu połączenia
+                writer: `asyncio.StreamWriter`
+                    strumień zapisu połączenia
+                binary: `bool`
+                    jeśli `True`, zapytania kodowane są binarnie, w przeciwnym razie jako JSON
+        """
+        self.__reader = reader
+        self.__writer = writer
+        self.__binary = binary
+        self.__next_id = 1
+        self.__waiting: Dict[int, asyncio.Future] = {}
+        self.__lock = asyncio.Lock()
+        self.__receiver = asyncio.ensure_future(self.__receive())
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = DEFAULT_PORT, path: str = None, binary: bool = True) -> 'ServiceClient':
+        """
+        Łączy się z serwerem przez gniazdo TCP albo gniazdo uniksowe (jeśli podano `path`)
+
+        Parameters
+        ----------
+            host: `str`
+                adres serwera
+            port: `int`
+                port serwera
+            path: `str`
+                ścieżka gniazda uniksowego
+            binary: `bool`
+                jeśli `True`, zapytania kodowane są binarnie, w przeciwnym razie jako JSON
+
+        Returns
+        -------
+            `ServiceClient`: połączony klient
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+
+        return cls(reader, writer, binary)
+
+    async def __receive(self):
+        error = Exception("Connection closed")
+        try:
+            while True:
+                payload = await read_frame(self.__reader)
+                if payload is None:
+                    break
+
+                request_id, result, message = decode_response(payload)
+                future = self.__waiting.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if message is not None:
+                    future.set_exception(Exception(message))
+                else:
+                    future.set_result(result)
+        except Exception as failure:
+            error = failure
+        finally:
+            for future in self.__waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.__waiting.clear()
+
+    async def __call(self, method: str, points: np.ndarray = None) -> object:
+        if self.__receiver.done():
+            raise Exception("Connection closed")
+
+        request_id = self.__next_id
+        self.__next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.__waiting[request_id] = future
+
+        payload = encode_request(request_id, method, points, self.__binary and method != 'stats')
+        async with self.__lock:
+            self.__writer.write(frame(payload))
+            await self.__writer.drain()
+
+        return await future
+
+    async def query_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Lokalizuje punkty na serwerze, wynik jak w `Kirkpatrick.query_many`
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                punkty do lokalizacji, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów, -1 dla punktów spoza zewnętrznego trójkąta, kształt `(N,)`
+
+        Raises
+        ------
+            `Exception`: jeśli serwer zwrócił błąd albo połączenie zostało zamknięte
+        """
+        return await self.__call('query_many', points)
+
+    async def query_labels(self, points: np.ndarray) -> np.ndarray:
+        """
+        Zwraca etykiety ścian zawierających punkty, wynik jak w `Kirkpatrick.query_labels`
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                punkty do lokalizacji, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: etykiety ścian, -1 dla punktów spoza wszystkich ścian, kształt `(N,)`
+
+        Raises
+        ------
+            `Exception`: jeśli serwer zwrócił błąd (np. indeks nie ma etykiet) albo połączenie zostało zamknięte
+        """
+        return await self.__call('query_labels', points)
+
+    async def stats(self) -> dict:
+        """
+        Zwraca statystyki serwera, jak w `ServiceStats.summary`
+        """
+        return await self.__call('stats')
+
+    async def close(self):
+        """
+        Zamyka połączenie
+        """
+        self.__writer.close()
+        try:
+            await self.__writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self.__receiver
+
+
+async def generate_load(host: str = '127.0.0.1', port: int = DEFAULT_PORT, path: str = None, connections: int = 4, concurrency: int = 16,
+                        requests: int = 10000, points_per_request: int = 1, bounds: tuple = (0.0, 0.0, 1000.0, 1000.0),
+                        method: str = 'query_many', binary: bool = True, seed: int = 0) -> dict:
+    """
+    Generuje obciążenie serwera: `concurrency` zadań na każdym z `connections` połączeń wysyła po kolei zapytania
+    z losowymi punktami, aż łącznie zostanie wysłanych `requests` zapytań
+
+    Parameters
+    ----------
+        host, port, path:
+            adres serwera, jak w `ServiceClient.connect`
+        connections: `int`
+            liczba połączeń
+        concurrency: `int`
+            liczba jednocześnie oczekujących zapytań na połączenie
+        requests: `int`
+            łączna liczba zapytań
+        points_per_request: `int`
+            liczba punktów w zapytaniu
+        bounds: `tuple`
+            prostokąt `(min_x, min_y, max_x, max_y)`, z którego losowane są punkty
+        method: `str`
+            `'query_many'` albo `'query_labels'`
+        binary: `bool`
+            format zapytań
+        seed: `int`
+            ziarno generatora punktów
+
+    Returns
+    -------
+        `dict`: liczba zapytań i punktów, czas, przepustowość, percentyle opóźnień po stronie klienta (`latency_ms`)
+        oraz statystyki serwera (`server`)
+    """
+    clients = [await ServiceClient.connect(host, port, path, binary) for _ in range(connections)]
+    rng = np.random.default_rng(seed)
+    low, high = np.array(bounds[:2], dtype=np.float64), np.array(bounds[2:], dtype=np.float64)
+    latencies = []
+    remaining = requests
+
+    async def worker(client: ServiceClient):
+        nonlocal remaining
+        call = client.query_many if method == 'query_many' else client.query_labels
+        while remaining > 0:
+            remaining -= 1
+            points = rng.uniform(low, high, (points_per_request, 2))
+            started = time.perf_counter()
+            await call(points)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for client in clients for _ in range(concurrency)))
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        server = await clients[0].stats()
+    finally:
+        for client in clients:
+            await client.close()
+
+    return {
+        'requests': len(latencies),
+        'points': len(latencies) * points_per_request,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'points_per_second': len(latencies) * points_per_request / elapsed,
+        'latency_ms': latency_summary(latencies),
+        'server': server,
+    }
+
+
+async def serve(index: str, host: str = '127.0.0.1', port: int = DEFAULT_PORT, path: str = None, **options):
+    """
+    Wczytuje indeks zapisany funkcją `Kirkpatrick.save` i obsługuje zapytania do czasu przerwania.
+    Pozostałe parametry jak w konstruktorze `PointLocationServer`.
+    """
+    server = PointLocationServer(Kirkpatrick.load(index), **options)
+    await server.start(host, port, path)
+    print(f"Serving {index} on {server.address}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serwer lokalizacji punktów algorytmem Kirkpatricka")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="uruchom serwer dla zapisanego indeksu")
+    serve_parser.add_argument('index', help="plik indeksu zapisany funkcją Kirkpatrick.save")
+    serve_parser.add_argument('--max-batch', type=int, default=1 << 16, help="liczba punktów zamykająca paczkę")
+    serve_parser.add_argument('--max-delay', type=float, default=1e-3, help="maksymalny czas oczekiwania na paczkę w sekundach")
+    serve_parser.add_argument('--max-pending', type=int, default=1 << 20, help="maksymalna liczba oczekujących punktów")
+    serve_parser.add_argument('--max-request', type=int, default=1 << 20, help="maksymalna liczba punktów zapytania")
+    serve_parser.add_argument('--max-inflight', type=int, default=64, help="maksymalna liczba zapytań jednego połączenia")
+
+    load_parser = commands.add_parser('load', help="wygeneruj obciążenie działającego serwera")
+    load_parser.add_argument('--connections', type=int, default=4, help="liczba połączeń")
+    load_parser.add_argument('--concurrency', type=int, default=16, help="liczba oczekujących zapytań na połączenie")
+    load_parser.add_argument('--requests', type=int, default=10000, help="łączna liczba zapytań")
+    load_parser.add_argument('--points', type=int, default=1, help="liczba punktów w zapytaniu")
+    load_parser.add_argument('--bounds', type=float, nargs=4, default=(0.0, 0.0, 1000.0, 1000.0), help="min_x min_y max_x max_y")
+    load_parser.add_argument('--method', choices=METHODS, default='query_many', help="metoda zapytań")
+    load_parser.add_argument('--json', action='store_true', help="wysyłaj zapytania w formacie JSON")
+
+    for command in (serve_parser, load_parser):
+        command.add_argument('--host', default='127.0.0.1', help="adres gniazda TCP")
+        command.add_argument('--port', type=int, default=DEFAULT_PORT, help="port gniazda TCP")
+        command.add_argument('--unix', help="ścieżka gniazda uniksowego zamiast TCP")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'serve':
+            asyncio.run(serve(args.index, args.host, args.port, args.unix, max_batch=args.max_batch, max_delay=args.max_delay,
+                              max_pending=args.max_pending, max_request=args.max_request, max_inflight=args.max_inflight))
+        else:
+            report = asyncio.run(generate_load(args.host, args.port, args.unix, args.connections, args.concurrency, args.requests,
+                                               args.points, tuple(args.bounds), args.method, not args.json))
+            print(json.dumps(report, indent=2))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
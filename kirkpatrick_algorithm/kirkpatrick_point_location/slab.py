@@ -0,0 +1,298 @@
+"""
+Lokalizacja punktów przez podział na pasy (slab decomposition, D. Dobkin, R. Lipton).
+
+Pionowe proste przechodzące przez wierzchołki triangulacji dzielą płaszczyznę na pasy. Wewnątrz pasa krawędzie
+triangulacji się nie przecinają, więc są uporządkowane od dołu do góry, a obszar między dwiema kolejnymi krawędziami
+należy do jednego trójkąta. Zapytanie to dwa wyszukiwania binarne: pasa według współrzędnej x i krawędzi pasa według
+orientacji punktu względem krawędzi, czyli `O(log n)` porównań bez chodzenia po drzewie. Pamięć jest proporcjonalna
+do łącznej liczby krawędzi we wszystkich pasach, co w najgorszym przypadku daje `O(n^2)`, a dla typowych danych około
+`O(n^1.5)`, dlatego struktura opłaca się dla małych i średnich triangulacji przy dużej liczbie zapytań.
+"""
+from planegeometry.structures.planarmaps import Triangle
+from typing import List
+import time
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.locator import Locator
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation, orientation_many
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangulation import Triangulation, counterclockwise
+
+# domyślna maksymalna łączna liczba krawędzi we wszystkich pasach (4 bajty każda)
+SLAB_MAX_ENTRIES = 50_000_000
+
+
+class SlabLocator(Locator):
+    """
+    Podział triangulacji na pasy. Pas `s` leży między `xs[s]` a `xs[s + 1]`, a jego krawędzie to
+    `entries[offsets[s]:offsets[s + 1]]`, uporządkowane od dołu do góry. Krawędź `e` biegnie od lewego końca
+    `left[e]` do prawego `right[e]`, a `above[e]` i `below[e]` to trójkąty leżące nad nią i pod nią (-1 na brzegu).
+    """
+    name = 'slab'
+
+    def __init__(self, triangulation: Triangulation):
+        """
+            Konstruktor klasy SlabLocator. Struktura jest budowana dopiero funkcją `build`.
+
+            Parmeters
+            ---------
+                triangulation: `Triangulation`
+                    triangulacja, w której lokalizowane są punkty
+        """
+        self.__triangulation = triangulation
+        self.__store = None
+        self.__xs = None
+        self.__offsets = None
+        self.__entries = None
+        self.__edges = None
+        self.__above = None
+        self.__below = None
+        self.__build_seconds = None
+        self.__queries = 0
+
+    def build(self, max_entries: int = SLAB_MAX_ENTRIES):
+        """
+        Dzieli triangulację na pasy
+
+        Parameters
+        ----------
+            max_entries: `int`
+                maksymalna łączna liczba krawędzi we wszystkich pasach
+
+        Returns
+        -------
+            `None`
+
+        Raises
+        ------
+            `Exception`: jeśli struktura została już zbudowana albo podział przekroczyłby `max_entries` krawędzi
+        """
+        if self.__store is not None:
+            raise Exception("Slab decomposition is already built")
+
+        started = time.perf_counter()
+        points = np.asarray(self.__triangulation.points, dtype=np.float64)
+        triangles = counterclockwise(points, self.__triangulation.triangles)
+
+        # krawędź skierowana w prawo ma swój trójkąt (leżący po lewej stronie krawędzi) nad sobą, a skierowana w lewo pod sobą
+        starts, ends = triangles.ravel(), triangles[:, [1, 2, 0]].ravel()
+        owners = np.repeat(np.arange(len(triangles)), 3)
+        rightward = points[starts, 0] < points[ends, 0]
+        vertical = points[starts, 0] == points[ends, 0]
+        left = np.where(rightward, starts, ends)[~vertical]
+        right = np.where(rightward, ends, starts)[~vertical]
+
+        edges, inverse = np.unique(np.column_stack((left, right)), axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        above = np.full(len(edges), -1, dtype=np.int64)
+        below = np.full(len(edges), -1, dtype=np.int64)
+        above[inverse[rightward[~vertical]]] = owners[~vertical][rightward[~vertical]]
+        below[inverse[~rightward[~vertical]]] = owners[~vertical][~rightward[~vertical]]
+
+        xs = np.unique(points[:, 0])
+        first = np.searchsorted(xs, points[edges[:, 0], 0])
+        counts = np.searchsorted(xs, points[edges[:, 1], 0]) - first
+        total = int(counts.sum())
+        if total > max_entries:
+            raise Exception(f"Slab decomposition needs {total} entries, more than max_entries={max_entries}")
+
+        edge_of_entry = np.repeat(np.arange(len(edges)), counts)
+        offsets = np.zeros(len(edges) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        slab_of_entry = np.repeat(first, counts) + np.arange(total) - np.repeat(offsets[:-1], counts)
+
+        # w pasie krawędzie się nie przecinają, więc kolejność ich wysokości w środku pasa jest kolejnością od dołu do góry
+        middle = (xs[slab_of_entry] + xs[slab_of_entry + 1]) / 2
+        (x1, y1), (x2, y2) = points[edges[edge_of_entry, 0]].T, points[edges[edge_of_entry, 1]].T
+        heights = y1 + (y2 - y1) * (middle - x1) / (x2 - x1)
+        order = np.lexsort((heights, slab_of_entry))
+
+        slab_offsets = np.zeros(len(xs), dtype=np.int64)
+        np.cumsum(np.bincount(slab_of_entry, minlength=len(xs) - 1), out=slab_offsets[1:])
+
+        index_type = np.int32 if len(triangles) <= np.iinfo(np.int32).max else np.int64
+        self.__xs = xs
+        self.__offsets = slab_offsets
+        self.__entries = edge_of_entry[order].astype(np.int32 if len(edges) <= np.iinfo(np.int32).max else np.int64)
+        self.__edges = edges.astype(index_type)
+        self.__above = above.astype(index_type)
+        self.__below = below.astype(index_type)
+        self.__store = TriangleStore(points, triangles)
+        self.__build_seconds = time.perf_counter() - started
+
+    def __slab(self, x: float) -> int:
+        """
+        Zwraca numer pasa zawierającego prostą pionową o współrzędnej `x` albo -1, jeśli leży ona poza triangulacją
+        """
+        xs = self.__xs
+        if not xs[0] <= x <= xs[-1]:
+            return -1
+
+        return min(int(np.searchsorted(xs, x, side='right')) - 1, len(xs) - 2)
+
+    def query(self, point: (float, float)) -> Triangle:
+        """
+        Lokalizuje punkt dwoma wyszukiwaniami binarnymi. Wynik jest zgodny z wynikiem `query_many`.
+
+        Parameters
+        ----------
+            point: `(float, float)`
+                Punkt do przeszukiwań
+
+        Returns
+        -------
+            `Triangle`: Znaleziony trójkąt albo `None` dla punktów spoza zewnętrznego trójkąta
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            raise Exception("Slab decomposition is not built")
+
+        x, y = float(point[0]), float(point[1])
+        self.__queries += 1
+        slab = self.__slab(x)
+        if slab < 0:
+            return None
+
+        vertices, edges, entries = self.__store.vertices, self.__edges, self.__entries
+
+        def side(entry: int) -> int:
+            (x1, y1), (x2, y2) = vertices[edges[entries[entry]]].tolist()
+            return orientation(x1, y1, x2, y2, x, y)
+
+        # szukana jest pierwsza krawędź pasa leżąca ściśle nad punktem
+        low, high = int(self.__offsets[slab]), int(self.__offsets[slab + 1])
+        start = low
+        while low < high:
+            middle = (low + high) // 2
+            if side(middle) >= 0:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == start:
+            return None
+
+        edge = entries[low - 1]
+        triangle = int(self.__above[edge])
+        # punkt leżący na górnym brzegu triangulacji należy do trójkąta pod krawędzią
+        if triangle < 0 and side(low - 1) == 0:
+            triangle = int(self.__below[edge])
+
+        return self.__store.triangle(triangle) if triangle >= 0 else None
+
+    def query_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Lokalizuje wiele punktów naraz, wykonując wyszukiwanie binarne w pasach wektorowo dla całej paczki.
+        Wynik jest zgodny z wynikiem `query`.
+
+        Parameters
+        ----------
+            points: `np.ndarray`
+                Punkty do przeszukiwań, kształt `(N, 2)`
+
+        Returns
+        -------
+            `np.ndarray`: indeksy znalezionych trójkątów w liście `get_triangles()`, kształt `(N,)`.
+            Dla punktów spoza zewnętrznego trójkąta zwracane jest -1.
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            raise Exception("Slab decomposition is not built")
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        self.__queries += len(points)
+        xs, vertices, edges, entries = self.__xs, self.__store.vertices, self.__edges, self.__entries
+
+        result = np.full(len(points), -1, dtype=np.int64)
+        slabs = np.minimum(np.searchsorted(xs, x, side='right') - 1, len(xs) - 2)
+        inside = np.flatnonzero((xs[0] <= x) & (x <= xs[-1]))
+
+        starts = self.__offsets[slabs[inside]]
+        low, high = starts.copy(), self.__offsets[slabs[inside] + 1]
+        active = np.flatnonzero(low < high)
+        while active.size:
+            middle = (low[active] + high[active]) // 2
+            ends = vertices[edges[entries[middle]]]
+            above = orientation_many(ends[:, 0, 0], ends[:, 0, 1], ends[:, 1, 0], ends[:, 1, 1], x[inside[active]], y[inside[active]]) >= 0
+            low[active] = np.where(above, middle + 1, low[active])
+            high[active] = np.where(above, high[active], middle)
+            active = active[low[active] < high[active]]
+
+        found = low > starts
+        edge = entries[low[found] - 1]
+        triangles = self.__above[edge].astype(np.int64)
+
+        # punkty leżące na górnym brzegu triangulacji należą do trójkątów pod krawędzią
+        boundary = np.flatnonzero(triangles < 0)
+        if boundary.size:
+            ends = vertices[edges[edge[boundary]]]
+            queried = inside[found][boundary]
+            on_edge = orientation_many(ends[:, 0, 0], ends[:, 0, 1], ends[:, 1, 0], ends[:, 1, 1], x[queried], y[queried]) == 0
+            triangles[boundary[on_edge]] = self.__below[edge[boundary[on_edge]]]
+
+        result[inside[found]] = triangles
+
+        return result
+
+    def get_triangles(self) -> List[Triangle]:
+        """
+        Zwraca listę trójkątów triangulacji w kolejności indeksów zwracanych przez `query_many`
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `List[Triangle]`: lista trójkątów albo pusta lista, jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            return []
+
+        return [self.__store.triangle(triangle) for triangle in range(len(self.__store))]
+
+    def stats(self) -> dict:
+        """
+        Zwraca statystyki podziału:
+            - `engine`: `'slab'`
+            - `triangles`: liczba trójkątów triangulacji
+            - `build_seconds`: czas budowy w sekundach
+            - `memory_bytes`: rozmiar struktur danych w bajtach
+            - `slabs`: liczba pasów
+            - `entries`: łączna liczba krawędzi we wszystkich pasach
+            - `max_slab_entries`: największa liczba krawędzi w jednym pasie
+            - `queries`: liczba zlokalizowanych punktów
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `dict`: słownik ze statystykami
+
+        Raises
+        ------
+            `Exception`: jeśli struktura nie została jeszcze zbudowana
+        """
+        if self.__store is None:
+            raise Exception("Slab decomposition is not built")
+
+        arrays = (self.__xs, self.__offsets, self.__entries, self.__edges, self.__above, self.__below)
+
+        return {
+            'engine': self.name,
+            'triangles': len(self.__store),
+            'build_seconds': self.__build_seconds,
+            'memory_bytes': self.__store.nbytes + sum(array.nbytes for array in arrays),
+            'slabs': len(self.__xs) - 1,
+            'entries': len(self.__entries),
+            'max_slab_entries': int(np.diff(self.__offsets).max(initial=0)),
+            'queries': self.__queries,
+        }
@@ -0,0 +1,174 @@
+"""
+Strumieniowa lokalizacja punktów z dużych plików.
+
+Punkty czytane są fragmentami z plików CSV, `.npy` albo surowych plików binarnych (kolejne pary liczb `float64`
+little-endian), lokalizowane paczkami i zwracane albo zapisywane fragment po fragmencie, więc zużycie pamięci
+zależy tylko od rozmiaru fragmentu, a nie od rozmiaru pliku. Pliki `.npy` i binarne są odwzorowywane w pamięci.
+"""
+from typing import Callable, Iterable, Iterator, NamedTuple, Union
+import itertools
+import os
+import time
+import numpy as np
+
+PointSource = Union[str, os.PathLike, np.ndarray, Iterable[np.ndarray]]
+
+BINARY_EXTENSIONS = ('.bin', '.raw', '.f64')
+
+
+class StreamProgress(NamedTuple):
+    """
+    Stan strumieniowej lokalizacji przekazywany do funkcji `progress` po każdym fragmencie
+    """
+    chunks: int
+    points: int
+    elapsed: float
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _source_format(source: PointSource, file_format: str) -> str:
+    if file_format is not None:
+        return file_format
+    if isinstance(source, (str, os.PathLike)):
+        extension = os.path.splitext(os.fspath(source))[1].lower()
+        if extension == '.npy':
+            return 'npy'
+        if extension in BINARY_EXTENSIONS:
+            return 'binary'
+        return 'csv'
+    if isinstance(source, np.ndarray):
+        return 'array'
+    return 'iterable'
+
+
+def _is_number(field: str) -> bool:
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+
+def _csv_chunks(path: str, chunk_size: int, delimiter: str) -> Iterator[np.ndarray]:
+    with open(path, 'r') as file:
+        first = file.readline()
+        fields = first.strip().split(delimiter)
+        # pierwszy wiersz jest nagłówkiem, jeśli jego pierwsze dwa pola nie są liczbami
+        lines = itertools.chain([first] if len(fields) >= 2 and all(map(_is_number, fields[:2])) else [], file)
+
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                return
+            yield np.loadtxt(chunk, delimiter=delimiter, usecols=(0, 1), ndmin=2, dtype=np.float64)
+
+
+def _array_chunks(points: np.ndarray, chunk_size: int) -> Iterator[np.ndarray]:
+    for start in range(0, len(points), chunk_size):
+        yield np.asarray(points[start:start + chunk_size], dtype=np.float64)
+
+
+def read_chunks(source: PointSource, chunk_size: int = 1 << 20, file_format: str = None, delimiter: str = ',') -> Iterator[np.ndarray]:
+    """
+    Czyta punkty fragmentami
+
+    Parameters
+    ----------
+        source: `str`, `np.ndarray` lub iterowalny obiekt tablic
+            ścieżka do pliku, tablica (np. odwzorowana w pamięci) albo gotowe fragmenty o kształcie `(n, 2)`
+        chunk_size: `int`
+            maksymalna liczba punktów we fragmencie
+        file_format: `str`
+            `'csv'`, `'npy'` albo `'binary'`; domyślnie rozpoznawany po rozszerzeniu pliku
+            (`.npy`, `.bin`/`.raw`/`.f64` dla plików binarnych, pozostałe jako CSV)
+        delimiter: `str`
+            separator kolumn pliku CSV; czytane są dwie pierwsze kolumny, a nagłówek jest pomijany
+
+    Returns
+    -------
+        `Iterator[np.ndarray]`: kolejne fragmenty punktów typu `float64`, kształt `(n, 2)`
+
+    Raises
+    ------
+        `Exception`: jeśli format jest nieznany albo dane nie są parami współrzędnych
+    """
+    if chunk_size < 1:
+        raise Exception(f"Chunk size must be positive, got {chunk_size}")
+
+    file_format = _source_format(source, file_format)
+    if file_format == 'csv':
+        return _csv_chunks(os.fspath(source), chunk_size, delimiter)
+    if file_format == 'npy':
+        points = np.load(source, mmap_mode='r')
+    elif file_format == 'binary':
+        points = np.memmap(source, dtype='<f8', mode='r')
+    elif file_format == 'array':
+        points = source
+    elif file_format == 'iterable':
+        return (np.asarray(chunk, dtype=np.float64).reshape(-1, 2) for chunk in source)
+    else:
+        raise Exception(f"Unknown point file format: {file_format}")
+
+    if points.ndim == 1 and len(points) % 2 == 0:
+        points = points.reshape(-1, 2)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise Exception(f"Expected points of shape (N, 2), got {points.shape}")
+
+    return _array_chunks(points, chunk_size)
+
+
+def locate_stream(locate: Callable[[np.ndarray], np.ndarray], source: PointSource, chunk_size: int = 1 << 20,
+                  file_format: str = None, delimiter: str = ',', progress: Callable[[StreamProgress], None] = None) -> Iterator[np.ndarray]:
+    """
+    Lokalizuje punkty fragmentami, zwracając wyniki kolejnych fragmentów
+
+    Parameters
+    ----------
+        locate: `Callable[[np.ndarray], np.ndarray]`
+            funkcja lokalizująca paczkę punktów, np. `Kirkpatrick.query_many`
+        source, chunk_size, file_format, delimiter:
+            jak w `read_chunks`
+        progress: `Callable[[StreamProgress], None]`
+            funkcja wywoływana po każdym fragmencie z liczbą przetworzonych punktów i przepustowością
+
+    Returns
+    -------
+        `Iterator[np.ndarray]`: wyniki `locate` dla kolejnych fragmentów
+    """
+    started = time.perf_counter()
+    points = 0
+
+    for chunks, chunk in enumerate(read_chunks(source, chunk_size, file_format, delimiter), 1):
+        result = locate(chunk)
+        points += len(chunk)
+        if progress is not None:
+            progress(StreamProgress(chunks, points, time.perf_counter() - started))
+        yield result
+
+
+def write_stream(results: Iterable[np.ndarray], output: str) -> int:
+    """
+    Zapisuje kolejne tablice wyników do surowego pliku binarnego (liczby `int64` little-endian), tak aby
+    w pamięci był tylko jeden fragment. Plik można potem odczytać przez `np.memmap(output, dtype='<i8')`.
+
+    Parameters
+    ----------
+        results: `Iterable[np.ndarray]`
+            kolejne fragmenty wyników
+        output: `str`
+            ścieżka do pliku wynikowego
+
+    Returns
+    -------
+        `int`: liczba zapisanych wyników
+    """
+    count = 0
+    with open(output, 'wb') as file:
+        for result in results:
+            file.write(np.ascontiguousarray(result, dtype='<i8').tobytes())
+            count += len(result)
+
+    return count
@@ -0,0 +1,121 @@
+from planegeometry.structures.planarmaps import Point, Triangle
+from array import array
+import numpy as np
+
+
+class TriangleStore:
+    """
+    Zwarty magazyn trójkątów. Współrzędne wierzchołków trzymane są w jednej współdzielonej tablicy,
+    a każdy trójkąt to trójka indeksów `int32` do tej tablicy. Obiekty `Triangle` tworzone są dopiero na żądanie.
+
+    W trakcie budowy trójkąty dopisywane są do bufora `array('i')`, a po wywołaniu `freeze` dostępne są
+    jako tablica numpy o kształcie `(T, 3)`.
+    """
+    __slots__ = ('vertices', 'triangles', '__buffer')
+
+    def __init__(self, vertices: np.ndarray, triangles: np.ndarray = None):
+        """
+            Konstruktor klasy TriangleStore.
+
+            Parmeters
+            ---------
+                vertices: `np.ndarray`
+                    współrzędne wierzchołków, kształt `(V, 2)`
+                triangles: `np.ndarray`
+                    opcjonalna, gotowa tablica trójkątów o kształcie `(T, 3)`; jeśli jest podana, magazyn jest od razu zamrożony
+        """
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 2)
+
+        if triangles is None:
+            self.triangles = None
+            self.__buffer = array('i')
+        else:
+            self.triangles = np.ascontiguousarray(triangles, dtype=np.int32).reshape(-1, 3)
+            self.__buffer = None
+
+    def __len__(self) -> int:
+        if self.__buffer is not None:
+            return len(self.__buffer) // 3
+
+        return len(self.triangles)
+
+    def add(self, a: int, b: int, c: int) -> int:
+        """
+        Dodaje trójkąt o wierzchołkach `a`, `b`, `c`
+
+        Parameters
+        ----------
+            a, b, c: `int`
+                indeksy wierzchołków trójkąta
+
+        Returns
+        -------
+            `int`: numer dodanego trójkąta
+
+        Raises
+        ------
+            `Exception` jeśli magazyn został już zamrożony
+        """
+        if self.__buffer is None:
+            raise Exception("Triangle store is frozen")
+
+        self.__buffer.extend((a, b, c))
+        return len(self.__buffer) // 3 - 1
+
+    def indices(self, triangle: int) -> (int, int, int):
+        """
+        Zwraca indeksy wierzchołków trójkąta
+
+        Parameters
+        ----------
+            triangle: `int`
+                numer trójkąta
+
+        Returns
+        -------
+            `(int, int, int)`: indeksy wierzchołków
+        """
+        if self.__buffer is not None:
+            return tuple(self.__buffer[3*triangle:3*triangle + 3])
+
+        return tuple(self.triangles[triangle].tolist())
+
+    def freeze(self):
+        """
+        Kończy budowę magazynu, przepisując bufor trójkątów do tablicy numpy
+
+        Parameters
+        ----------
+            `None`
+
+        Returns
+        -------
+            `None`
+        """
+        if self.__buffer is not None:
+            self.triangles = np.frombuffer(self.__buffer, dtype=np.int32).reshape(-1, 3).copy()
+            self.__buffer = None
+
+    def triangle(self, triangle: int) -> Triangle:
+        """
+        Tworzy obiekt `Triangle` dla trójkąta z magazynu
+
+        Parameters
+        ----------
+            triangle: `int`
+                numer trójkąta
+
+        Returns
+        -------
+            `Triangle`: trójkąt z biblioteki `planegeometry`
+        """
+        (x1, y1), (x2, y2), (x3, y3) = self.vertices[list(self.indices(triangle))].tolist()
+        return Triangle(Point(x1, y1), Point(x2, y2), Point(x3, y3))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Liczba bajtów zajmowanych przez tablice magazynu
+        """
+        triangles = self.triangles.nbytes if self.__buffer is None else self.__buffer.itemsize * len(self.__buffer)
+        return self.vertices.nbytes + triangles
@@ -0,0 +1,246 @@
+"""
+Triangulacja początkowa wspólna dla wszystkich struktur lokalizacji punktów.
+
+Do punktów wejściowych dodawany jest zewnętrzny trójkąt, który zawiera je wszystkie, a następnie wykonywana jest
+triangulacja Delaunaya. Jeśli podano krawędzie ograniczeń (boki wielokąta i jego dziur albo krawędzie podziału
+płaszczyzny), są one wstawiane do triangulacji, a każdy trójkąt dostaje etykietę ściany, w której leży.
+Wszystkie struktury lokalizacji (`Kirkpatrick`, `SlabLocator`, `WalkLocator`) korzystają z tej samej triangulacji,
+więc indeksy znalezionych trójkątów są u nich takie same.
+"""
+from scipy.spatial import Delaunay
+from typing import List
+import time
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.constrained import insert_segments, label_faces, ring_segments
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation_many
+
+
+def outer_triangle(polygon: List[tuple[float, float]]) -> List[tuple[float, float]]:
+    """
+    Oblicza współrzędne wierzchołków trójkąta zawierającego wszystkie punkty chmury punktów
+
+    Parameters
+    ----------
+        polygon: `List[tuple[float, float]]`
+            lista krotek oznaczających współrzędne kolejnych punktów
+
+    Returns
+    -------
+        `List[tuple[float, float]]`: lista wierzchołków zewnętrznego trójkąta
+    """
+    min_x = min(polygon, key=lambda p: p[0])[0]
+    max_x = max(polygon, key=lambda p: p[0])[0]
+    min_y = min(polygon, key=lambda p: p[1])[1]
+    max_y = max(polygon, key=lambda p: p[1])[1]
+
+    a = (max_x - min_x)
+    b = (max_y - min_y)
+
+    min_x -= a*0.4
+    max_x += a*0.4
+    min_y -= b*0.4
+    max_y += b*0.4
+
+    a = (max_x - min_x)
+    b = (max_y - min_y)
+
+    sqrt_d = np.sqrt(4/3*b*b)
+
+    # bok trójkąta równobocznego, którego przekrój na wysokości b ma szerokość a
+    d = a + sqrt_d
+
+    shift = (d - a)/2
+    H = d*np.sqrt(3)/2
+
+    return [(max_x + shift, min_y),(min_x - shift, min_y), ((max_x - min_x)/2 + min_x, min_y + H)]
+
+
+def counterclockwise(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """
+    Zwraca kopię trójkątów, w której trójkąty zorientowane zgodnie z ruchem wskazówek zegara są odwrócone
+
+    Parameters
+    ----------
+        points: `np.ndarray`
+            współrzędne wierzchołków, kształt `(V, 2)`
+        triangles: `np.ndarray`
+            trójki indeksów wierzchołków, kształt `(T, 3)`
+
+    Returns
+    -------
+        `np.ndarray`: trójkąty zorientowane przeciwnie do ruchu wskazówek zegara, `int64`, kształt `(T, 3)`
+    """
+    triangles = np.array(triangles, dtype=np.int64).reshape(-1, 3)
+    corners = points[triangles]
+    clockwise = orientation_many(corners[:, 0, 0], corners[:, 0, 1], corners[:, 1, 0], corners[:, 1, 1], corners[:, 2, 0], corners[:, 2, 1]) < 0
+    triangles[clockwise] = triangles[clockwise][:, ::-1]
+
+    return triangles
+
+
+class Triangulation:
+    """
+    Triangulacja punktów wejściowych razem z zewnętrznym trójkątem:
+        - `original`: punkty wejściowe (bez zewnętrznego trójkąta)
+        - `points`: współrzędne wszystkich wierzchołków, zewnętrzny trójkąt na końcu, kształt `(V, 2)`
+        - `outer_triangle`: indeksy wierzchołków zewnętrznego trójkąta
+        - `delaunay`: triangulacja Delaunaya (`scipy.spatial.Delaunay`)
+        - `triangles`: trójkąty triangulacji (z ograniczeniami, jeśli je podano) w kolejności, w której zwracają
+          je struktury lokalizacji; trójkąty triangulacji z ograniczeniami są zorientowane przeciwnie do ruchu
+          wskazówek zegara, a trójkąty triangulacji Delaunaya mają orientację z `scipy`, kształt `(T, 3)`
+        - `labels`: etykieta ściany każdego trójkąta (-1 poza ścianami) albo `None` dla triangulacji bez ograniczeń
+        - `phases`: czasy faz budowy w sekundach (`delaunay`, `constraints`)
+    """
+
+    def __init__(self, points: List[tuple[float, float]], constraints: tuple = None):
+        """
+            Konstruktor klasy Triangulation. Dodaje zewnętrzny trójkąt, wykonuje triangulację Delaunaya i wstawia
+            krawędzie ograniczeń, jeśli je podano.
+
+            Parmeters
+            ---------
+                points: `List[tuple[float, float]]`
+                    wszystkie wierzchołki triangulacji bez zewnętrznego trójkąta
+                constraints: `tuple`
+                    krawędzie ograniczeń oraz etykiety ścian po ich lewej i prawej stronie (jak w `constrained.ring_segments`)
+                    albo `None` dla triangulacji bez ograniczeń
+
+            Raises
+            ------
+                `Exception`: jeśli krawędzie ograniczeń się przecinają
+        """
+        self.original = points
+        self.outer_triangle = list(range(len(points), len(points) + 3))
+
+        started = time.perf_counter()
+        self.delaunay = Delaunay(points + outer_triangle(points))
+        self.points = self.delaunay.points
+        self.phases = {'delaunay': time.perf_counter() - started}
+
+        if constraints is None:
+            self.triangles = self.delaunay.simplices
+            self.labels = None
+        else:
+            started = time.perf_counter()
+            self.triangles, self.labels = self.__constrain(*constraints)
+            self.phases['constraints'] = time.perf_counter() - started
+
+    @classmethod
+    def from_polygon(cls, polygon: List[tuple[float, float]], holes: List[List[tuple[float, float]]] = None,
+                     constrained: bool = False) -> 'Triangulation':
+        """
+        Trianguluje chmurę punktów albo wielokąt z dziurami. Parametry jak w konstruktorze klasy `Kirkpatrick`.
+
+        Parameters
+        ----------
+            polygon: `List[tuple[float, float]]`
+                lista krotek oznaczających współrzędne kolejnych punktów chmury punktów
+            holes: `List[List[tuple[float, float]]]`
+                wierzchołki kolejnych dziur wielokąta; podanie dziur oznacza `constrained=True`
+            constrained: `bool`
+                jeśli `True`, triangulacja zawiera boki wielokąta (i jego dziur)
+
+        Returns
+        -------
+            `Triangulation`: triangulacja
+
+        Raises
+        ------
+            `Exception`: jeśli boki wielokąta lub dziur się przecinają albo dziury leżą poza wielokątem
+        """
+        points = polygon + [point for hole in holes or [] for point in hole]
+        constraints = None
+
+        if constrained or holes:
+            rings, start = [list(range(len(polygon)))], len(polygon)
+            for hole in holes or []:
+                rings.append(list(range(start, start + len(hole))))
+                start += len(hole)
+            constraints = ring_segments(np.array(points, dtype=np.float64).reshape(-1, 2), rings)
+
+        triangulation = cls(points, constraints)
+        triangulation.original = polygon
+
+        return triangulation
+
+    @classmethod
+    def from_subdivision(cls, vertices: List[tuple[float, float]], edges: np.ndarray, faces: np.ndarray) -> 'Triangulation':
+        """
+        Trianguluje podział płaszczyzny na ściany. Parametry jak w `Kirkpatrick.from_subdivision`.
+
+        Parameters
+        ----------
+            vertices: `List[tuple[float, float]]`
+                współrzędne wierzchołków podziału, wspólne dla sąsiednich ścian
+            edges: `np.ndarray`
+                krawędzie podziału jako pary indeksów wierzchołków, kształt `(E, 2)`
+            faces: `np.ndarray`
+                etykiety ścian po lewej i prawej stronie krawędzi `u -> v`, -1 jeśli po danej stronie nie ma ściany,
+                kształt `(E, 2)`
+
+        Returns
+        -------
+            `Triangulation`: triangulacja z ograniczeniami
+
+        Raises
+        ------
+            `Exception`: jeśli dane mają złe kształty lub etykiety, krawędzie się przecinają, ściany na siebie nachodzą
+            albo ich brzegi nie są domknięte
+        """
+        vertices = [tuple(vertex) for vertex in np.asarray(vertices, dtype=np.float64).reshape(-1, 2).tolist()]
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 2)
+        if len(edges) != len(faces):
+            raise Exception(f"Got {len(edges)} edges but {len(faces)} face pairs")
+        if np.any(faces < -1):
+            raise Exception("Face labels must be non-negative, -1 marks a side without a face")
+        if np.any((edges < 0) | (edges >= len(vertices))):
+            raise Exception("Edge endpoints must be indices of vertices")
+
+        # krawędź podana osobno dla każdej z dwóch ścian jest łączona w jedną krawędź z obiema etykietami
+        merged = {}
+        for (u, v), (left, right) in zip(edges.tolist(), faces.tolist()):
+            if u > v:
+                u, v, left, right = v, u, right, left
+            sides = merged.setdefault((u, v), [-1, -1])
+            for side, label in enumerate((left, right)):
+                if label >= 0 and sides[side] >= 0 and sides[side] != label:
+                    raise Exception(f"Edge ({u}, {v}) has conflicting face labels {sides[side]} and {label}")
+                if label >= 0:
+                    sides[side] = label
+
+        segments = list(merged)
+        sides = np.array(list(merged.values()), dtype=np.int64).reshape(-1, 2)
+
+        return cls(vertices, (segments, sides[:, 0], sides[:, 1]))
+
+    def __constrain(self, segments: List[tuple[int, int]], left_faces: np.ndarray, right_faces: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Wstawia krawędzie ograniczeń do triangulacji Delaunaya i wyznacza etykiety ścian jej trójkątów
+
+        Parameters
+        ----------
+            segments: `List[tuple[int, int]]`
+                krawędzie ograniczeń jako pary indeksów wierzchołków
+            left_faces: `np.ndarray`
+                etykiety ścian po lewej stronie krawędzi (-1, jeśli nie ma tam ściany)
+            right_faces: `np.ndarray`
+                etykiety ścian po prawej stronie krawędzi
+
+        Returns
+        -------
+            `np.ndarray`: trójkąty triangulacji z ograniczeniami, kształt `(T, 3)`
+            `np.ndarray`: etykieta ściany każdego trójkąta (-1 poza ścianami), `int32`, jeśli etykiety się mieszczą, kształt `(T,)`
+        """
+        simplices = counterclockwise(self.points, self.delaunay.simplices)
+
+        triangles, pieces = insert_segments(self.points, simplices, segments)
+
+        labels = label_faces(triangles, pieces, left_faces, right_faces)
+        if labels.max(initial=0) <= np.iinfo(np.int32).max:
+            labels = labels.astype(np.int32)
+
+        return triangles, labels
+
+    def __len__(self) -> int:
+        return len(self.triangles)
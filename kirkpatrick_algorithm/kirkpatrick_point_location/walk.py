@@ -0,0 +1,99 @@
+"""
+Lokalizacja punktów przez przechodzenie po sąsiednich liściach.
+
+Kolejne punkty trajektorii leżą zwykle w tym samym liściu co poprzedni punkt albo w liściu sąsiednim, więc
+zamiast schodzić po drzewie od korzenia można zacząć od poprzedniego liścia i przechodzić przez krawędź, względem
+której punkt leży po złej stronie (tzw. visibility walk). Wynik przejścia przyjmowany jest tylko wtedy, gdy punkt
+leży we wnętrzu liścia; punkty z krawędzi lub wierzchołków, podobnie jak przejścia dłuższe niż zadany limit,
+lokalizowane są w drzewie, więc wynik jest zawsze taki sam jak przy zwykłym przeszukiwaniu.
+"""
+import numpy as np
+from kirkpatrick_algorithm.kirkpatrick_point_location.instrumentation import QueryCounters
+from kirkpatrick_algorithm.kirkpatrick_point_location.predicates import orientation
+from kirkpatrick_algorithm.kirkpatrick_point_location.triangle_store import TriangleStore
+
+
+def leaf_neighbors(triangles: np.ndarray) -> np.ndarray:
+    """
+    Wyznacza sąsiedztwo trójkątów triangulacji przez wspólne krawędzie
+
+    Parameters
+    ----------
+        triangles: `np.ndarray`
+            trójki indeksów wierzchołków trójkątów, kształt `(T, 3)`
+
+    Returns
+    -------
+        `np.ndarray`: `neighbors[t, k]` to numer trójkąta sąsiadującego z `t` przez krawędź naprzeciw
+        wierzchołka `k` albo -1, jeśli krawędź leży na brzegu triangulacji, kształt `(T, 3)`
+    """
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    first = triangles[:, [1, 2, 0]].ravel()
+    second = triangles[:, [2, 0, 1]].ravel()
+    keys = np.minimum(first, second) * (int(triangles.max(initial=0)) + 1) + np.maximum(first, second)
+
+    order = np.argsort(keys, kind='stable')
+    shared = np.flatnonzero(keys[order[1:]] == keys[order[:-1]])
+
+    neighbors = np.full(len(keys), -1, dtype=np.int64)
+    neighbors[order[shared]] = order[shared + 1] // 3
+    neighbors[order[shared + 1]] = order[shared] // 3
+
+    return neighbors.reshape(-1, 3)
+
+
+def walk(store: TriangleStore, neighbors: np.ndarray, leaf: int, x: float, y: float, max_steps: int, counters: QueryCounters = None) -> int:
+    """
+    Przechodzi po liściach od podanego liścia w stronę punktu
+
+    Parameters
+    ----------
+        store: `TriangleStore`
+            magazyn trójkątów, liście zorientowane przeciwnie do ruchu wskazówek zegara
+        neighbors: `np.ndarray`
+            sąsiedztwo liści wyznaczone funkcją `leaf_neighbors`
+        leaf: `int`
+            liść początkowy
+        x: `float`
+            współrzędna x punktu
+        y: `float`
+            współrzędna y punktu
+        max_steps: `int`
+            maksymalna liczba odwiedzonych liści
+        counters: `QueryCounters`
+            jeśli podano, zwiększane są w nim liczby kroków i testów przynależności
+
+    Returns
+    -------
+        `int`: liść, we wnętrzu którego leży punkt, albo -1, jeśli go nie znaleziono
+    """
+    vertices, triangles = store.vertices, store.triangles
+
+    steps, found = 0, -1
+    while steps < max_steps:
+        steps += 1
+        (x1, y1), (x2, y2), (x3, y3) = vertices.take(triangles[leaf], axis=0).tolist()
+
+        first = orientation(x2, y2, x3, y3, x, y)
+        if first < 0:
+            leaf = int(neighbors[leaf, 0])
+        else:
+            second = orientation(x3, y3, x1, y1, x, y)
+            if second < 0:
+                leaf = int(neighbors[leaf, 1])
+            else:
+                third = orientation(x1, y1, x2, y2, x, y)
+                if third < 0:
+                    leaf = int(neighbors[leaf, 2])
+                else:
+                    found = leaf if first > 0 and second > 0 and third > 0 else -1
+                    break
+
+        if leaf < 0:
+            break
+
+    if counters is not None:
+        counters.steps += steps
+        counters.tests += steps
+
+    return found
@@ -13,6 +13,7 @@ class KirkpatrickInteractiveVisualization:
         self.__i = 0
         self.__j = -1
         self.__polygon = polygon
+        self.__figure = None
         
         self.__root = tk.Tk()
         self.__frame = tk.Frame(self.__root)
@@ -66,6 +67,18 @@ class KirkpatrickInteractiveVisualization:
         self.__frame.pack()
         self.__get_polygon_points()
     
+    def __show_step(self, steps, step: int, label: str):
+        # rysunek kroku budowany jest dopiero teraz, a rysunek poprzedniego kroku jest zamykany
+        if self.__figure is not None:
+            plt.close(self.__figure)
+        self.__figure, ax = steps[step].get_plot()
+
+        tk.Label(text = label, master = self.__frame).pack()
+        canvas = FigureCanvasTkAgg(self.__figure, master = self.__frame)
+        canvas.draw()
+
+        canvas.get_tk_widget().pack()
+
     def __preprocess(self):
         for widget in self.__frame.winfo_children():
             widget.destroy()
@@ -80,18 +93,8 @@ class KirkpatrickInteractiveVisualization:
         for widget in self.__frame.winfo_children():
             widget.destroy()
 
-        fig, ax = self.__prep_steps[self.__i].get_plot()
+        self.__show_step(self.__prep_steps, self.__i, "Step " + str(self.__i))
 
-        label = tk.Label(text = "Step " + str(self.__i), master = self.__frame)
-        label.pack()
-        canvas = FigureCanvasTkAgg(fig, master = self.__frame)
-        canvas.draw()
-
-        canvas.get_tk_widget().pack()
-        
-        canvas = FigureCanvasTkAgg(fig, master = self.__frame)
-        canvas.draw()
-        
         tk.Button(self.__frame, text = "Show prep again" if self.__i == len(self.__prep_steps)-1 else "Next prep step", command = self.__next_prep).pack(pady = 10)
         tk.Button(self.__frame, text = "Query", command = self.__query).pack(pady = 10)
         self.__frame.pack()
@@ -112,33 +115,13 @@ class KirkpatrickInteractiveVisualization:
         if self.__j > 0:
             for widget in self.__frame.winfo_children():
                 widget.destroy()
-            fig, ax = self.__query_steps[self.__j].get_plot()
-
-            label = tk.Label(text = "Dag depth " + str(self.__j), master = self.__frame)
-            label.pack()
-            canvas = FigureCanvasTkAgg(fig, master = self.__frame)
-            canvas.draw()
-
-            canvas.get_tk_widget().pack()
-            
-            canvas = FigureCanvasTkAgg(fig, master = self.__frame)
-            canvas.draw()
+            self.__show_step(self.__query_steps, self.__j, "Dag depth " + str(self.__j))
             tk.Button(self.__frame, text = "Next query step", command = self.__next_query).pack(pady = 10)
             self.__frame.pack()
         else:
             for widget in self.__frame.winfo_children():
                 widget.destroy()
-            fig, ax = self.__query_steps[self.__j].get_plot()
-
-            label = tk.Label(text = "step" + str(self.__j), master = self.__frame)
-            label.pack()
-            canvas = FigureCanvasTkAgg(fig, master = self.__frame)
-            canvas.draw()
-
-            canvas.get_tk_widget().pack()
-            
-            canvas = FigureCanvasTkAgg(fig, master = self.__frame)
-            canvas.draw()
+            self.__show_step(self.__query_steps, self.__j, "step" + str(self.__j))
             tk.Button(self.__frame, text = "Query steps again", command = self.__next_query).pack(pady = 10)
             if self.__polygon is None:
                 tk.Button(self.__frame, text = "Kirkpatrick new polygon", command = self.__get_polygon).pack(pady = 10)
@@ -1,10 +1,44 @@
+from collections.abc import Sequence
 from scipy.spatial import Delaunay
 from planegeometry.structures.planarmaps import PlanarMap, Point, Segment, Triangle
-from typing import List
+from typing import Callable, Dict, List, NamedTuple
 import mapbox_earcut as earcut
 import numpy as np
 from kirkpatrick_algorithm.visualizer.main import Visualizer
 
+
+class PreprocessRound(NamedTuple):
+    """
+    Zmiany triangulacji w jednej rundzie przetwarzania: usunięte wierzchołki z ich sąsiadami (brzegami dziur)
+    oraz trójkąty triangulacji dziur. Połączenia nowych trójkątów z usuniętymi są w grafie trójkątów.
+    """
+    removed: List[Point]
+    holes: List[List[Point]]
+    triangles: List[Triangle]
+
+
+class _LazySteps(Sequence):
+    """
+    Lista kroków wizualizacji, w której obiekt `Visualizer` kroku budowany jest dopiero przy odwołaniu do niego
+    """
+    def __init__(self, length: Callable[[], int], build: Callable[[int], Visualizer]):
+        self.__length = length
+        self.__build = build
+
+    def __len__(self) -> int:
+        return self.__length()
+
+    def __getitem__(self, step: int) -> Visualizer:
+        if isinstance(step, slice):
+            return [self[i] for i in range(*step.indices(len(self)))]
+        if step < 0:
+            step += len(self)
+        if not 0 <= step < len(self):
+            raise IndexError("Visualization step out of range")
+
+        return self.__build(step)
+
+
 class KirkpatrickVisualization: 
     def __init__(self, polygon: List[tuple[float, float]]):
         self.__original_polygon = polygon
@@ -29,10 +63,18 @@ class KirkpatrickVisualization:
 
         self.vis = Visualizer()             #vis
         self.polygon = polygon             #vis
-        self.preprocess_steps = []
-        self.query_steps = []
         self.dag_depth = {}
         self.is_used = []
+
+        # kroki zapisywane są jako zmiany względem początkowej triangulacji, a rysunki budowane są dopiero na żądanie
+        self.__initial_segments = [((t.pt1.x, t.pt1.y), (t.pt2.x, t.pt2.y)) for t in self.__polygon_planar_map.itersegments()]
+        self.__initial_points = [(t.x, t.y) for t in self.__polygon_planar_map.iterpoints()]
+        self.__rounds: List[PreprocessRound] = []
+        self.__query_point = None
+        self.__query_path: List[Triangle] = []
+
+        self.preprocess_steps = _LazySteps(lambda: 3 * len(self.__rounds), self.__build_preprocess_step)
+        self.query_steps = _LazySteps(lambda: len(self.__rounds), self.__build_query_step)
     
     def __add_outer_triangle(self, polygon: List[tuple[float, float]]) -> List[tuple[float, float]]:
         min_x = min(polygon, key=lambda p: p[0])[0]
@@ -134,49 +176,13 @@ class KirkpatrickVisualization:
 
         depth = 1
         while v > 3:
-            vis = Visualizer()                          #VIS
-            q_vis = Visualizer()
-
-            for t in self.__polygon_planar_map.itersegments():
-                vis.add_line_segment(((t.pt1.x,t.pt1.y),(t.pt2.x,t.pt2.y)))
-                q_vis.add_line_segment(((t.pt1.x,t.pt1.y),(t.pt2.x,t.pt2.y)))
-            for t in self.__polygon_planar_map.iterpoints():
-                vis.add_point((t.x,t.y), color = "cyan")
-                q_vis.add_point((t.x,t.y), color = "cyan")
-            for t in self.ot:
-                vis.add_point(t, color = "orange")
-                q_vis.add_point(t, color = "orange")
-            # print(self.__polygon_planar_map)
-            # print(all_removed_triangles)
-            # print(removed)
-            self.preprocess_steps.append(vis)
-            self.query_steps.append(q_vis)   #VIS_END
-
             independent_set = self.__get_independent_set()
 
-            vis = Visualizer()                          #VIS
-
-            for t in self.__polygon_planar_map.itersegments():
-                vis.add_line_segment(((t.pt1.x,t.pt1.y),(t.pt2.x,t.pt2.y)))
-            for t in self.ot:
-                vis.add_point(t, color = "orange")
-            for t in self.__polygon_planar_map.iterpoints():
-                vis.add_point((t.x,t.y), color = "cyan" if t not in independent_set else "red")
-
-            self.preprocess_steps.append(vis)           #VIS_END
-
             holes_points, removed, all_removed_triangles = self.__remove_independent_set(independent_set)
             v -= removed
 
-            vis = Visualizer()                          #VIS
-
-            for t in self.__polygon_planar_map.itersegments():
-                vis.add_line_segment(((t.pt1.x,t.pt1.y),(t.pt2.x,t.pt2.y)))
-            for t in self.__polygon_planar_map.iterpoints():
-                vis.add_point((t.x,t.y), color = "cyan")
-            for t in self.ot:
-                vis.add_point(t, color = "orange")
-            self.preprocess_steps.append(vis)           #VIS_END
+            step = PreprocessRound(independent_set, holes_points, [])     #VIS
+            self.__rounds.append(step)                                      #VIS_END
 
             for hole_points, removed_triangles in zip(holes_points, all_removed_triangles):
                 verts = np.array([[point.x, point.y] for point in hole_points]).reshape(-1, 2)
@@ -185,6 +191,7 @@ class KirkpatrickVisualization:
 
                 for a, b, c in result.reshape(-1,3):
                     new_triangle = Triangle(hole_points[a], hole_points[b], hole_points[c])
+                    step.triangles.append(new_triangle)                     #VIS
 
                     for segment in new_triangle.itersegments():
                         if not self.__polygon_planar_map.has_edge(segment):
@@ -214,18 +221,17 @@ class KirkpatrickVisualization:
         
         current = self.__root_triangle
 
-        self.is_used = [False for _ in range(len(self.query_steps))]
+        self.is_used = [False for _ in range(len(self.__rounds))]
+        self.__query_point = (point.x, point.y)
+        self.__query_path = []
 
         while self.__triangles_graph[current]:
             for triangle in self.__triangles_graph[current]:
                 if point in triangle:
                     current = triangle
 
-                    i = self.dag_depth[triangle]
-                    self.is_used[i] = True
-                    vis = self.query_steps[i]
-                    vis.add_polygon([(triangle.pt1.x, triangle.pt1.y), (triangle.pt2.x, triangle.pt2.y), (triangle.pt3.x, triangle.pt3.y)], color="yellow")
-                    vis.add_point((point.x, point.y), color = "red")
+                    self.is_used[self.dag_depth[triangle]] = True
+                    self.__query_path.append(triangle)
 
                     break
         
@@ -243,6 +249,75 @@ class KirkpatrickVisualization:
 
         vis.show()
 
+    def __replay(self, rounds: int, removed: bool = False) -> (Dict[tuple, None], Dict[tuple, None]):
+        """
+        Odtwarza triangulację sprzed rundy `rounds` ze zmian zapisanych w kolejnych rundach; dla `removed=True`
+        także usuwa wierzchołki tej rundy (bez triangulacji dziur). Zwraca odcinki i punkty w kolejności dodania.
+        """
+        key = lambda a, b: (a, b) if a <= b else (b, a)
+        segments = dict.fromkeys(key(a, b) for a, b in self.__initial_segments)
+        points = dict.fromkeys(self.__initial_points)
+
+        for i in range(rounds + 1 if removed else rounds):
+            for vertex, hole in zip(self.__rounds[i].removed, self.__rounds[i].holes):
+                for neighbor in hole:
+                    segments.pop(key((vertex.x, vertex.y), (neighbor.x, neighbor.y)), None)
+                points.pop((vertex.x, vertex.y), None)
+
+            if i < rounds:
+                for triangle in self.__rounds[i].triangles:
+                    for segment in triangle.itersegments():
+                        segments.setdefault(key((segment.pt1.x, segment.pt1.y), (segment.pt2.x, segment.pt2.y)))
+
+        return segments, points
+
+    def __draw_map(self, rounds: int, removed: bool = False, highlighted: set = frozenset()) -> Visualizer:
+        """
+        Rysuje triangulację sprzed rundy `rounds` jak `__replay`; punkty z `highlighted` są czerwone
+        """
+        segments, points = self.__replay(rounds, removed)
+        vis = Visualizer()
+
+        for segment in segments:
+            vis.add_line_segment(segment)
+        if highlighted:
+            for t in self.ot:
+                vis.add_point(t, color = "orange")
+            for t in points:
+                vis.add_point(t, color = "red" if t in highlighted else "cyan")
+        else:
+            for t in points:
+                vis.add_point(t, color = "cyan")
+            for t in self.ot:
+                vis.add_point(t, color = "orange")
+
+        return vis
+
+    def __build_preprocess_step(self, step: int) -> Visualizer:
+        """
+        Buduje rysunek kroku przetwarzania: dla każdej rundy triangulację, zaznaczony zbiór niezależny
+        i triangulację po usunięciu zbioru niezależnego
+        """
+        rounds, stage = divmod(step, 3)
+
+        if stage == 1:
+            return self.__draw_map(rounds, highlighted={(t.x, t.y) for t in self.__rounds[rounds].removed})
+
+        return self.__draw_map(rounds, removed=stage == 2)
+
+    def __build_query_step(self, step: int) -> Visualizer:
+        """
+        Buduje rysunek kroku ostatniej lokalizacji: triangulację z rundy `step` i trójkąty ścieżki z tej rundy
+        """
+        vis = self.__draw_map(step)
+
+        for triangle in self.__query_path:
+            if self.dag_depth[triangle] == step:
+                vis.add_polygon([(triangle.pt1.x, triangle.pt1.y), (triangle.pt2.x, triangle.pt2.y), (triangle.pt3.x, triangle.pt3.y)], color="yellow")
+                vis.add_point(self.__query_point, color = "red")
+
+        return vis
+
     def add_points(self):
         self.vis.add_point(self.polygon)
         self.vis.add_point(self.ot)
@@ -252,6 +327,6 @@ class KirkpatrickVisualization:
             vis.show()
 
     def show_query(self):
-        for i in range (len(self.query_steps)):
+        for i in range (len(self.is_used)):
             if self.is_used[i]:
                 self.query_steps[i].show()
\ No newline at end of file
@@ -72,6 +72,16 @@ class Visualizer:
     def save_gif(self, filename='animation', interval=256):
         Plot.save_gif(self.plot_data, self.data, interval, filename)
 
+    def show_video(self, interval=256):
+        video = Plot.show_video(self.plot_data, self.data, interval)
+        return video
+
+    def save_animation(self, target, interval=256, format=None):
+        Plot.save_animation(self.plot_data, self.data, interval, target, format)
+
+    def get_animation(self, interval=256, format='gif'):
+        return Plot.get_animation(self.plot_data, self.data, interval, format)
+
     def get_plot(self):
         fig, ax = Plot.get_fig(self.plot_data, self.data)
         return fig, ax
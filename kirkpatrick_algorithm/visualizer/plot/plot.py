@@ -1,7 +1,18 @@
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from IPython.display import Image
+from matplotlib import rcParams
+from matplotlib.animation import writers
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+import io
 import os
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+
+# formaty animacji obsługiwane przez `save_animation`
+ANIMATION_FORMATS = ('gif', 'mp4')
 
 
 class Plot:
@@ -28,35 +39,79 @@ class Plot:
         return fig, ax
 
     @staticmethod
-    def __build_gif(plot_data, data, interval):
-        fig, ax = plt.subplots()
-        artists = []
-        frames = [ax.set_xlabel('x'), ax.set_ylabel('y')]
-        artists.append(frames[:])
+    def __iter_frames(plot_data, data):
+        # każda figura rysowana jest raz jako niewidoczna; kolejna klatka ją pokazuje, dorysowując ją na poprzedniej
+        # klatce, albo ukrywa, rysując klatkę od nowa, więc koszt jest liniowy względem liczby kroków.
+        # Zwracane klatki (tablice RGBA) są widokami bufora rysunku, ważnymi do pobrania następnej klatki.
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.set_xlabel('x')
+        ax.set_ylabel('y')
 
         if 'title' in plot_data:
             ax.set_title(plot_data['title'])
         if 'grid' in plot_data:
             ax.grid()
 
+        steps = []
+        drawn = {}
         for figure in data:
-            if figure.to_be_removed and figure.artist:
-                first = frames.index(figure.artist[0])
-                last = frames.index(figure.artist[-1])
-                figure.artist = None
-                frames = frames[:first] + frames[last+1:]
+            if figure.to_be_removed and id(figure) in drawn:
+                steps.append((drawn.pop(id(figure)), False))
             else:
                 artist = figure.draw(ax)
-                figure.artist = artist
-                frames.extend(artist)
-            artists.append(frames[:])
-                
+                for a in artist:
+                    a.set_visible(False)
+                drawn[id(figure)] = artist
+                steps.append((artist, True))
+
         if 'axis_equal' in plot_data:
             ax.axis('equal')
         else:
             ax.autoscale()
-            
-        return animation.ArtistAnimation(fig=fig, artists=artists, interval=interval, blit=True)
+
+        canvas.draw()
+        yield np.asarray(canvas.buffer_rgba())
+
+        for artist, visible in steps:
+            for a in artist:
+                a.set_visible(visible)
+            if visible:
+                for a in artist:
+                    ax.draw_artist(a)
+            else:
+                canvas.draw()
+            yield np.asarray(canvas.buffer_rgba())
+
+    @staticmethod
+    def __write_gif(frames, interval, target):
+        # Pillow koduje klatki po kolei z generatora, porównując każdą z poprzednią
+        images = (Image.fromarray(frame).convert('RGB') for frame in frames)
+        first = next(images)
+        first.save(target, format='GIF', save_all=True, append_images=images, duration=interval, loop=0)
+
+    @staticmethod
+    def __write_mp4(frames, interval, path):
+        # surowe klatki przekazywane są strumieniowo do ffmpeg, tak jak w `matplotlib.animation.FFMpegWriter`
+        if not writers.is_available('ffmpeg'):
+            raise Exception("MP4 export requires ffmpeg (matplotlib rcParams['animation.ffmpeg_path'])")
+
+        first = next(frames)
+        height, width = first.shape[:2]
+        command = [rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}', '-r', str(1000 / interval), '-i', 'pipe:',
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-vcodec', rcParams['animation.codec'], '-pix_fmt', 'yuv420p', path]
+
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            process.stdin.write(first.tobytes())
+            for frame in frames:
+                process.stdin.write(frame.tobytes())
+        finally:
+            process.stdin.close()
+        if process.wait() != 0:
+            raise Exception(f"ffmpeg failed to encode the animation (exit code {process.returncode})")
 
     @staticmethod
     def show(plot_data, data):
@@ -69,20 +124,47 @@ class Plot:
         fig.savefig(filename)
         plt.close()
 
+    @staticmethod
+    def save_animation(plot_data, data, interval, target, format=None):
+        # `target` to ścieżka albo plik binarny; domyślny format wynika z rozszerzenia ścieżki (dla pliku to GIF)
+        if format is None:
+            format = os.path.splitext(os.fspath(target))[1][1:].lower() if isinstance(target, (str, os.PathLike)) else 'gif'
+        if format not in ANIMATION_FORMATS:
+            raise Exception(f"Unsupported animation format: {format}")
+
+        frames = Plot.__iter_frames(plot_data, data)
+
+        if format == 'gif':
+            Plot.__write_gif(frames, interval, target)
+        elif isinstance(target, (str, os.PathLike)):
+            Plot.__write_mp4(frames, interval, os.fspath(target))
+        else:
+            # ffmpeg zapisuje MP4 z przewijaniem, więc do pliku binarnego trafia gotowy plik tymczasowy
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'animation.mp4')
+                Plot.__write_mp4(frames, interval, path)
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, target)
+
+    @staticmethod
+    def get_animation(plot_data, data, interval, format='gif'):
+        buffer = io.BytesIO()
+        Plot.save_animation(plot_data, data, interval, buffer, format)
+        return buffer.getvalue()
+
     @staticmethod
     def show_gif(plot_data, data, interval):
-        Plot.save_gif(plot_data, data, interval,
-                      f'{__file__}.__tmp_animation_holder__')
-        plt.close()
-        gif = Image(f'{__file__}.__tmp_animation_holder__.gif')
-        os.remove(f'{__file__}.__tmp_animation_holder__.gif')
-        return gif
+        from IPython.display import Image as IPythonImage
+        return IPythonImage(data=Plot.get_animation(plot_data, data, interval, 'gif'), format='gif')
+
+    @staticmethod
+    def show_video(plot_data, data, interval):
+        from IPython.display import Video
+        return Video(data=Plot.get_animation(plot_data, data, interval, 'mp4'), embed=True, mimetype='video/mp4')
 
     @staticmethod
     def save_gif(plot_data, data, interval, filename):
-        anim = Plot.__build_gif(plot_data, data, interval)
-        anim.save(filename=f'{filename}.gif', writer='pillow')
-        plt.close()
+        Plot.save_animation(plot_data, data, interval, f'{filename}.gif', 'gif')
 
     @staticmethod
     def get_fig(plot_data, data):
@@ -1,7 +1,10 @@
 from setuptools import setup
 
-with open('requirements.txt') as f:
-    requirements = f.read().split('\n')
+
+def read_requirements(path):
+    with open(path) as f:
+        return [line.strip() for line in f.read().split('\n') if line.strip()]
+
 
 setup(
     name='kirkpatrick',
@@ -10,5 +13,11 @@ setup(
     author='Wiktor Warzecha, Łukasz Kwinta',
     packages=['kirkpatrick_algorithm'],
     python_requires='>=3.8',
-    install_requires=requirements,
+    install_requires=read_requirements('requirements.txt'),
+    # biblioteki do rysowania i notebooków: pip install kirkpatrick[visualization]
+    # skompilowane jądro zapytań: pip install kirkpatrick[jit]
+    extras_require={
+        'visualization': read_requirements('requirements-visualization.txt'),
+        'jit': read_requirements('requirements-jit.txt'),
+    },
 )
@@ -0,0 +1,94 @@
+"""
+Zgodność skompilowanego jądra zapytań (moduł `kernels`) ze ścieżką numpy i z `Kirkpatrick.query`.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip('numba')
+
+from kirkpatrick_algorithm.kirkpatrick_point_location import kernels
+from kirkpatrick_algorithm.kirkpatrick_point_location.point_location import Kirkpatrick
+
+
+def uniform_points(rng: np.random.Generator) -> np.ndarray:
+    return rng.uniform(0, 100, (2000, 2))
+
+
+def near_degenerate_points(rng: np.random.Generator) -> np.ndarray:
+    # punkty prawie współliniowe dają długie, wąskie trójkąty i niepewne orientacje
+    x = np.linspace(0, 3, 1000)
+    return np.c_[x, x / 3 + rng.normal(0, 1e-9, len(x))]
+
+
+@pytest.fixture(autouse=True)
+def jit_enabled(monkeypatch):
+    # jądro używane jest dla paczek dowolnego rozmiaru, a po teście przywracane jest poprzednie ustawienie
+    monkeypatch.setattr(kernels, 'JIT_MIN_POINTS', 0)
+    previous = kernels.set_enabled(True)
+    yield
+    kernels.set_enabled(previous)
+
+
+@pytest.fixture(params=[uniform_points, near_degenerate_points], ids=['uniform', 'near_degenerate'])
+def case(request) -> (Kirkpatrick, np.ndarray):
+    rng = np.random.default_rng(23)
+    points = request.param(rng)
+
+    kirkpatrick = Kirkpatrick([tuple(point) for point in points.tolist()])
+    kirkpatrick.preprocess()
+
+    # losowe punkty (także spoza triangulacji), wierzchołki trójkątów i środki ich krawędzi
+    corners = np.array([[(t.pt1.x, t.pt1.y), (t.pt2.x, t.pt2.y), (t.pt3.x, t.pt3.y)] for t in kirkpatrick.get_triangles()])
+    low, high = points.min(axis=0), points.max(axis=0)
+    queries = np.concatenate([
+        rng.uniform(low - 1, high + 1, (3000, 2)),
+        corners.reshape(-1, 2),
+        (corners + np.roll(corners, -1, axis=1)).reshape(-1, 2) / 2,
+    ])
+
+    return kirkpatrick, queries
+
+
+def locate(kirkpatrick: Kirkpatrick, queries: np.ndarray, jit: bool) -> np.ndarray:
+    kernels.set_enabled(jit)
+    try:
+        return kirkpatrick.query_many(queries)
+    finally:
+        kernels.set_enabled(True)
+
+
+def test_kernel_is_used():
+    assert kernels.available()
+    assert kernels.descent_kernel(1) is not None
+
+
+def test_query_many_matches_numpy_and_query(case):
+    kirkpatrick, queries = case
+
+    compiled = locate(kirkpatrick, queries, jit=True)
+    interpreted = locate(kirkpatrick, queries, jit=False)
+    np.testing.assert_array_equal(compiled, interpreted)
+
+    triangles = kirkpatrick.get_triangles()
+    for point, index in zip(queries.tolist(), compiled.tolist()):
+        expected = kirkpatrick.query(tuple(point))
+        assert (expected is None and index == -1) or (index >= 0 and expected == triangles[index]), point
+
+
+def test_unresolved_points_fall_back_to_exact_predicates(case):
+    kirkpatrick, queries = case
+    dag = kirkpatrick._Kirkpatrick__search_dag
+
+    raw = kernels.locate_many(kernels.descent_kernel(len(queries)), dag, queries, None)
+    unresolved = raw == kernels.UNRESOLVED
+    # środki krawędzi leżą na prostych krawędzi, więc część orientacji nie jest pewna w arytmetyce zmiennoprzecinkowej
+    assert unresolved.any()
+
+    interpreted = locate(kirkpatrick, queries, jit=False)
+    np.testing.assert_array_equal(raw[~unresolved], interpreted[~unresolved])
+    np.testing.assert_array_equal(dag.locate_many(queries)[unresolved], interpreted[unresolved])
+
+    triangles = kirkpatrick.get_triangles()
+    for point, index in zip(queries[unresolved].tolist(), interpreted[unresolved].tolist()):
+        expected = kirkpatrick.query(tuple(point))
+        assert (expected is None and index == -1) or (index >= 0 and expected == triangles[index]), point